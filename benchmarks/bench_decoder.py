@@ -0,0 +1,104 @@
+"""웹소켓 메시지 디코더별 처리량 비교
+
+python -m benchmarks.bench_decoder [--capture frames.jsonl] [-n 5]
+
+--capture 는 Recorder 로 기록한 파일 혹은 한 줄에 프레임 하나씩 저장한 파일.
+비워서 실행하면 trade/orderbook 프레임을 생성해서 사용
+"""
+import argparse
+import json
+import random
+import time
+
+from upbit_wrapper.decoder import DECODERS
+from upbit_wrapper.decoder import get_decoder
+from upbit_wrapper.recorder import FRAME
+from upbit_wrapper.recorder import read_capture
+
+MARKETS = [f'KRW-C{i:03d}' for i in range(200)]
+
+
+def make_trade(code, sequential_id):
+    price = round(random.uniform(1, 100000), 2)
+    return {
+        'type': 'trade', 'code': code, 'timestamp': 1700000000000 + sequential_id,
+        'trade_date': '2023-11-14', 'trade_time': '22:13:20', 'trade_timestamp': 1700000000000 + sequential_id,
+        'trade_price': price, 'trade_volume': round(random.uniform(0, 10), 8), 'ask_bid': 'BID',
+        'prev_closing_price': price, 'change': 'RISE', 'change_price': 1.0,
+        'sequential_id': sequential_id, 'stream_type': 'REALTIME',
+    }
+
+
+def make_orderbook(code):
+    price = random.uniform(1, 100000)
+    units = [
+        {'ask_price': round(price + i, 2), 'bid_price': round(price - i, 2),
+         'ask_size': round(random.uniform(0, 10), 8), 'bid_size': round(random.uniform(0, 10), 8)}
+        for i in range(15)
+    ]
+    return {
+        'type': 'orderbook', 'code': code, 'timestamp': 1700000000000,
+        'total_ask_size': sum(u['ask_size'] for u in units), 'total_bid_size': sum(u['bid_size'] for u in units),
+        'orderbook_units': units, 'stream_type': 'REALTIME',
+    }
+
+
+def make_capture(n):
+    random.seed(0)
+    frames = []
+    for i in range(n):
+        code = random.choice(MARKETS)
+        msg = make_trade(code, i) if i % 2 else make_orderbook(code)
+        frames.append(json.dumps(msg, separators=(',', ':')).encode())
+    return frames
+
+
+def load_capture(path):
+    try:
+        return [entry.payload for entry in read_capture(path) if entry.kind == FRAME]
+    except ValueError:
+        pass
+    with open(path, 'rb') as f:
+        return [line.rstrip(b'\n') for line in f if line.strip()]
+
+
+def measure(call, frames, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            call(frame)
+        best = min(best, time.perf_counter() - start)
+    return len(frames) / best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--capture')
+    parser.add_argument('--frames', type=int, default=50000)
+    parser.add_argument('-n', type=int, default=5)
+    args = parser.parse_args()
+
+    frames = load_capture(args.capture) if args.capture else make_capture(args.frames)
+    print(f"{len(frames)} frames, {sum(map(len, frames)) / len(frames):.0f} bytes/frame")
+
+    legacy = measure(lambda frame: json.loads(frame.decode('utf-8')), frames, args.n)
+    print(f"{'json.loads(decode)':24}: {legacy:12,.0f} frames/s")
+    for name in DECODERS:
+        rate = measure(get_decoder(name), frames, args.n)
+        print(f"{name:24}: {rate:12,.0f} frames/s ({rate / legacy:.1f}x)")
+
+    # raw 로 받아 관심 없는 마켓은 디코딩 전에 버리는 경우
+    loads = get_decoder('auto')
+    wanted = b'"code":"KRW-C000"'
+
+    def filtered(frame):
+        if wanted in frame:
+            loads(frame)
+
+    rate = measure(filtered, frames, args.n)
+    print(f"{'raw + filter (1 market)':24}: {rate:12,.0f} frames/s ({rate / legacy:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
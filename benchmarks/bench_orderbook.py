@@ -0,0 +1,89 @@
+"""호가창 갱신 처리량 비교 (dict 에서 매번 다시 계산 vs OrderBooks)
+
+python -m benchmarks.bench_orderbook [--markets 200] [--frames 50000]
+
+numpy 가 설치되어 있어야 함
+"""
+import argparse
+import random
+import time
+
+from upbit_wrapper.models import OrderbookSnapshot
+from upbit_wrapper.orderbook import OrderBooks
+from benchmarks.bench_decoder import make_orderbook
+
+
+def rebuild(msg, size):
+    """소비자가 dict 호가 목록으로부터 매번 직접 계산하는 방식"""
+    units = msg['orderbook_units']
+    best_bid = units[0]['bid_price']
+    best_ask = units[0]['ask_price']
+    ask_depth = []
+    total = 0.0
+    for unit in units:
+        total += unit['ask_size']
+        ask_depth.append(total)
+    bid_total = sum(unit['bid_size'] for unit in units[:5])
+    ask_total = sum(unit['ask_size'] for unit in units[:5])
+    imbalance = (bid_total - ask_total) / (bid_total + ask_total)
+    remaining = size
+    notional = 0.0
+    for unit in units:
+        take = min(remaining, unit['ask_size'])
+        notional += take * unit['ask_price']
+        remaining -= take
+        if remaining <= 0:
+            break
+    return best_ask - best_bid, ask_depth, imbalance, notional / size
+
+
+def measure(call, frames):
+    start = time.perf_counter()
+    for frame in frames:
+        call(frame)
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--markets', type=int, default=200)
+    parser.add_argument('--frames', type=int, default=50000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    markets = [f'KRW-C{i:03d}' for i in range(args.markets)]
+    frames = [make_orderbook(random.choice(markets)) for _ in range(args.frames)]
+    snapshots = [OrderbookSnapshot.from_dict(frame) for frame in frames]
+
+    baseline = measure(lambda frame: rebuild(frame, 1.0), frames)
+    print(f"{'dict rebuild':28}: {baseline:10,.0f} updates/s")
+
+    books = OrderBooks(capacity=args.markets)
+    rate = measure(books.apply, frames)
+    print(f"{'OrderBooks.apply (dict)':28}: {rate:10,.0f} updates/s")
+
+    books = OrderBooks(capacity=args.markets)
+    rate = measure(books.apply, snapshots)
+    print(f"{'OrderBooks.apply (typed)':28}: {rate:10,.0f} updates/s")
+
+    def apply_and_read(frame):
+        book = books.apply(frame)
+        book.spread
+        book.imbalance(5)
+        book.vwap('ask', 1.0)
+
+    rate = measure(apply_and_read, frames)
+    print(f"{'apply + spread/imb/vwap':28}: {rate:10,.0f} updates/s ({rate / baseline:.1f}x)")
+    rate = measure(apply_and_read, snapshots)
+    print(f"{'typed apply + spread/imb/vwap':28}: {rate:10,.0f} updates/s ({rate / baseline:.1f}x)")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        books.spreads()
+        books.imbalances(5)
+    elapsed = (time.perf_counter() - start) / 1000
+    print(f"{'all-market spread+imbalance':28}: {elapsed * 1e6:10.1f}us for {len(books)} markets")
+
+
+if __name__ == '__main__':
+    main()
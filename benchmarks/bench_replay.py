@@ -0,0 +1,52 @@
+"""기록 파일 재생 처리량 (Replayer 서버 -> UpbitWebSocket -> 콜백)
+
+python -m benchmarks.bench_replay --capture capture.upbr.zst [--decoder auto] [--typed]
+
+--capture 는 Recorder 로 기록한 파일. 비워서 실행하면 trade/orderbook 프레임을 생성해서 기록한 뒤 사용
+aiohttp 가 설치되어 있어야 함
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from upbit_wrapper import UpbitWebSocket
+from upbit_wrapper.recorder import Recorder
+from upbit_wrapper.recorder import Replayer
+from benchmarks.bench_decoder import make_capture
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--capture')
+    parser.add_argument('--frames', type=int, default=50000)
+    parser.add_argument('--decoder', default='auto')
+    parser.add_argument('--typed', action='store_true')
+    args = parser.parse_args()
+
+    path = args.capture
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'capture.upbr')
+        with Recorder(path) as recorder:
+            for i, frame in enumerate(make_capture(args.frames)):
+                recorder.frame(frame, timestamp=i / 1000)
+
+    count = 0
+
+    def callback(msg):
+        nonlocal count
+        if not isinstance(msg, (str, Exception)):
+            count += 1
+
+    with Replayer(path) as replayer:
+        ws = UpbitWebSocket('[{"ticket":"bench"}]', callback=callback, reconnect=False, ping_interval=0,
+                            decoder=args.decoder, typed=args.typed, url=replayer.ws_url)
+        start = time.perf_counter()
+        ws.start()
+        elapsed = time.perf_counter() - start
+    print(f"{count} frames in {elapsed:.2f}s: {count / elapsed:12,.0f} frames/s "
+          f"(decoder={args.decoder}, typed={args.typed})")
+
+
+if __name__ == '__main__':
+    main()
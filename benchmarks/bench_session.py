@@ -0,0 +1,48 @@
+"""커넥션 풀 사용 여부에 따른 호출당 지연 시간 비교
+
+python -m benchmarks.bench_session [-n 2000]
+"""
+import argparse
+import statistics
+import time
+
+from upbit_wrapper import Upbit
+from benchmarks.mock_server import MockServer
+
+
+def measure(call, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        'calls': n,
+        'mean_us': statistics.fmean(samples) * 1e6,
+        'p50_us': samples[len(samples) // 2] * 1e6,
+        'p99_us': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=2000)
+    args = parser.parse_args()
+
+    with MockServer() as server:
+        # 같은 Upbit.ticker 경로에서 keep-alive 여부만 다르게 하고, 요청 수 제한 대기 없이 측정
+        with Upbit(server_url=server.url, rate_limiter=False, keep_alive=False) as unpooled, \
+                Upbit(server_url=server.url, rate_limiter=False) as pooled:
+            results = {
+                'unpooled': measure(lambda: unpooled.ticker(markets='KRW-BTC'), args.n),
+                'pooled': measure(lambda: pooled.ticker(markets='KRW-BTC'), args.n),
+            }
+
+    for name, result in results.items():
+        print(f"{name:>9}: mean {result['mean_us']:8.1f}us  p50 {result['p50_us']:8.1f}us  p99 {result['p99_us']:8.1f}us")
+    print(f"speedup: {results['unpooled']['mean_us'] / results['pooled']['mean_us']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
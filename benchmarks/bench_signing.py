@@ -0,0 +1,88 @@
+"""인증 헤더 생성 비용 비교 (jwt.encode + uuid4 + sha512 vs Signer)
+
+python -m benchmarks.bench_signing [-n 20000]
+
+jwt(PyJWT) 가 설치되어 있어야 함
+"""
+import argparse
+import hashlib
+import time
+import uuid
+from urllib.parse import urlencode
+
+import jwt
+
+from upbit_wrapper.signer import Signer
+from upbit_wrapper.signer import query_hash
+
+ACCESS_KEY = 'access-key-0123456789'
+SECRET_KEY = 'secret-key-0123456789abcdef0123456789'
+QUERY = {'market': 'KRW-BTC', 'side': 'bid', 'volume': '0.01', 'price': '100.0', 'ord_type': 'limit'}
+
+
+def legacy_headers(query_string):
+    m = hashlib.sha512()
+    m.update(query_string)
+    payload = {
+        'access_key': ACCESS_KEY,
+        'nonce': str(uuid.uuid4()),
+        'query_hash': m.hexdigest(),
+        'query_hash_alg': 'SHA512',
+    }
+    token = jwt.encode(payload, SECRET_KEY)
+    if isinstance(token, bytes):
+        token = token.decode('utf-8')
+    return {'Authorization': 'Bearer {}'.format(token)}
+
+
+def verify(signer, query_string):
+    """Signer 의 토큰이 jwt.encode 결과와 같은지, jwt.decode 로 검증되는지 확인"""
+    nonce = signer.nonce()
+    payload = {
+        'access_key': ACCESS_KEY,
+        'nonce': nonce,
+        'query_hash': query_hash(query_string),
+        'query_hash_alg': 'SHA512',
+    }
+    token = signer.token(query_hash(query_string), nonce=nonce)
+    expected = jwt.encode(payload, SECRET_KEY)
+    if isinstance(expected, bytes):
+        expected = expected.decode('utf-8')
+    decoded = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+    assert decoded == payload, decoded
+    assert str(uuid.UUID(nonce)) == nonce
+    return token == expected
+
+
+def make_queries(n):
+    """실제 주문처럼 요청마다 다른 쿼리 스트링"""
+    return [urlencode(dict(QUERY, price=f'{100 + i * 0.5:.1f}', volume=f'{0.01 + i * 1e-6:.6f}')).encode() for i in range(n)]
+
+
+def measure(call, queries):
+    start = time.perf_counter()
+    for query_string in queries:
+        call(query_string)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=20000)
+    args = parser.parse_args()
+
+    query_string = urlencode(QUERY).encode()
+    signer = Signer(ACCESS_KEY, SECRET_KEY)
+    identical = verify(signer, query_string)
+
+    queries = make_queries(args.n)
+    legacy = measure(legacy_headers, queries)
+    fast = measure(lambda query: signer.headers(query_hash(query)), queries)
+
+    print(f"byte-for-byte identical to jwt.encode: {identical}")
+    print(f"jwt.encode + uuid4     : {legacy:7.2f}us/call")
+    print(f"Signer                 : {fast:7.2f}us/call ({legacy / fast:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
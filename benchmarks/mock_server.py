@@ -0,0 +1,105 @@
+"""api.upbit.com 대신 사용하는 로컬 HTTP 서버
+
+실제 서버에 요청하지 않고 벤치마크를 돌리기 위해 사용
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+TICKER = {
+    'market': 'KRW-BTC', 'trade_date': '20210221', 'trade_time': '040446',
+    'trade_date_kst': '20210221', 'trade_time_kst': '130446', 'trade_timestamp': 1613880286000,
+    'opening_price': 64260000.0, 'high_price': 65500000.0, 'low_price': 63381000.0,
+    'trade_price': 65197000.0, 'prev_closing_price': 64251000.0, 'change': 'RISE',
+    'change_price': 946000.0, 'change_rate': 0.0147235062, 'signed_change_price': 946000.0,
+    'signed_change_rate': 0.0147235062, 'trade_volume': 0.00013587,
+    'acc_trade_price': 163506728111.08755, 'acc_trade_price_24h': 883453500622.5804,
+    'acc_trade_volume': 2529.77814776, 'acc_trade_volume_24h': 13683.34452421,
+    'highest_52_week_price': 65985000.0, 'highest_52_week_date': '2021-02-20',
+    'lowest_52_week_price': 5489000.0, 'lowest_52_week_date': '2020-03-13',
+    'timestamp': 1613880286709,
+}
+
+
+class MockServer:
+    """경로별로 고정된 응답을 돌려주는 HTTP/1.1 keep-alive 서버
+
+    Parameters
+    ----------
+    routes : dict
+        {경로: body} 형태. body 는 bytes 혹은 json 직렬화 가능한 객체이며,
+        callable 인 경우 (method, path, query) 를 인자로 호출한 결과를 사용
+    default : object
+        routes 에 없는 경로에 대한 응답 body
+    headers : dict
+        응답에 추가할 헤더. 값이 callable 인 경우 (method, path) 를 인자로 호출한 결과를 사용
+
+    Example
+    -------
+    with MockServer() as server:
+        ub = Upbit(server_url=server.url, rate_limiter=False)
+    """
+    def __init__(self, routes=None, default=None, headers=None, host='127.0.0.1', port=0):
+        self.routes = routes or {}
+        self.headers = {'Remaining-Req': 'group=default; min=1799; sec=29'} if headers is None else headers
+        self.default = [TICKER] if default is None else default
+        self.httpd = ThreadingHTTPServer((host, port), self.__make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def respond(self):
+                split = urlsplit(self.path)
+                body = server.routes.get(split.path, server.default)
+                if callable(body):
+                    body = body(self.command, split.path, split.query)
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in server.headers.items():
+                    if callable(value):
+                        value = value(self.command, split.path)
+                    self.send_header(key, value)
+                if self.close_connection:
+                    # 요청의 Connection: close 를 응답에도 알려 클라이언트가 연결을 재사용하지 않게 함
+                    self.send_header('Connection', 'close')
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = respond
+            do_POST = respond
+            do_DELETE = respond
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
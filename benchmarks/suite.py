@@ -0,0 +1,230 @@
+"""주요 경로 벤치마크 모음 (결과를 json 으로 저장하여 릴리스 간 비교)
+
+python -m benchmarks.suite [-n 2000] [--json result.json] [--compare baseline.json] [--threshold 0.15] [-k rest.ticker]
+
+로컬 mock 서버를 대상으로 다음을 측정
+  rest.*       Upbit 메소드별 요청/s 와 p50/p99 지연 시간
+  signing.*    __make_headers / __make_query_hash 비용
+  query.*      쿼리 스트링 생성 비용 (build_query)
+  ws_decode.*  UpbitWebSocket.on_message 의 디코딩 비용 (디코더별)
+  ws_stream    Replayer -> UpbitWebSocket -> 콜백 메시지/s (aiohttp 필요)
+
+--compare 로 기준 결과를 주면 ops_per_sec 가 threshold 이상 떨어진 항목을 출력하고 종료 코드 1 로 끝남
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from datetime import timezone
+
+from upbit_wrapper import Upbit
+from upbit_wrapper import UpbitWebSocket
+from upbit_wrapper import recorder
+from upbit_wrapper.decoder import DECODERS
+from upbit_wrapper.query import build_query
+from benchmarks.bench_decoder import make_capture
+from benchmarks.mock_server import MockServer
+
+ACCESS_KEY = 'access-key-0123456789'
+SECRET_KEY = 'secret-key-0123456789abcdef0123456789'
+ORDER = {'market': 'KRW-BTC', 'side': 'bid', 'volume': '0.01', 'price': '100.0', 'ord_type': 'limit'}
+LIST_ORDERS = {'market': 'KRW-BTC', 'state': 'done', 'page': 1, 'limit': 100, 'order_by': 'desc'}
+UUIDS = [f'9ca023a5-851b-4fec-9f0a-48cd83c2{i:04d}' for i in range(20)]
+
+
+def measure(call, n, warmup=10):
+    """call 을 n 번 호출하여 ops_per_sec, mean/p50/p99 (마이크로초) 반환"""
+    for _ in range(min(warmup, n)):
+        call()
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        'n': n,
+        'ops_per_sec': 1 / mean,
+        'mean_us': mean * 1e6,
+        'p50_us': samples[len(samples) // 2] * 1e6,
+        'p99_us': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+    }
+
+
+def rest_benchmarks(n):
+    with MockServer() as server:
+        with Upbit(ACCESS_KEY, SECRET_KEY, server_url=server.url, rate_limiter=False) as ub:
+            calls = {
+                'rest.market_all': lambda: ub.market_all(),
+                'rest.ticker': lambda: ub.ticker(markets='KRW-BTC'),
+                'rest.orderbook': lambda: ub.orderbook(markets='KRW-BTC'),
+                'rest.trades_ticks': lambda: ub.trades_ticks(market='KRW-BTC', count=100),
+                'rest.candles_minutes': lambda: ub.candles_minutes(unit=1, market='KRW-BTC', count=200),
+                'rest.accounts': lambda: ub.accounts(),
+                'rest.order_chance': lambda: ub.order_chance(market='KRW-BTC'),
+                'rest.lists_orders': lambda: ub.lists_orders(state='done', uuids=UUIDS),
+                'rest.orders': lambda: ub.orders(**ORDER),
+                'rest.cancel_order': lambda: ub.cancel_order(uuid=UUIDS[0]),
+            }
+            return {name: measure(call, n) for name, call in calls.items()}
+
+
+def distinct_queries(n):
+    """호출마다 다른 주문 쿼리 (같은 입력의 반복으로 비용이 작게 측정되지 않도록)"""
+    return iter([build_query(dict(ORDER, price=f'{100 + i * 0.5:.1f}', identifier=f'bench-{i}')) for i in range(n + 10)])
+
+
+def signing_benchmarks(n):
+    ub = Upbit(ACCESS_KEY, SECRET_KEY, rate_limiter=False)
+    hash_queries = distinct_queries(n)
+    header_queries = distinct_queries(n)
+    results = {
+        'signing.make_query_hash': measure(lambda: ub._Upbit__make_query_hash(next(hash_queries)), n),
+        'signing.make_headers': measure(lambda: ub._Upbit__make_headers(next(header_queries)), n),
+        'signing.make_headers_no_query': measure(lambda: ub._Upbit__make_headers(), n),
+    }
+    ub.close()
+    return results
+
+
+def query_benchmarks(n):
+    with_arrays = dict(LIST_ORDERS, uuids=UUIDS)
+    return {
+        'query.order': measure(lambda: build_query(ORDER), n),
+        'query.lists_orders_arrays': measure(lambda: build_query(with_arrays), n),
+    }
+
+
+def ws_decode_benchmarks(frames):
+    def noop(msg):
+        pass
+
+    results = {}
+    for name in ['raw'] + list(DECODERS):
+        for typed in (False, True):
+            if name == 'raw' and typed:
+                continue
+            ws = UpbitWebSocket('[]', callback=noop, decoder=name, typed=typed)
+            label = f'ws_decode.{name}' + ('_typed' if typed else '')
+            result = measure(lambda: [ws.on_message(None, frame) for frame in frames], 5, warmup=1)
+            # 프레임 단위로 환산
+            result['n'] *= len(frames)
+            result['ops_per_sec'] *= len(frames)
+            for key in ('mean_us', 'p50_us', 'p99_us'):
+                result[key] /= len(frames)
+            results[label] = result
+    return results
+
+
+def ws_stream_benchmark(frames):
+    if recorder.web is None:
+        # Replayer 는 aiohttp 필요
+        return {}
+    path = os.path.join(tempfile.mkdtemp(), 'capture.upbr')
+    with recorder.Recorder(path) as capture:
+        for i, frame in enumerate(frames):
+            capture.frame(frame, timestamp=i / 1000)
+    count = 0
+
+    def callback(msg):
+        nonlocal count
+        if isinstance(msg, dict):
+            count += 1
+
+    with recorder.Replayer(path) as replayer:
+        ws = UpbitWebSocket('[]', callback=callback, reconnect=False, ping_interval=0, url=replayer.ws_url)
+        start = time.perf_counter()
+        ws.start()
+        elapsed = time.perf_counter() - start
+    os.remove(path)
+    return {'ws_stream': {'n': count, 'ops_per_sec': count / elapsed, 'mean_us': elapsed / max(count, 1) * 1e6}}
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'decoders': list(DECODERS),
+    }
+
+
+def compare(results, baseline, threshold):
+    """기준 결과보다 ops_per_sec 가 threshold 이상 떨어진 항목 목록"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base.get('ops_per_sec'):
+            continue
+        ratio = result['ops_per_sec'] / base['ops_per_sec']
+        if ratio < 1 - threshold:
+            regressions.append((name, base['ops_per_sec'], result['ops_per_sec'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=2000)
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('-k', dest='prefix', help='이름이 prefix 로 시작하는 항목만 실행 (ex. rest, ws_decode.orjson)')
+    parser.add_argument('--json', help='결과를 저장할 파일. - 인 경우 stdout')
+    parser.add_argument('--compare', help='비교할 기준 결과 파일')
+    parser.add_argument('--threshold', type=float, default=0.15)
+    args = parser.parse_args()
+
+    frames = make_capture(args.frames)
+    groups = {
+        'rest': lambda: rest_benchmarks(args.n),
+        'signing': lambda: signing_benchmarks(args.n * 10),
+        'query': lambda: query_benchmarks(args.n * 10),
+        'ws_decode': lambda: ws_decode_benchmarks(frames),
+        'ws_stream': lambda: ws_stream_benchmark(frames),
+    }
+    results = {}
+    for group, run in groups.items():
+        if args.prefix and not (group.startswith(args.prefix) or args.prefix.startswith(group)):
+            continue
+        for name, result in run().items():
+            if args.prefix and not name.startswith(args.prefix):
+                continue
+            results[name] = result
+
+    out = sys.stderr if args.json == '-' else sys.stdout
+    for name, result in results.items():
+        line = f"{name:32}: {result['ops_per_sec']:14,.0f} ops/s"
+        if 'p50_us' in result:
+            line += f"  p50 {result['p50_us']:9.2f}us  p99 {result['p99_us']:9.2f}us"
+        print(line, file=out)
+
+    report = {'meta': metadata(), 'results': results}
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before:,.0f} -> {after:,.0f} ops/s ({ratio:.2f}x)", file=out)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
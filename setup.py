@@ -11,10 +11,17 @@ setup(
     author_email      = 'beomsu317@gmail.com',
     url               = 'https://github.com/beomsu317/upbit_wrapper',
     install_requires  = ['websocket','websocket-client','requests'],
+    extras_require    = {
+                       'async': ['aiohttp'],
+                       'columnar': ['numpy'],
+                       'pandas': ['numpy','pandas'],
+                       'fast': ['orjson'],
+                       'zstd': ['zstandard'],
+                       },
     keyword           = ['upbit'],
     python_requires   = '>=3',
     license           = 'MIT',
-    packages          = find_packages(),
+    packages          = find_packages(exclude=['benchmarks']),
     classifiers       = [
                        'Programming Language :: Python :: 3.8'
                        ],
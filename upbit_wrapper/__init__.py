@@ -2,6 +2,22 @@
 Package
 """
 from upbit_wrapper.upbit import Upbit
+from upbit_wrapper.upbit_async import AsyncUpbit
 from upbit_wrapper.upbit_websocket import UpbitWebSocket
+from upbit_wrapper.upbit_websocket_async import AsyncUpbitWebSocket
+from upbit_wrapper.rate_limit import RateLimiter
+from upbit_wrapper.candle_store import CandleStore
+from upbit_wrapper.response_cache import ResponseCache
+from upbit_wrapper.orderbook import OrderBooks
+from upbit_wrapper.aggregator import CandleAggregator
+from upbit_wrapper.websocket_pool import WebSocketPool
+from upbit_wrapper.shm_feed import ShmFeed
+from upbit_wrapper.recorder import Recorder
+from upbit_wrapper.recorder import Replayer
+from upbit_wrapper.instrumentation import Instrumentation
+from upbit_wrapper.tick_crawler import TickCrawler
+from upbit_wrapper.markets import MarketRegistry
 
-__all__ = ['Upbit','UpbitWebSocket']
\ No newline at end of file
+__all__ = ['Upbit','AsyncUpbit','UpbitWebSocket','AsyncUpbitWebSocket','RateLimiter','CandleStore','ResponseCache',
+           'OrderBooks','CandleAggregator','WebSocketPool','ShmFeed','Recorder','Replayer','Instrumentation',
+           'TickCrawler','MarketRegistry']
\ No newline at end of file
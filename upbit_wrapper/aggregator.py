@@ -0,0 +1,279 @@
+"""체결(trade) 스트림으로 만드는 실시간 캔들
+
+candles_minutes 를 주기적으로 요청하지 않고 웹소켓 체결 메시지로 여러 주기의 캔들을 동시에 만듦
+"""
+import heapq
+import threading
+from collections import deque
+from datetime import datetime
+from datetime import timezone
+
+from upbit_wrapper.candles import MINUTE_UNITS
+from upbit_wrapper.candles import candle_time
+from upbit_wrapper.models import Trade
+
+# KST 는 UTC+9 (밀리초)
+KST_OFFSET = 9 * 3600 * 1000
+
+def _format(ms):
+    return datetime.fromtimestamp(ms / 1000,timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+def _trade(msg):
+    """체결 메시지에서 (market, price, volume, timestamp, sequential_id) 추출. 체결이 아니면 None"""
+    if isinstance(msg,Trade):
+        timestamp = msg.trade_timestamp if msg.trade_timestamp is not None else msg.timestamp
+        return msg.market,msg.trade_price,msg.trade_volume,timestamp,msg.sequential_id
+    if not isinstance(msg,dict):
+        return None
+    if "ty" in msg:
+        if msg["ty"] != "trade":
+            return None
+        return msg["cd"],msg["tp"],msg["tv"],msg["ttms"],msg.get("sid")
+    if msg.get("type") != "trade":
+        return None
+    return msg["code"],msg["trade_price"],msg["trade_volume"],msg["trade_timestamp"],msg.get("sequential_id")
+
+class _Bar:
+    """진행 중인 캔들"""
+    __slots__ = ("start","open","high","low","close","volume","notional","first","last","sequences")
+
+    def __init__(self,start,price,volume,timestamp):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.notional = price * volume
+        self.first = self.last = timestamp
+        self.sequences = set()
+
+    def add(self,price,volume,timestamp):
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        # 순서가 바뀌어 들어온 체결도 시각 기준으로 시가/종가를 정함
+        if timestamp < self.first:
+            self.first = timestamp
+            self.open = price
+        if timestamp >= self.last:
+            self.last = timestamp
+            self.close = price
+        self.volume += volume
+        self.notional += price * volume
+
+class CandleAggregator:
+    """체결 메시지로 여러 주기의 OHLCV 캔들을 만드는 객체
+
+    캔들은 candles_minutes 응답과 같은 키를 가진 dict 로 만들어짐.
+    캔들 종료 후 grace 동안은 늦게 도착한 체결도 반영하며, 그 이후에 도착한 체결은 버리고 late 로 셈.
+    같은 sequential_id 의 체결(재연결 시 중복 수신)은 한 번만 반영함
+
+    Parameters
+    ----------
+    intervals : tuple
+        캔들 주기(초). 예: (1, 60, 300)
+    on_candle : callable
+        캔들이 마감되면 on_candle(candle) 로 전달
+    grace : float
+        캔들 종료 후 늦은 체결을 기다리는 시간(초). 받은 체결 중 가장 최근 체결 시각 기준
+    history : int
+        (market, interval) 별로 보관할 마감 캔들 개수
+
+    Example
+    -------
+    agg = CandleAggregator(intervals=(1,60,300),on_candle=print)
+    agg.seed(Upbit(),['KRW-BTC'])
+    ws = UpbitWebSocket(request,callback=agg.apply)
+    """
+    def __init__(self,intervals=(60,),on_candle=None,grace=2.0,history=200):
+        self.intervals = tuple(int(interval) for interval in intervals)
+        self.on_candle = on_candle
+        self.grace = int(grace * 1000)
+        self.history = history
+        self.lock = threading.Lock()
+        self.bars = {}
+        self.closed = {}
+        self.finalized = {}
+        self.seeded = {}
+        self.deadlines = []
+        self.watermark = 0
+        self.counters = {"trades": 0,"candles": 0,"late": 0,"duplicates": 0,"seeded": 0}
+
+    def apply(self,msg):
+        """체결 메시지를 반영. 체결이 아닌 메시지는 무시
+
+        Parameters
+        ----------
+        msg : dict or Trade
+            웹소켓 trade 메시지 (DEFAULT/SIMPLE) 혹은 Trade 객체
+        """
+        trade = _trade(msg)
+        if trade is None:
+            return
+        market,price,volume,timestamp,sequential_id = trade
+        with self.lock:
+            self.counters["trades"] += 1
+            for interval in self.intervals:
+                self.__add(market,interval,price,volume,timestamp,sequential_id)
+            if timestamp > self.watermark:
+                self.watermark = timestamp
+            closed = self.__close(self.watermark)
+        self.__emit(closed)
+
+    def __add(self,market,interval,price,volume,timestamp,sequential_id):
+        key = (market,interval)
+        length = interval * 1000
+        start = timestamp - timestamp % length
+        if start <= self.finalized.get(key,-1):
+            self.counters["late"] += 1
+            return
+        if timestamp <= self.seeded.get((market,interval,start),-1):
+            # REST 로 받은 캔들에 이미 포함된 체결
+            self.counters["seeded"] += 1
+            return
+        bars = self.bars.setdefault(key,{})
+        bar = bars.get(start)
+        if bar is None:
+            bar = bars[start] = _Bar(start,price,volume,timestamp)
+            heapq.heappush(self.deadlines,(start + length + self.grace,market,interval,start))
+        elif sequential_id is not None and sequential_id in bar.sequences:
+            self.counters["duplicates"] += 1
+            return
+        else:
+            bar.add(price,volume,timestamp)
+        if sequential_id is not None:
+            bar.sequences.add(sequential_id)
+
+    def __close(self,now):
+        closed = []
+        deadlines = self.deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _,market,interval,start = heapq.heappop(deadlines)
+            key = (market,interval)
+            bar = self.bars[key].pop(start)
+            if start > self.finalized.get(key,-1):
+                self.finalized[key] = start
+            self.seeded.pop((market,interval,start),None)
+            candle = self.__candle(market,interval,bar)
+            self.closed.setdefault(key,deque(maxlen=self.history)).append(candle)
+            self.counters["candles"] += 1
+            closed.append(candle)
+        return closed
+
+    def __emit(self,closed):
+        if self.on_candle is not None:
+            for candle in closed:
+                self.on_candle(candle)
+
+    def __candle(self,market,interval,bar):
+        """candles_minutes 응답과 같은 형식의 캔들"""
+        candle = {
+            "market": market,
+            "candle_date_time_utc": _format(bar.start),
+            "candle_date_time_kst": _format(bar.start + KST_OFFSET),
+            "opening_price": bar.open,
+            "high_price": bar.high,
+            "low_price": bar.low,
+            "trade_price": bar.close,
+            "timestamp": bar.last,
+            "candle_acc_trade_price": bar.notional,
+            "candle_acc_trade_volume": bar.volume,
+        }
+        if interval % 60 == 0:
+            candle["unit"] = interval // 60
+        return candle
+
+    def flush(self,now=None):
+        """now(epoch 밀리초, 비워서 요청시 시스템 시각) 기준으로 마감된 캔들을 내보냄
+
+        체결이 뜸한 시간에도 캔들을 제때 받으려면 주기적으로 호출
+
+        Returns
+        -------
+        list
+            마감된 캔들
+        """
+        if now is None:
+            now = int(datetime.now(timezone.utc).timestamp() * 1000)
+        with self.lock:
+            closed = self.__close(now)
+        self.__emit(closed)
+        return closed
+
+    def current(self,market,interval):
+        """진행 중인 가장 최근 캔들. 없으면 None"""
+        with self.lock:
+            bars = self.bars.get((market,interval))
+            if not bars:
+                return None
+            return self.__candle(market,interval,bars[max(bars)])
+
+    def candles(self,market,interval):
+        """마감된 캔들 목록 (오래된 순)"""
+        with self.lock:
+            return list(self.closed.get((market,interval),()))
+
+    def seed(self,ub,markets,count=1):
+        """REST 캔들로 진행 중인 캔들과 최근 마감 캔들을 채워 재시작 후에도 이어지도록 함
+
+        분 단위로 조회할 수 있는 주기(60초의 배수이며 candles_minutes 가 지원하는 단위)만 채움.
+        진행 중인 캔들에 이미 포함된 체결(캔들의 timestamp 이전 체결)은 다시 반영하지 않으며,
+        스트림이 이미 마감했거나 만들고 있는 캔들과 그 이전 캔들은 채우지 않음
+
+        Parameters
+        ----------
+        ub : Upbit
+            캔들을 조회할 Upbit 객체
+        markets : list
+            마켓 코드 목록
+        count : int
+            주기별로 받을 캔들 개수 (진행 중인 캔들 포함)
+        """
+        for interval in self.intervals:
+            if interval % 60 or interval // 60 not in MINUTE_UNITS:
+                continue
+            for market in markets:
+                rows = ub.candles_minutes(unit=interval // 60,market=market,count=count,format="json")
+                if rows:
+                    self.__seed(market,interval,rows)
+
+    def __seed(self,market,interval,rows):
+        length = interval * 1000
+        key = (market,interval)
+        rows = sorted(rows,key=lambda row: row["candle_date_time_utc"])
+        now = int(datetime.now(timezone.utc).timestamp() * 1000)
+        with self.lock:
+            bars = self.bars.setdefault(key,{})
+            history = self.closed.setdefault(key,deque(maxlen=self.history))
+            # 스트림이 이미 마감했거나 만들고 있는 캔들 이전의 행은 중복이므로 건너뜀
+            latest = max(self.finalized.get(key,-1),max(bars,default=-1))
+            for row in rows:
+                start = int(candle_time(row).timestamp() * 1000)
+                if start <= latest:
+                    continue
+                if row is not rows[-1] or start + length <= max(now,self.watermark):
+                    history.append(row)
+                    self.finalized[key] = max(self.finalized.get(key,-1),start)
+                    continue
+                bar = _Bar(start,row["opening_price"],row["candle_acc_trade_volume"],start)
+                bar.last = row["timestamp"]
+                bar.high = row["high_price"]
+                bar.low = row["low_price"]
+                bar.close = row["trade_price"]
+                bar.notional = row["candle_acc_trade_price"]
+                bars[start] = bar
+                self.seeded[(market,interval,start)] = row["timestamp"]
+                heapq.heappush(self.deadlines,(start + length + self.grace,market,interval,start))
+
+    def stats(self):
+        """처리 통계
+
+        Returns
+        -------
+        dict
+            trades, candles (마감된 캔들 수), open (진행 중인 캔들 수).
+            late (grace 이후 도착해 버린 체결), duplicates, seeded (REST 캔들에 포함되어 건너뛴 체결) 는 주기별로 셈
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats["open"] = sum(len(bars) for bars in self.bars.values())
+        return stats
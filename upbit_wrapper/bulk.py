@@ -0,0 +1,89 @@
+"""여러 마켓을 나누어 요청하기 위한 도구"""
+
+# 마켓 코드만으로 쿼리 스트링이 이 길이를 넘지 않도록 나눔
+MAX_QUERY_LENGTH = 4000
+
+def chunk_markets(markets,chunk_size=100,max_length=MAX_QUERY_LENGTH):
+    """마켓 코드 목록을 URL 길이 안전한 크기로 나눔
+
+    Parameters
+    ----------
+    markets : list or str
+        마켓 코드 목록 혹은 반점으로 구분되는 마켓 코드
+    chunk_size : int
+        한 요청에 포함할 최대 마켓 개수
+    max_length : int
+        한 요청의 markets 파라미터 최대 길이
+
+    Returns
+    -------
+    list
+        반점으로 구분된 마켓 코드 문자열 목록
+
+    Example
+    -------
+    chunk_markets(['KRW-BTC','KRW-ETH'],chunk_size=1)
+    """
+    if isinstance(markets,str):
+        markets = markets.split(",")
+    chunks = []
+    chunk = []
+    length = 0
+    for market in markets:
+        market = market.strip()
+        if not market:
+            continue
+        # 반점은 %2C 로 인코딩됨
+        size = len(market) + (3 if chunk else 0)
+        if chunk and (len(chunk) >= chunk_size or length + size > max_length):
+            chunks.append(",".join(chunk))
+            chunk = []
+            length = 0
+            size = len(market)
+        chunk.append(market)
+        length += size
+    if chunk:
+        chunks.append(",".join(chunk))
+    return chunks
+
+def merge_by_market(results):
+    """나누어 받은 응답 목록을 마켓 코드를 키로 하는 dict 로 합침
+
+    Parameters
+    ----------
+    results : list
+        응답 리스트의 목록
+
+    Returns
+    -------
+    dict
+        {마켓 코드: 응답}. 실패한 응답이 있으면 False
+    """
+    merged = {}
+    for result in results:
+        if result is False:
+            return False
+        for item in result:
+            merged[item["market"] if isinstance(item,dict) else item.market] = item
+    return merged
+
+def batch_result(request,result,error=None):
+    """batch 메소드의 항목별 결과
+
+    Parameters
+    ----------
+    request : dict
+        요청한 키워드 인자
+    result : json
+        응답. 실패한 경우 False
+    error : dict
+        실패 원인 {status, name, message}
+
+    Returns
+    -------
+    dict
+        {request, result, error}. 성공한 경우 error 는 None, 실패한 경우 result 는 None
+    """
+    if result is False:
+        return {"request": request,"result": None,"error": error or {"status": None,"name": None,"message": None}}
+    return {"request": request,"result": result,"error": None}
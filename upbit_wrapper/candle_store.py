@@ -0,0 +1,335 @@
+"""SQLite 기반 캔들 저장소
+
+마감된 캔들과 빈틈 없이 받아 둔 구간(coverage)을 (market, interval) 별로 저장하여,
+같은 과거 데이터를 다시 요청하지 않고 진행 중인 캔들과 새로 마감된 캔들만 API 로 받도록 함
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+
+from upbit_wrapper.candles import MAX_CANDLES
+from upbit_wrapper.candles import candle_floor
+from upbit_wrapper.candles import candle_periods
+from upbit_wrapper.candles import candle_time
+from upbit_wrapper.candles import format_time
+from upbit_wrapper.candles import parse_time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    market TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (market, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    market TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    PRIMARY KEY (market, interval, start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series (
+    market TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (market, interval)
+) WITHOUT ROWID;
+"""
+
+# 최초 캔들 이전 구간의 시작 시각
+HISTORY_START = 0
+
+def _epoch(value):
+    return int(value.timestamp())
+
+def _datetime(value):
+    return datetime.fromtimestamp(value,timezone.utc)
+
+class CandleLookup:
+    """CandleStore.lookup 의 진행 상태
+
+    request 가 None 이 아니면 해당 파라미터로 API 를 호출한 뒤 CandleStore.resolve 에 결과를 넘김.
+    request 가 None 이 되면 result 에 최신순으로 정렬된 캔들이 들어 있음
+    """
+    __slots__ = ("market","interval","unit","to","count","now","cached","full","request","result")
+
+    def __init__(self,market,interval,unit,to,count,now):
+        self.market = market
+        self.interval = interval
+        self.unit = unit
+        self.to = to
+        self.count = count
+        self.now = now
+        self.cached = []
+        self.full = False
+        self.request = None
+        self.result = None
+
+    def params(self,count):
+        params = {"market": self.market,"count": count}
+        if self.to is not None:
+            params["to"] = format_time(self.to)
+        return params
+
+class CandleStore:
+    """(market, interval) 별 마감 캔들 저장소
+
+    Parameters
+    ----------
+    path : str
+        SQLite 파일 경로. ':memory:' 인 경우 메모리에만 저장
+    max_bytes : int
+        저장할 캔들 본문의 최대 크기. 넘으면 가장 오래 사용하지 않은 (market, interval) 부터 삭제
+
+    Example
+    -------
+    store = CandleStore('candles.db',max_bytes=512 * 1024 * 1024)
+    ub = Upbit(candle_store=store)
+    ub.candles_days(market='KRW-BTC',count=200)
+    store.stats()
+    """
+    def __init__(self,path,max_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.counter_lock = threading.Lock()
+        self.counters = {"hits": 0,"partial_hits": 0,"misses": 0,"evictions": 0}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+
+    def accepts(self,query):
+        """저장소로 처리할 수 있는 요청인지 확인 (market, to, count 외의 파라미터가 있으면 API 로 바로 요청)"""
+        return "market" in query and set(query) <= {"market","to","count"}
+
+    def lookup(self,market,unit,to=None,count=1,now=None):
+        """저장된 캔들로 요청을 처리할 계획을 세움
+
+        Parameters
+        ----------
+        market : str
+            마켓 코드
+        unit : int or str
+            분 단위 혹은 'days', 'weeks', 'months'
+        to : str or datetime
+            마지막 캔들 시각 (exclusive). 비워서 요청시 가장 최근 캔들
+        count : int
+            캔들 개수
+        now : datetime
+            현재 시각. 비워서 요청시 시스템 시각
+
+        Returns
+        -------
+        CandleLookup
+            request 가 None 이면 result 로 바로 응답 가능
+        """
+        now = parse_time(now) if now is not None else datetime.now(timezone.utc)
+        to = parse_time(to) if to is not None else None
+        count = min(int(count),MAX_CANDLES)
+        lookup = CandleLookup(market,str(unit),unit,to,count,now)
+
+        open_start = candle_floor(unit,now)
+        include_open = to is None or to > open_start
+        closed_to = open_start if include_open else to
+        with self.lock:
+            segment = self.__segment(market,lookup.interval,_epoch(closed_to))
+            self.__touch(market,lookup.interval)
+            if segment is None:
+                return self.__miss(lookup)
+            start,end = segment
+            if end >= _epoch(closed_to):
+                missing = 0
+            else:
+                missing = candle_periods(unit,_datetime(end),closed_to)
+            if missing + include_open > MAX_CANDLES:
+                return self.__miss(lookup)
+            lookup.cached = self.__rows(market,lookup.interval,start,min(end,_epoch(closed_to)),count)
+
+        if missing + include_open == 0:
+            if len(lookup.cached) < count and start != HISTORY_START:
+                return self.__miss(lookup)
+            self.__count("hits")
+            lookup.result = lookup.cached
+            return lookup
+        lookup.request = lookup.params(missing + include_open)
+        return lookup
+
+    def __count(self,name):
+        with self.counter_lock:
+            self.counters[name] += 1
+
+    def __miss(self,lookup):
+        self.__count("misses")
+        lookup.full = True
+        lookup.request = lookup.params(lookup.count)
+        return lookup
+
+    def resolve(self,lookup,rows):
+        """lookup.request 에 대한 API 응답을 저장하고 결과를 만듦
+
+        저장된 캔들과 합쳐도 개수가 모자라면 lookup.request 를 전체 요청으로 바꿈
+
+        Parameters
+        ----------
+        lookup : CandleLookup
+            lookup 결과
+        rows : list
+            lookup.request 로 요청한 API 응답 (최신순)
+        """
+        self.store(lookup.market,lookup.unit,rows,lookup.request,lookup.now)
+        lookup.request = None
+        if lookup.full:
+            lookup.result = rows
+            return lookup
+
+        merged = {row["candle_date_time_utc"]: row for row in lookup.cached}
+        for row in rows:
+            merged[row["candle_date_time_utc"]] = row
+        result = [merged[key] for key in sorted(merged,reverse=True)][:lookup.count]
+        if len(result) < lookup.count and not self.__complete_history(lookup):
+            return self.__miss(lookup)
+        self.__count("partial_hits")
+        lookup.result = result
+        return lookup
+
+    def __complete_history(self,lookup):
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT 1 FROM coverage WHERE market=? AND interval=? AND start=?",
+                (lookup.market,lookup.interval,HISTORY_START))
+            return cursor.fetchone() is not None
+
+    def store(self,market,unit,rows,params,now=None):
+        """API 응답 중 마감된 캔들을 저장하고 빈틈 없이 받은 구간을 기록
+
+        Parameters
+        ----------
+        rows : list
+            API 응답 (최신순)
+        params : dict
+            요청 파라미터 (to, count)
+        """
+        now = parse_time(now) if now is not None else datetime.now(timezone.utc)
+        interval = str(unit)
+        closed_to = candle_floor(unit,now)
+        if params.get("to") is not None:
+            closed_to = min(closed_to,parse_time(params["to"]))
+        closed_to = _epoch(closed_to)
+
+        if len(rows) < int(params.get("count",1)):
+            covered_from = HISTORY_START
+        elif rows:
+            covered_from = min(_epoch(candle_time(row)) for row in rows)
+        else:
+            return
+
+        records = [
+            (market,interval,_epoch(candle_time(row)),json.dumps(row,separators=(",",":")))
+            for row in rows
+        ]
+        records = [record for record in records if covered_from <= record[2] < closed_to]
+        if covered_from >= closed_to:
+            return
+
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                added = 0
+                for record in records:
+                    if self.conn.execute("INSERT OR IGNORE INTO candles VALUES (?,?,?,?)",record).rowcount:
+                        added += len(record[3])
+                self.__merge_coverage(market,interval,covered_from,closed_to)
+                self.__account(market,interval,added)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.__evict(market,interval)
+
+    def __segment(self,market,interval,closed_to):
+        """closed_to 이전에서 시작하는 가장 최근 구간"""
+        cursor = self.conn.execute(
+            "SELECT start, end FROM coverage WHERE market=? AND interval=? AND start<? ORDER BY start DESC LIMIT 1",
+            (market,interval,closed_to))
+        return cursor.fetchone()
+
+    def __rows(self,market,interval,start,end,count):
+        cursor = self.conn.execute(
+            "SELECT payload FROM candles WHERE market=? AND interval=? AND ts>=? AND ts<? ORDER BY ts DESC LIMIT ?",
+            (market,interval,start,end,count))
+        return [json.loads(payload) for payload, in cursor]
+
+    def __merge_coverage(self,market,interval,start,end):
+        cursor = self.conn.execute(
+            "SELECT start, end FROM coverage WHERE market=? AND interval=? AND start<=? AND end>=?",
+            (market,interval,end,start))
+        segments = cursor.fetchall()
+        for segment_start,segment_end in segments:
+            start = min(start,segment_start)
+            end = max(end,segment_end)
+        self.conn.execute(
+            "DELETE FROM coverage WHERE market=? AND interval=? AND start<=? AND end>=?",
+            (market,interval,end,start))
+        self.conn.execute("INSERT INTO coverage VALUES (?,?,?,?)",(market,interval,start,end))
+
+    def __account(self,market,interval,size):
+        self.conn.execute(
+            "INSERT INTO series VALUES (?,?,?,?) ON CONFLICT(market, interval) "
+            "DO UPDATE SET bytes=bytes+excluded.bytes, last_access=excluded.last_access",
+            (market,interval,size,time.time()))
+
+    def __touch(self,market,interval):
+        self.conn.execute(
+            "UPDATE series SET last_access=? WHERE market=? AND interval=?",
+            (time.time(),market,interval))
+
+    def __total_bytes(self):
+        return self.conn.execute("SELECT COALESCE(SUM(bytes),0) FROM series").fetchone()[0]
+
+    def __evict(self,market,interval):
+        """max_bytes 를 넘으면 가장 오래 사용하지 않은 (market, interval) 부터 삭제"""
+        if self.max_bytes is None:
+            return
+        while self.__total_bytes() > self.max_bytes:
+            victim = self.conn.execute(
+                "SELECT market, interval FROM series WHERE NOT (market=? AND interval=?) "
+                "ORDER BY last_access LIMIT 1",(market,interval)).fetchone()
+            if victim is None:
+                return
+            self.conn.execute("BEGIN")
+            for table in ("candles","coverage","series"):
+                self.conn.execute(f"DELETE FROM {table} WHERE market=? AND interval=?",victim)
+            self.conn.execute("COMMIT")
+            self.__count("evictions")
+
+    def stats(self):
+        """저장소 사용 통계
+
+        Returns
+        -------
+        dict
+            hits (API 요청 없이 응답), partial_hits (최근 캔들만 요청), misses (전체 요청), evictions, bytes, series
+        """
+        with self.lock:
+            total_bytes = self.__total_bytes()
+            series = self.conn.execute("SELECT COUNT(*) FROM series").fetchone()[0]
+        with self.counter_lock:
+            stats = dict(self.counters)
+        stats["bytes"] = total_bytes
+        stats["series"] = series
+        return stats
@@ -0,0 +1,171 @@
+"""캔들 기간 조회를 위한 도구"""
+import math
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+MAX_CANDLES = 200
+MINUTE_UNITS = (1,3,5,10,15,30,60,240)
+
+def parse_time(value):
+    """시각을 UTC datetime 으로 변환
+
+    Parameters
+    ----------
+    value : datetime or str or int or float
+        datetime (timezone 이 없으면 UTC 로 간주), ISO 8601 문자열 혹은 epoch 초
+
+    Returns
+    -------
+    datetime
+        timezone 이 UTC 인 datetime
+    """
+    if isinstance(value,(int,float)):
+        return datetime.fromtimestamp(value,timezone.utc)
+    if isinstance(value,str):
+        value = datetime.fromisoformat(value.replace("Z","+00:00"))
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def format_time(value):
+    """캔들 API 의 to 파라미터 형식(yyyy-MM-dd'T'HH:mm:ssXXX)으로 변환"""
+    return value.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+def candle_time(candle):
+    """캔들의 시작 시각(candle_date_time_utc) 반환"""
+    return datetime.fromisoformat(candle["candle_date_time_utc"]).replace(tzinfo=timezone.utc)
+
+def candle_endpoint(unit):
+    """캔들 단위에 해당하는 메소드 이름과 추가 파라미터 반환
+
+    Parameters
+    ----------
+    unit : int or str
+        분 단위(1, 3, 5, 10, 15, 30, 60, 240) 혹은 'days', 'weeks', 'months'
+
+    Returns
+    -------
+    tuple
+        (메소드 이름, 추가 파라미터)
+    """
+    if unit in ("days","weeks","months"):
+        return f"candles_{unit}",{}
+    if int(unit) not in MINUTE_UNITS:
+        raise ValueError(f"unsupported candle unit : {unit}")
+    return "candles_minutes",{"unit": int(unit)}
+
+def candle_floor(unit,value):
+    """value 가 속한 캔들의 시작 시각 반환
+
+    Parameters
+    ----------
+    unit : int or str
+        분 단위 혹은 'days', 'weeks', 'months'
+    value : datetime
+        UTC 시각
+    """
+    if unit == "months":
+        return value.replace(day=1,hour=0,minute=0,second=0,microsecond=0)
+    day = value.replace(hour=0,minute=0,second=0,microsecond=0)
+    if unit == "days":
+        return day
+    if unit == "weeks":
+        return day - timedelta(days=day.weekday())
+    minutes = value.hour * 60 + value.minute
+    return day + timedelta(minutes=minutes - minutes % int(unit))
+
+def candle_shift(unit,value,n):
+    """캔들 시작 시각 value 로부터 n 개 뒤(음수이면 앞)의 캔들 시작 시각 반환"""
+    if unit == "months":
+        return sub_months(value,-n)
+    if unit == "days":
+        return value + timedelta(days=n)
+    if unit == "weeks":
+        return value + timedelta(weeks=n)
+    return value + timedelta(minutes=int(unit) * n)
+
+def candle_periods(unit,start,end):
+    """캔들 시작 시각 start 부터 end 이전까지 시작하는 캔들 개수"""
+    if end <= start:
+        return 0
+    if unit == "months":
+        last = candle_floor(unit,end - timedelta(microseconds=1))
+        return (last.year - start.year) * 12 + last.month - start.month + 1
+    return math.ceil((end - start) / (candle_shift(unit,start,1) - start))
+
+def sub_months(value,months):
+    month = value.year * 12 + value.month - 1 - months
+    return value.replace(year=month // 12,month=month % 12 + 1,day=1)
+
+def plan_candle_windows(unit,start,end,count=MAX_CANDLES):
+    """[start, end) 기간을 count 개 단위의 요청으로 나눔
+
+    각 요청은 (to, count) 로 표현되며 to 는 exclusive 이므로 요청끼리 겹치지 않음
+
+    Parameters
+    ----------
+    unit : int or str
+        분 단위 혹은 'days', 'weeks', 'months'
+    start : datetime
+        시작 시각 (inclusive)
+    end : datetime
+        끝 시각 (exclusive)
+    count : int
+        한 요청의 최대 캔들 개수
+
+    Returns
+    -------
+    list
+        최신 구간부터 정렬된 (to, count) 목록
+    """
+    windows = []
+    to = end
+    if unit == "months":
+        while to > start:
+            # 월 캔들은 매월 1일에 시작하므로 to 이전에 시작하는 캔들부터 센다
+            first = to.replace(day=1,hour=0,minute=0,second=0,microsecond=0)
+            if first == to:
+                first = sub_months(first,1)
+            oldest = sub_months(first,count - 1)
+            if oldest <= start:
+                n = (first.year - start.year) * 12 + first.month - start.month + 1
+                windows.append((to,max(1,min(count,n))))
+                break
+            windows.append((to,count))
+            to = oldest
+        return windows
+
+    if unit == "days":
+        step = timedelta(days=1)
+    elif unit == "weeks":
+        step = timedelta(weeks=1)
+    else:
+        step = timedelta(minutes=int(unit))
+    while to > start:
+        n = min(count,math.ceil((to - start) / step))
+        windows.append((to,n))
+        to -= step * n
+    return windows
+
+def merge_candles(pages,start,end):
+    """나누어 받은 캔들을 합쳐 중복을 제거하고 [start, end) 기간만 오름차순으로 반환
+
+    Parameters
+    ----------
+    pages : list
+        캔들 리스트의 목록
+
+    Returns
+    -------
+    list
+        시각 오름차순으로 정렬된 캔들
+    """
+    candles = {}
+    for page in pages:
+        for candle in page:
+            candles[candle["candle_date_time_utc"]] = candle
+    return [
+        candles[key] for key in sorted(candles)
+        if start <= candle_time(candles[key]) < end
+    ]
@@ -0,0 +1,114 @@
+"""캔들/체결 응답을 NumPy 컬럼으로 변환
+
+numpy 가 필요함 (pip install upbit-wrapper[columnar]). pandas 는 to_pandas() 에서만 사용
+"""
+import json
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 문자열 시각 컬럼은 epoch 밀리초(int64)로 변환
+DATETIME_COLUMNS = ("candle_date_time_utc","candle_date_time_kst")
+INT_COLUMNS = ("timestamp","trade_timestamp","sequential_id","unit")
+
+def _column(name,values):
+    if name in DATETIME_COLUMNS:
+        return np.array(values,dtype="datetime64[ms]").astype(np.int64)
+    if name in INT_COLUMNS:
+        return np.array(values,dtype=np.int64)
+    if all(isinstance(value,(int,float)) and not isinstance(value,bool) for value in values):
+        return np.array(values,dtype=np.float64)
+    return np.array(values)
+
+class Columns:
+    """이름별 NumPy 배열 묶음
+
+    시각(timestamp, candle_date_time_*)은 epoch 밀리초 int64, 가격/수량은 float64 로 저장
+
+    Example
+    -------
+    candles = ub.candles_minutes(unit=1,market='KRW-BTC',count=200,as_array=True)
+    candles['trade_price'].mean()
+    """
+    __slots__ = ("columns",)
+
+    def __init__(self,columns):
+        if np is None:
+            raise ImportError("columnar results require numpy (pip install upbit-wrapper[columnar])")
+        self.columns = columns
+
+    @classmethod
+    def from_lists(cls,lists):
+        lengths = {len(values) for values in lists.values()}
+        if len(lengths) > 1:
+            raise ValueError("rows do not share the same fields")
+        return cls({name: _column(name,values) for name,values in lists.items()})
+
+    @classmethod
+    def from_records(cls,records):
+        """dict 리스트로부터 생성"""
+        lists = {}
+        for record in records:
+            for key,value in record.items():
+                lists.setdefault(key,[]).append(value)
+        return cls.from_lists(lists)
+
+    def __getitem__(self,name):
+        return self.columns[name]
+
+    def __contains__(self,name):
+        return name in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        for values in self.columns.values():
+            return len(values)
+        return 0
+
+    def __repr__(self):
+        return f"Columns(rows={len(self)}, columns={list(self.columns)})"
+
+    def keys(self):
+        return self.columns.keys()
+
+    def items(self):
+        return self.columns.items()
+
+    def to_pandas(self):
+        """pandas.DataFrame 으로 변환"""
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("to_pandas() requires pandas (pip install upbit-wrapper[pandas])")
+        return pd.DataFrame(self.columns)
+
+def decode_columns(content):
+    """json 배열 응답을 행 단위 dict 를 만들지 않고 바로 컬럼으로 변환
+
+    Parameters
+    ----------
+    content : bytes
+        json 배열 응답 본문
+
+    Returns
+    -------
+    Columns
+        필드 이름별 NumPy 배열
+    """
+    if np is None:
+        raise ImportError("columnar results require numpy (pip install upbit-wrapper[columnar])")
+    lists = {}
+
+    def collect(pairs):
+        for key,value in pairs:
+            values = lists.get(key)
+            if values is None:
+                values = lists[key] = []
+            values.append(value)
+
+    json.loads(content,object_pairs_hook=collect)
+    return Columns.from_lists(lists)
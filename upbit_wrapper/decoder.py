@@ -0,0 +1,60 @@
+"""웹소켓 메시지 디코더
+
+orjson, ujson 이 설치되어 있으면 사용하고, 없으면 json 을 사용함.
+모두 bytes 를 str 로 바꾸지 않고 바로 디코딩함
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+def _raw(data):
+    return data
+
+def _available():
+    decoders = {}
+    if orjson is not None:
+        decoders["orjson"] = orjson.loads
+    if ujson is not None:
+        decoders["ujson"] = ujson.loads
+    decoders["json"] = json.loads
+    return decoders
+
+# 사용 가능한 디코더 (빠른 순)
+DECODERS = _available()
+
+def get_decoder(decoder="auto"):
+    """디코더 함수 반환
+
+    Parameters
+    ----------
+    decoder : str or callable
+        'auto' (orjson > ujson > json 중 설치된 것), 'orjson', 'ujson', 'json',
+        'raw' (디코딩하지 않고 bytes 그대로) 혹은 bytes 를 받는 함수
+
+    Returns
+    -------
+    callable
+        bytes 를 받아 디코딩된 메시지를 반환하는 함수
+
+    Example
+    -------
+    loads = get_decoder('auto')
+    loads(b'{"type":"trade"}')
+    """
+    if callable(decoder):
+        return decoder
+    if decoder == "auto":
+        return next(iter(DECODERS.values()))
+    if decoder == "raw":
+        return _raw
+    if decoder not in DECODERS:
+        raise ImportError(f"decoder '{decoder}' is not installed")
+    return DECODERS[decoder]
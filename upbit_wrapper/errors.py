@@ -0,0 +1,45 @@
+"""요청 실패 원인
+
+API 메소드는 실패 시 False 를 반환하므로, 실패 원인(HTTP 상태 코드와 Upbit 오류 응답)은
+스레드/태스크 별로 따로 유지되는 ContextVar 에 저장하여 같은 스레드/태스크에서 last_error() 로 조회함
+"""
+import json
+from contextvars import ContextVar
+
+_last_error = ContextVar("upbit_wrapper_last_error",default=None)
+
+def set_last_error(status,body=None,name=None,message=None):
+    """실패 원인 저장
+
+    Parameters
+    ----------
+    status : int
+        HTTP 상태 코드. 응답을 받지 못한 경우 None
+    body : bytes
+        오류 응답 본문 ({"error": {"name": ..., "message": ...}})
+    """
+    if body is not None:
+        try:
+            error = json.loads(body)["error"]
+            name,message = error.get("name"),error.get("message")
+        except (ValueError,KeyError,TypeError):
+            message = body.decode(errors="replace") if isinstance(body,bytes) else str(body)
+    _last_error.set({"status": status,"name": name,"message": message})
+
+def clear_last_error():
+    _last_error.set(None)
+
+def last_error():
+    """현재 스레드/태스크에서 마지막으로 실패한 요청의 원인
+
+    Returns
+    -------
+    dict
+        {status, name, message}. 실패한 요청이 없으면 None
+
+    Example
+    -------
+    if ub.orders(**order) is False:
+        last_error()  # {'status': 400, 'name': 'insufficient_funds_bid', 'message': '...'}
+    """
+    return _last_error.get()
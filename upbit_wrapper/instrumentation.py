@@ -0,0 +1,393 @@
+"""요청/웹소켓 계측
+
+요청마다 단계별 소요 시간, 응답 크기, 상태 코드, 남은 요청 수를 RequestEvent 로 만들어 훅에 전달하고
+메소드별 히스토그램으로 모음. 웹소켓은 디코딩/콜백 시간과 초당 메시지 수를 히스토그램으로 모음.
+모은 값은 snapshot() (dict), prometheus() (Prometheus text 형식) 로 조회하거나
+start_http_server() 로 /metrics 에 노출하고, add_otel() 로 OpenTelemetry 히스토그램에도 기록할 수 있음
+
+단계 (초)
+  wait      RateLimiter 대기
+  dns       DNS 조회 (AsyncUpbit 만)
+  connect   새 연결 생성. TLS 포함 (AsyncUpbit 만)
+  server    요청 전송부터 응답 헤더 수신까지. Upbit(requests) 은 새 연결인 경우 연결 시간 포함
+  transfer  응답 본문 수신
+  decode    응답 본문 디코딩
+  total     전체
+"""
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from upbit_wrapper.rate_limit import parse_remaining_req
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+PHASES = ("wait","dns","connect","server","transfer","decode","total")
+# 지연 시간 히스토그램 구간 상한(초)
+LATENCY_BUCKETS = (0.0001,0.00025,0.0005,0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1.0,2.5,5.0,10.0)
+# 초당 메시지 수 히스토그램 구간 상한
+RATE_BUCKETS = (1,5,10,50,100,500,1000,5000,10000,50000,100000)
+
+class Histogram:
+    """구간(bucket) 히스토그램
+
+    Parameters
+    ----------
+    bounds : tuple
+        구간 상한 (오름차순). 마지막 상한보다 큰 값은 +Inf 구간에 들어감
+    """
+    __slots__ = ("bounds","counts","count","sum","max")
+
+    def __init__(self,bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self,value):
+        self.counts[bisect.bisect_left(self.bounds,value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self,q):
+        """q 분위수의 근사값 (해당 구간의 상한). 값이 없으면 None"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound,count in zip(self.bounds,self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound,self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "buckets": dict(zip(self.bounds + (float("inf"),),self.counts)),
+        }
+
+class RequestEvent:
+    """요청 하나의 계측 값. 훅에 전달됨
+
+    캐시에서 응답한 경우 cached 가 True 이고 전송 단계 값은 None.
+    Upbit(requests) 은 dns, connect 를 측정하지 않으므로 항상 None 이며, to_dict() 는 측정하지 않은 단계를 포함하지 않음
+    """
+    __slots__ = ("name","method","api_path","started","status","size","remaining","cached","error") + PHASES
+
+    def __init__(self,name,method,api_path):
+        self.name = name
+        self.method = method
+        self.api_path = api_path
+        self.started = time.perf_counter()
+        self.status = None
+        self.size = None
+        self.remaining = None
+        self.cached = False
+        self.error = None
+        for phase in PHASES:
+            setattr(self,phase,None)
+
+    def response(self,status,headers,size):
+        """전송 결과 반영"""
+        self.status = status
+        self.size = size
+        remaining = headers.get("Remaining-Req")
+        if remaining is not None:
+            self.remaining = parse_remaining_req(remaining)[2]
+
+    def to_dict(self):
+        return {
+            name: getattr(self,name) for name in self.__slots__
+            if name != "started" and not (name in PHASES and getattr(self,name) is None)
+        }
+
+    def __repr__(self):
+        return f"RequestEvent({self.name}, status={self.status}, total={self.total})"
+
+class _EndpointStats:
+    def __init__(self):
+        self.phases = {phase: Histogram() for phase in PHASES}
+        self.status = {}
+        self.count = 0
+        self.errors = 0
+        self.cached = 0
+        self.bytes = 0
+        self.remaining = None
+
+    def add(self,event):
+        self.count += 1
+        if event.error:
+            self.errors += 1
+        if event.cached:
+            self.cached += 1
+        if event.status is not None:
+            self.status[event.status] = self.status.get(event.status,0) + 1
+        if event.size:
+            self.bytes += event.size
+        if event.remaining is not None:
+            self.remaining = event.remaining
+        for phase,histogram in self.phases.items():
+            value = getattr(event,phase)
+            if value is not None:
+                histogram.observe(value)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "cached": self.cached,
+            "status": dict(self.status),
+            "bytes": self.bytes,
+            "remaining": self.remaining,
+            "latency": {phase: h.to_dict() for phase,h in self.phases.items() if h.count},
+        }
+
+class _SocketStats:
+    def __init__(self):
+        self.messages = 0
+        self.decode = Histogram()
+        self.callback = Histogram()
+        self.rate = Histogram(RATE_BUCKETS)
+        self.second = int(time.monotonic())
+        self.in_second = 0
+
+    def add(self,decode,callback):
+        now = int(time.monotonic())
+        if now != self.second:
+            # 1초 구간이 끝나면 그 구간의 메시지 수를 기록 (메시지가 없던 구간은 0)
+            self.rate.observe(self.in_second)
+            for _ in range(min(now - self.second - 1,60)):
+                self.rate.observe(0)
+            self.second = now
+            self.in_second = 0
+        self.in_second += 1
+        self.messages += 1
+        if decode is not None:
+            self.decode.observe(decode)
+        if callback is not None:
+            self.callback.observe(callback)
+
+    def to_dict(self):
+        return {
+            "messages": self.messages,
+            "decode": self.decode.to_dict(),
+            "callback": self.callback.to_dict(),
+            "rate": self.rate.to_dict(),
+        }
+
+class Instrumentation:
+    """요청/웹소켓 계측기. Upbit, AsyncUpbit, UpbitWebSocket, AsyncUpbitWebSocket 의 instrumentation 으로 사용
+
+    Example
+    -------
+    instrumentation = Instrumentation()
+    instrumentation.on_response(lambda event: print(event.name,event.total,event.remaining))
+    ub = Upbit(instrumentation=instrumentation)
+    ws = UpbitWebSocket(request,instrumentation=instrumentation)
+    instrumentation.snapshot()
+    instrumentation.start_http_server(9100)
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pre_hooks = []
+        self.post_hooks = []
+        self.endpoints = {}
+        self.sockets = {}
+        self.server = None
+
+    def on_request(self,hook):
+        """요청 전 hook(event) 호출. 데코레이터로 사용 가능"""
+        self.pre_hooks.append(hook)
+        return hook
+
+    def on_response(self,hook):
+        """요청 후(실패 및 캐시 응답 포함) hook(event) 호출. 데코레이터로 사용 가능"""
+        self.post_hooks.append(hook)
+        return hook
+
+    def start(self,name,method,api_path):
+        """요청 시작. RequestEvent 반환"""
+        event = RequestEvent(name,method,api_path)
+        for hook in self.pre_hooks:
+            hook(event)
+        return event
+
+    def finish(self,event):
+        """요청 종료. 히스토그램에 반영하고 훅 호출"""
+        event.total = time.perf_counter() - event.started
+        with self.lock:
+            stats = self.endpoints.get(event.name)
+            if stats is None:
+                stats = self.endpoints[event.name] = _EndpointStats()
+            stats.add(event)
+        for hook in self.post_hooks:
+            hook(event)
+
+    def message(self,socket,decode=None,callback=None):
+        """웹소켓 메시지 하나의 디코딩/콜백 시간(초) 반영"""
+        with self.lock:
+            stats = self.sockets.get(socket)
+            if stats is None:
+                stats = self.sockets[socket] = _SocketStats()
+            stats.add(decode,callback)
+
+    def trace_config(self):
+        """AsyncUpbit 세션에 넣는 aiohttp.TraceConfig (dns, connect 측정)"""
+        def started(phase):
+            async def callback(session,context,params):
+                event = context.trace_request_ctx
+                if isinstance(event,RequestEvent):
+                    setattr(event,phase,-time.perf_counter())
+            return callback
+
+        def ended(phase):
+            async def callback(session,context,params):
+                event = context.trace_request_ctx
+                if isinstance(event,RequestEvent) and getattr(event,phase) is not None:
+                    setattr(event,phase,getattr(event,phase) + time.perf_counter())
+            return callback
+
+        config = aiohttp.TraceConfig()
+        config.on_dns_resolvehost_start.append(started("dns"))
+        config.on_dns_resolvehost_end.append(ended("dns"))
+        config.on_connection_create_start.append(started("connect"))
+        config.on_connection_create_end.append(ended("connect"))
+        return config
+
+    def snapshot(self):
+        """수집한 값
+
+        Returns
+        -------
+        dict
+            requests ({메소드 이름: count, errors, cached, status, bytes, remaining, latency (단계별 히스토그램)}),
+            sockets ({웹소켓 이름: messages, decode, callback, rate (초당 메시지 수)})
+        """
+        with self.lock:
+            return {
+                "requests": {name: stats.to_dict() for name,stats in self.endpoints.items()},
+                "sockets": {name: stats.to_dict() for name,stats in self.sockets.items()},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+            self.sockets = {}
+
+    def prometheus(self,prefix="upbit"):
+        """Prometheus text 형식 (exposition format 0.0.4)"""
+        lines = []
+
+        def histogram(name,labels,h):
+            for bound,count in zip(h.bounds + (float("inf"),),_cumulate(h.counts)):
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {h.sum}")
+            lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+        with self.lock:
+            lines.append(f"# TYPE {prefix}_request_duration_seconds histogram")
+            for name,stats in self.endpoints.items():
+                for phase,h in stats.phases.items():
+                    if h.count:
+                        histogram(f"{prefix}_request_duration_seconds",f'endpoint="{name}",phase="{phase}"',h)
+            lines.append(f"# TYPE {prefix}_requests_total counter")
+            for name,stats in self.endpoints.items():
+                for status,count in stats.status.items():
+                    lines.append(f'{prefix}_requests_total{{endpoint="{name}",status="{status}"}} {count}')
+                lines.append(f'{prefix}_requests_total{{endpoint="{name}",status="cached"}} {stats.cached}')
+            lines.append(f"# TYPE {prefix}_request_errors_total counter")
+            for name,stats in self.endpoints.items():
+                lines.append(f'{prefix}_request_errors_total{{endpoint="{name}"}} {stats.errors}')
+            lines.append(f"# TYPE {prefix}_response_bytes_total counter")
+            for name,stats in self.endpoints.items():
+                lines.append(f'{prefix}_response_bytes_total{{endpoint="{name}"}} {stats.bytes}')
+            lines.append(f"# TYPE {prefix}_rate_limit_remaining gauge")
+            for name,stats in self.endpoints.items():
+                if stats.remaining is not None:
+                    lines.append(f'{prefix}_rate_limit_remaining{{endpoint="{name}"}} {stats.remaining}')
+            lines.append(f"# TYPE {prefix}_websocket_messages_total counter")
+            for name,stats in self.sockets.items():
+                lines.append(f'{prefix}_websocket_messages_total{{socket="{name}"}} {stats.messages}')
+            for metric,attribute in (("decode_seconds","decode"),("callback_seconds","callback"),
+                                     ("messages_per_second","rate")):
+                lines.append(f"# TYPE {prefix}_websocket_{metric} histogram")
+                for name,stats in self.sockets.items():
+                    histogram(f"{prefix}_websocket_{metric}",f'socket="{name}"',getattr(stats,attribute))
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self,port,addr="0.0.0.0"):
+        """prometheus() 를 http://addr:port/metrics 로 노출하는 서버를 백그라운드 스레드에서 시작"""
+        instrumentation = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self,format,*args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = instrumentation.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type","text/plain; version=0.0.4")
+                self.send_header("Content-Length",str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((addr,port),Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever,name="Instrumentation",daemon=True).start()
+        return self.server
+
+    def stop_http_server(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def add_otel(self,meter=None):
+        """요청 소요 시간과 응답 크기를 OpenTelemetry 히스토그램에도 기록
+
+        Parameters
+        ----------
+        meter : opentelemetry.metrics.Meter
+            비워서 요청시 opentelemetry.metrics.get_meter('upbit_wrapper')
+        """
+        if meter is None:
+            try:
+                from opentelemetry import metrics
+            except ImportError:
+                raise ImportError("add_otel requires opentelemetry-api (pip install opentelemetry-api)")
+            meter = metrics.get_meter("upbit_wrapper")
+        duration = meter.create_histogram("upbit.request.duration",unit="s",description="Upbit API request duration")
+        size = meter.create_histogram("upbit.response.size",unit="By",description="Upbit API response body size")
+
+        def record(event):
+            attributes = {"endpoint": event.name,"status": str(event.status),"cached": event.cached}
+            duration.record(event.total,attributes)
+            if event.size is not None:
+                size.record(event.size,attributes)
+
+        self.on_response(record)
+        return meter
+
+def _cumulate(counts):
+    total = 0
+    for count in counts:
+        total += count
+        yield total
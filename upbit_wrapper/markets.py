@@ -0,0 +1,225 @@
+"""마켓 목록(market_all)의 색인과 마켓 코드 <-> 정수 ID 테이블
+
+마켓 목록을 한 번 받아 기준 화폐, 기초 자산, 유의 종목 여부, 이름으로 바로 찾을 수 있게 색인하고,
+백그라운드 스레드에서 주기적으로 다시 받아 갱신함.
+색인은 갱신할 때마다 새로 만들어 한 번에 바꾸므로, 읽는 쪽은 잠금 없이 사용함
+"""
+import logging
+import sys
+import threading
+from collections import namedtuple
+
+# 마켓 목록 갱신 주기(초)
+DEFAULT_REFRESH_INTERVAL = 300.0
+NONE,CAUTION = "NONE","CAUTION"
+
+Market = namedtuple("Market",("id","code","quote","base","korean_name","english_name","warning"))
+
+def _warning(item):
+    """유의 종목 여부. market_warning 혹은 market_event.warning 필드 사용"""
+    warning = item.get("market_warning")
+    if warning is not None:
+        return warning
+    event = item.get("market_event")
+    if event and event.get("warning"):
+        return CAUTION
+    return NONE
+
+class _Index:
+    """한 시점의 마켓 목록과 색인"""
+    __slots__ = ("markets","quotes","bases","warnings","names")
+
+    def __init__(self,markets):
+        self.markets = markets
+        self.quotes = {}
+        self.bases = {}
+        self.warnings = {}
+        self.names = {}
+        for market in markets.values():
+            self.quotes.setdefault(market.quote,[]).append(market)
+            self.bases.setdefault(market.base,[]).append(market)
+            self.warnings.setdefault(market.warning,[]).append(market)
+            for name in (market.korean_name,market.english_name):
+                if name:
+                    self.names.setdefault(name.casefold(),[]).append(market)
+
+class MarketRegistry:
+    """마켓 목록을 색인하고 주기적으로 갱신하는 객체
+
+    마켓 ID 는 처음 본 순서대로 0 부터 부여하며, 상장 폐지된 마켓도 ID 를 유지하므로
+    ID 로 만든 배열(ex. 마켓별 가격 배열)은 갱신 후에도 그대로 사용할 수 있음
+
+    Parameters
+    ----------
+    ub : Upbit
+        마켓 목록을 조회할 Upbit 객체. None 인 경우 update() 로 직접 넣음 (ex. AsyncUpbit 결과)
+    refresh_interval : float
+        start() 이후 마켓 목록 갱신 주기(초). None 인 경우 갱신하지 않음
+    callback : callable
+        갱신한 목록이 이전과 다르면 callback(added, removed) 호출 (마켓 코드 목록). 처음 받은 목록에는 호출하지 않음
+
+    Example
+    -------
+    with MarketRegistry(Upbit()) as registry:
+        registry.by_quote('KRW')
+        registry.warnings()
+        registry.find('비트코인')
+        registry.id('KRW-BTC'), registry.code(0)
+    """
+    def __init__(self,ub=None,refresh_interval=DEFAULT_REFRESH_INTERVAL,callback=None):
+        self.logger = logging.getLogger("MarketRegistry")
+        self.ub = ub
+        self.refresh_interval = refresh_interval if ub is not None else None
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.index = _Index({})
+        self.ids = {}
+        self.codes = []
+        self.refreshes = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.stop()
+
+    def __len__(self):
+        return len(self.index.markets)
+
+    def __iter__(self):
+        return iter(list(self.index.markets.values()))
+
+    def __contains__(self,code):
+        return code in self.index.markets
+
+    def __getitem__(self,code):
+        return self.index.markets[code]
+
+    def get(self,code,default=None):
+        """마켓 코드로 Market 조회"""
+        return self.index.markets.get(code,default)
+
+    def start(self):
+        """마켓 목록을 받고 refresh_interval 마다 갱신하는 스레드 시작. ub 가 None 인 경우 아무것도 하지 않음"""
+        if self.ub is None:
+            return
+        if not self.refresh():
+            raise RuntimeError("failed to fetch markets")
+        if self.refresh_interval and self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.__watch,name="MarketRegistry",daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """갱신 스레드 종료"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(5)
+            self.thread = None
+
+    def __watch(self):
+        while not self.stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"refresh failed reason : {e}")
+
+    def refresh(self):
+        """ub.market_all(isDetails='true') 로 목록을 다시 받아 색인 갱신
+
+        Returns
+        -------
+        bool
+            성공 여부. 실패 시(혹은 ub 가 None 인 경우) 이전 목록을 유지함
+        """
+        if self.ub is None:
+            return False
+        items = self.ub.market_all(isDetails="true")
+        if items is False:
+            self.logger.error("refresh() failed")
+            return False
+        self.update(items)
+        return True
+
+    def update(self,items):
+        """market_all 응답으로 색인 갱신
+
+        Parameters
+        ----------
+        items : list
+            market_all 응답
+
+        Returns
+        -------
+        tuple
+            (추가된 마켓 코드, 삭제된 마켓 코드)
+        """
+        with self.lock:
+            markets = {}
+            for item in items:
+                code = sys.intern(item["market"])
+                quote,_,base = code.partition("-")
+                markets[code] = Market(
+                    self.__intern(code),code,sys.intern(quote),sys.intern(base),
+                    item.get("korean_name"),item.get("english_name"),_warning(item))
+            before = self.index.markets
+            self.index = _Index(markets)
+            self.refreshes += 1
+        added = [code for code in markets if code not in before]
+        removed = [code for code in before if code not in markets]
+        if (added or removed) and before:
+            self.logger.info("markets added %s removed %s",added,removed)
+        # 처음 받은 목록은 상장/폐지가 아니므로 알리지 않음
+        if self.callback is not None and before and (added or removed):
+            self.callback(added,removed)
+        return added,removed
+
+    def __intern(self,code):
+        market_id = self.ids.get(code)
+        if market_id is None:
+            market_id = self.ids[code] = len(self.codes)
+            self.codes.append(code)
+        return market_id
+
+    def id(self,code):
+        """마켓 코드의 정수 ID. 처음 보는 코드는 새 ID 를 부여함"""
+        market_id = self.ids.get(code)
+        if market_id is None:
+            with self.lock:
+                market_id = self.__intern(sys.intern(code))
+        return market_id
+
+    def code(self,market_id):
+        """정수 ID 의 마켓 코드"""
+        return self.codes[market_id]
+
+    def table(self):
+        """ID 순서의 마켓 코드 목록 (codes[id] == code)"""
+        return tuple(self.codes)
+
+    def markets(self):
+        """상장된 마켓 코드 목록"""
+        return list(self.index.markets)
+
+    def by_quote(self,quote):
+        """기준 화폐(KRW, BTC, USDT)의 마켓 목록"""
+        return list(self.index.quotes.get(quote,()))
+
+    def by_base(self,base):
+        """기초 자산(BTC, ETH 등)의 마켓 목록"""
+        return list(self.index.bases.get(base,()))
+
+    def warnings(self,warning=CAUTION):
+        """유의 종목(market_warning 이 warning 인) 마켓 목록"""
+        return list(self.index.warnings.get(warning,()))
+
+    def find(self,name):
+        """한글/영문 이름(대소문자 구분 없음)이 같은 마켓 목록"""
+        return list(self.index.names.get(name.casefold(),()))
+
+    def stats(self):
+        """markets (상장 마켓 수), ids (부여한 ID 수), refreshes"""
+        return {"markets": len(self.index.markets),"ids": len(self.codes),"refreshes": self.refreshes}
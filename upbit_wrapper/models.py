@@ -0,0 +1,182 @@
+"""시세 응답 및 웹소켓 메시지용 __slots__ 객체
+
+dict 대신 필요한 필드만 __slots__ 에 저장하여 많은 메시지를 메모리에 들고 있을 때의 비용을 줄임.
+REST 응답, 웹소켓 DEFAULT 형식과 SIMPLE 형식("format":"SIMPLE")의 축약 키를 모두 지원함
+"""
+import json
+from array import array
+
+def _keys(fields):
+    """(REST 키, 웹소켓 키, SIMPLE 키) 목록 생성. 마켓 코드는 REST 에서 market, 웹소켓에서 code"""
+    rest = tuple(key for _,key,_ in fields)
+    websocket = tuple("code" if key == "market" else key for key in rest)
+    simple = tuple(simple or key for _,key,simple in fields)
+    return rest,websocket,simple
+
+def _select(keys,data):
+    if "ty" in data:
+        return keys[2]
+    if "code" in data:
+        return keys[1]
+    return keys[0]
+
+class _Model:
+    """필드 목록(FIELDS)으로 정의되는 객체의 공통 동작"""
+    __slots__ = ()
+    FIELDS = ()
+    KEYS = ((),(),())
+
+    def __init__(self,*values):
+        for name,value in zip(self.__slots__,values):
+            setattr(self,name,value)
+
+    @classmethod
+    def from_dict(cls,data):
+        """디코딩된 응답(dict)으로 객체 생성. 없는 필드는 None"""
+        return cls(*map(data.get,_select(cls.KEYS,data)))
+
+    @classmethod
+    def from_records(cls,records):
+        return [cls.from_dict(record) for record in records]
+
+    def to_dict(self):
+        """REST 응답과 같은 키를 가진 dict 로 변환"""
+        return {key: getattr(self,name) for name,key,_ in self.FIELDS}
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self,name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def __eq__(self,other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self,name) == getattr(other,name) for name in self.__slots__)
+
+class Ticker(_Model):
+    """현재가 정보"""
+    FIELDS = (
+        ("market","market","cd"),
+        ("trade_price","trade_price","tp"),
+        ("opening_price","opening_price","op"),
+        ("high_price","high_price","hp"),
+        ("low_price","low_price","lp"),
+        ("prev_closing_price","prev_closing_price","pcp"),
+        ("change","change","c"),
+        ("change_price","change_price","cp"),
+        ("change_rate","change_rate","cr"),
+        ("signed_change_rate","signed_change_rate","scr"),
+        ("trade_volume","trade_volume","tv"),
+        ("acc_trade_volume","acc_trade_volume","atv"),
+        ("acc_trade_volume_24h","acc_trade_volume_24h","atv24h"),
+        ("acc_trade_price","acc_trade_price","atp"),
+        ("acc_trade_price_24h","acc_trade_price_24h","atp24h"),
+        ("trade_timestamp","trade_timestamp","ttms"),
+        ("timestamp","timestamp","tms"),
+    )
+    __slots__ = tuple(name for name,_,_ in FIELDS)
+    KEYS = _keys(FIELDS)
+
+class Trade(_Model):
+    """체결"""
+    FIELDS = (
+        ("market","market","cd"),
+        ("trade_price","trade_price","tp"),
+        ("trade_volume","trade_volume","tv"),
+        ("ask_bid","ask_bid","ab"),
+        ("prev_closing_price","prev_closing_price","pcp"),
+        ("change_price","change_price","cp"),
+        ("trade_timestamp","trade_timestamp","ttms"),
+        ("timestamp","timestamp","tms"),
+        ("sequential_id","sequential_id","sid"),
+    )
+    __slots__ = tuple(name for name,_,_ in FIELDS)
+    KEYS = _keys(FIELDS)
+
+class Candle(_Model):
+    """캔들 (REST 응답)"""
+    FIELDS = (
+        ("market","market",None),
+        ("candle_date_time_utc","candle_date_time_utc",None),
+        ("opening_price","opening_price",None),
+        ("high_price","high_price",None),
+        ("low_price","low_price",None),
+        ("trade_price","trade_price",None),
+        ("candle_acc_trade_price","candle_acc_trade_price",None),
+        ("candle_acc_trade_volume","candle_acc_trade_volume",None),
+        ("timestamp","timestamp",None),
+    )
+    __slots__ = tuple(name for name,_,_ in FIELDS)
+    KEYS = _keys(FIELDS)
+
+class OrderbookSnapshot(_Model):
+    """호가 스냅샷. 호가 단위는 가까운 호가부터 array('d') 에 저장"""
+    FIELDS = (
+        ("market","market","cd"),
+        ("timestamp","timestamp","tms"),
+        ("total_ask_size","total_ask_size","tas"),
+        ("total_bid_size","total_bid_size","tbs"),
+    )
+    __slots__ = tuple(name for name,_,_ in FIELDS) + ("ask_prices","ask_sizes","bid_prices","bid_sizes")
+    KEYS = _keys(FIELDS)
+    UNIT_KEYS = (
+        ("orderbook_units","ask_price","ask_size","bid_price","bid_size"),
+        ("obu","ap","as","bp","bs"),
+    )
+
+    @classmethod
+    def from_dict(cls,data):
+        units_key,ask_price,ask_size,bid_price,bid_size = cls.UNIT_KEYS["ty" in data]
+        units = data.get(units_key) or ()
+        return cls(
+            *map(data.get,_select(cls.KEYS,data)),
+            array("d",[unit[ask_price] for unit in units]),
+            array("d",[unit[ask_size] for unit in units]),
+            array("d",[unit[bid_price] for unit in units]),
+            array("d",[unit[bid_size] for unit in units]),
+        )
+
+    def to_dict(self):
+        data = super().to_dict()
+        data["orderbook_units"] = [
+            {"ask_price": ap,"bid_price": bp,"ask_size": asz,"bid_size": bsz}
+            for ap,bp,asz,bsz in zip(self.ask_prices,self.bid_prices,self.ask_sizes,self.bid_sizes)
+        ]
+        return data
+
+# 웹소켓 메시지 type 별 객체
+MESSAGE_TYPES = {
+    "ticker": Ticker,
+    "trade": Trade,
+    "orderbook": OrderbookSnapshot,
+}
+
+def from_message(msg):
+    """웹소켓 메시지(dict)를 type 에 맞는 객체로 변환. 알 수 없는 메시지는 그대로 반환
+
+    Example
+    -------
+    from_message({'ty': 'trade','cd': 'KRW-BTC','tp': 1.0,'tv': 0.1,'sid': 1})
+    """
+    if not isinstance(msg,dict):
+        return msg
+    model = MESSAGE_TYPES.get(msg.get("type",msg.get("ty")))
+    return msg if model is None else model.from_dict(msg)
+
+class ModelDecoder:
+    """응답 본문(json 배열)을 객체 리스트로 변환하는 디코더
+
+    Parameters
+    ----------
+    model : type
+        Ticker, Trade, Candle, OrderbookSnapshot
+    """
+    __slots__ = ("model",)
+
+    def __init__(self,model):
+        self.model = model
+
+    def __call__(self,content):
+        return self.model.from_records(json.loads(content))
+
+    def from_records(self,records):
+        return self.model.from_records(records)
@@ -0,0 +1,335 @@
+"""호가 스트림으로 유지하는 로컬 호가창
+
+numpy 가 필요함 (pip install upbit-wrapper[columnar])
+호가를 미리 할당한 배열에 덮어쓰고,
+최우선 호가, 누적 잔량, 체결 평균가(VWAP), 잔량 불균형을 새 객체 생성 없이 계산함
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from upbit_wrapper.models import OrderbookSnapshot
+
+# 호가 단위별 열 순서
+ASK_PRICE,BID_PRICE,ASK_SIZE,BID_SIZE = range(4)
+
+# (호가 목록 키, 매도 호가, 매수 호가, 매도 잔량, 매수 잔량). SIMPLE 형식은 축약 키
+UNIT_KEYS = (
+    ("orderbook_units","ask_price","bid_price","ask_size","bid_size"),
+    ("obu","ap","bp","as","bs"),
+)
+
+# side 별 (호가 열, 누적 잔량 열)
+SIDES = {"ask": (ASK_PRICE,0),"bid": (BID_PRICE,1)}
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("OrderBook requires numpy (pip install upbit-wrapper[columnar])")
+
+def _market(msg):
+    if isinstance(msg,OrderbookSnapshot):
+        return msg.market
+    return msg.get("code") or msg.get("cd") or msg.get("market")
+
+def _is_orderbook(msg):
+    if isinstance(msg,OrderbookSnapshot):
+        return True
+    if not isinstance(msg,dict):
+        return False
+    kind = msg.get("type",msg.get("ty"))
+    return kind == "orderbook" or (kind is None and "orderbook_units" in msg)
+
+class OrderBook:
+    """한 마켓의 호가창
+
+    호가는 (depth, 4) 배열에 호가 단위별 (매도 호가, 매수 호가, 매도 잔량, 매수 잔량) 순으로 저장함.
+    호가 개수가 적어 numpy 호출 비용이 크므로 갱신과 단건 조회는 같은 메모리의 memoryview 로 처리하고,
+    누적 잔량 배열은 depth() 호출 시 한 번만 계산함
+
+    Parameters
+    ----------
+    market : str
+        마켓 코드
+    depth : int
+        저장할 최대 호가 개수
+
+    Example
+    -------
+    book = OrderBook('KRW-BTC')
+    book.apply(ub.orderbook(markets='KRW-BTC')[0])
+    book.spread, book.vwap('ask',0.5), book.imbalance(5)
+    """
+    __slots__ = ("market","max_depth","levels","timestamp","updates","data","view","cumulative","dirty")
+
+    def __init__(self,market,depth=30,data=None):
+        _require_numpy()
+        self.market = market
+        self.max_depth = depth
+        self.levels = 0
+        self.timestamp = None
+        self.updates = 0
+        self.cumulative = np.zeros((depth,2))
+        self.dirty = False
+        self.bind(np.zeros((depth,4)) if data is None else data)
+
+    def bind(self,data):
+        """(depth, 4) 배열을 저장 공간으로 사용"""
+        self.data = data
+        self.view = memoryview(data.reshape(-1))
+
+    def apply(self,msg):
+        """호가 스냅샷을 반영
+
+        Parameters
+        ----------
+        msg : dict or OrderbookSnapshot
+            웹소켓 orderbook 메시지 (DEFAULT/SIMPLE) 혹은 REST orderbook 응답의 한 항목
+
+        Returns
+        -------
+        OrderBook
+            자기 자신
+        """
+        view = self.view
+        if isinstance(msg,OrderbookSnapshot):
+            levels = min(len(msg.ask_prices),self.max_depth)
+            end = 4 * levels
+            view[ASK_PRICE:end:4] = msg.ask_prices[:levels]
+            view[BID_PRICE:end:4] = msg.bid_prices[:levels]
+            view[ASK_SIZE:end:4] = msg.ask_sizes[:levels]
+            view[BID_SIZE:end:4] = msg.bid_sizes[:levels]
+            self.timestamp = msg.timestamp
+        else:
+            units_key,ask_price,bid_price,ask_size,bid_size = UNIT_KEYS["ty" in msg]
+            units = msg[units_key][:self.max_depth]
+            levels = len(units)
+            # 호가 개수가 적어 배열 변환 없이 원소 단위로 쓰는 것이 가장 빠름
+            index = 0
+            for unit in units:
+                view[index] = unit[ask_price]
+                view[index + 1] = unit[bid_price]
+                view[index + 2] = unit[ask_size]
+                view[index + 3] = unit[bid_size]
+                index += 4
+            self.timestamp = msg.get("timestamp",msg.get("tms"))
+        if levels < self.levels:
+            # 호가 개수가 줄어든 경우 이전 호가가 남지 않도록 비움
+            self.data[levels:self.levels] = 0
+        self.levels = levels
+        self.updates += 1
+        self.dirty = True
+        return self
+
+    def __len__(self):
+        return self.levels
+
+    def __repr__(self):
+        return f"OrderBook({self.market}, bid={self.best_bid}, ask={self.best_ask}, levels={self.levels})"
+
+    @property
+    def best_ask(self):
+        return self.view[ASK_PRICE] if self.levels else None
+
+    @property
+    def best_bid(self):
+        return self.view[BID_PRICE] if self.levels else None
+
+    @property
+    def spread(self):
+        return self.view[ASK_PRICE] - self.view[BID_PRICE] if self.levels else None
+
+    @property
+    def mid(self):
+        return (self.view[ASK_PRICE] + self.view[BID_PRICE]) / 2 if self.levels else None
+
+    def top(self):
+        """최우선 호가
+
+        Returns
+        -------
+        tuple
+            (매수 호가, 매수 잔량, 매도 호가, 매도 잔량). 호가가 없으면 None
+        """
+        if not self.levels:
+            return None
+        view = self.view
+        return view[BID_PRICE],view[BID_SIZE],view[ASK_PRICE],view[ASK_SIZE]
+
+    def prices(self,side):
+        """side('ask' 혹은 'bid') 의 호가 배열 (가까운 호가부터)"""
+        return self.data[:self.levels,SIDES[side][0]]
+
+    def sizes(self,side):
+        """side('ask' 혹은 'bid') 의 잔량 배열"""
+        return self.data[:self.levels,SIDES[side][0] + 2]
+
+    def __cumulate(self):
+        if self.dirty:
+            np.cumsum(self.data[:self.levels,ASK_SIZE:],axis=0,out=self.cumulative[:self.levels])
+            self.dirty = False
+        return self.cumulative
+
+    def depth(self,side,levels=None):
+        """side('ask' 혹은 'bid') 의 누적 잔량 배열
+
+        Parameters
+        ----------
+        levels : int
+            누적할 호가 개수. 비워서 요청시 전체
+        """
+        levels = self.levels if levels is None else min(levels,self.levels)
+        return self.__cumulate()[:levels,SIDES[side][1]]
+
+    def vwap(self,side,size):
+        """size 만큼 체결시킬 때의 평균 가격
+
+        Parameters
+        ----------
+        side : str
+            'ask' (매수 시 매도 호가를 소진) 혹은 'bid' (매도 시 매수 호가를 소진)
+        size : float
+            체결 수량
+
+        Returns
+        -------
+        float
+            평균 체결 가격. size 가 0 이면 최우선 호가. 호가창의 잔량이 모자라면 None
+        """
+        view = self.view
+        if size <= 0:
+            return view[SIDES[side][0]] if self.levels else None
+        remaining = size
+        notional = 0.0
+        for index in range(SIDES[side][0],4 * self.levels,4):
+            available = view[index + 2]
+            if available >= remaining:
+                return (notional + view[index] * remaining) / size
+            notional += view[index] * available
+            remaining -= available
+        return None
+
+    def imbalance(self,levels=None):
+        """잔량 불균형 (매수 잔량 - 매도 잔량) / (매수 잔량 + 매도 잔량)
+
+        Parameters
+        ----------
+        levels : int
+            계산에 사용할 호가 개수. 비워서 요청시 전체
+
+        Returns
+        -------
+        float
+            -1 ~ 1. 호가가 없으면 None
+        """
+        levels = self.levels if levels is None else min(levels,self.levels)
+        if not levels:
+            return None
+        ask = sum(self.view[ASK_SIZE:4 * levels:4])
+        bid = sum(self.view[BID_SIZE:4 * levels:4])
+        total = bid + ask
+        return (bid - ask) / total if total else 0.0
+
+class OrderBooks:
+    """여러 마켓의 호가창
+
+    모든 마켓의 호가를 하나의 (마켓, depth, 4) 배열에 저장하여 마켓 간 비교를 배열 연산으로 처리함
+
+    Parameters
+    ----------
+    depth : int
+        마켓 당 저장할 최대 호가 개수
+    capacity : int
+        처음 할당할 마켓 개수. 넘으면 두 배로 늘림
+
+    Example
+    -------
+    books = OrderBooks()
+    ws = UpbitWebSocket(request,callback=books.apply)
+    books['KRW-BTC'].vwap('ask',1.0)
+    books.spreads()
+    """
+    def __init__(self,depth=30,capacity=256):
+        _require_numpy()
+        self.max_depth = depth
+        self.books = {}
+        self.index = []
+        self.data = np.zeros((capacity,depth,4))
+
+    def __getitem__(self,market):
+        return self.books[market]
+
+    def __contains__(self,market):
+        return market in self.books
+
+    def __len__(self):
+        return len(self.books)
+
+    def __iter__(self):
+        return iter(self.books.values())
+
+    @property
+    def markets(self):
+        """배열의 행 순서와 같은 마켓 코드 목록"""
+        return list(self.index)
+
+    def book(self,market):
+        """market 의 호가창. 없으면 생성"""
+        book = self.books.get(market)
+        if book is None:
+            row = len(self.index)
+            if row == len(self.data):
+                self.__grow()
+            book = OrderBook(market,self.max_depth,self.data[row])
+            self.books[market] = book
+            self.index.append(market)
+        return book
+
+    def __grow(self):
+        capacity = len(self.data) * 2
+        data = np.zeros((capacity,self.max_depth,4))
+        data[:len(self.data)] = self.data
+        self.data = data
+        for row,market in enumerate(self.index):
+            self.books[market].bind(data[row])
+
+    def apply(self,msg):
+        """호가 메시지를 해당 마켓의 호가창에 반영. 호가 메시지가 아니면 무시
+
+        Parameters
+        ----------
+        msg : dict or OrderbookSnapshot or list
+            웹소켓 orderbook 메시지 혹은 REST orderbook 응답
+
+        Returns
+        -------
+        OrderBook
+            갱신된 호가창. 호가 메시지가 아니면 None
+        """
+        if isinstance(msg,list):
+            for item in msg:
+                self.apply(item)
+            return None
+        if not _is_orderbook(msg):
+            return None
+        return self.book(_market(msg)).apply(msg)
+
+    def best_asks(self):
+        """markets 순서의 최우선 매도 호가 배열"""
+        return self.data[:len(self.index),0,ASK_PRICE]
+
+    def best_bids(self):
+        """markets 순서의 최우선 매수 호가 배열"""
+        return self.data[:len(self.index),0,BID_PRICE]
+
+    def spreads(self):
+        """markets 순서의 스프레드 배열"""
+        return self.best_asks() - self.best_bids()
+
+    def imbalances(self,levels):
+        """markets 순서의 levels 호가까지의 잔량 불균형 배열"""
+        count = len(self.index)
+        bid = self.data[:count,:levels,BID_SIZE].sum(axis=1)
+        ask = self.data[:count,:levels,ASK_SIZE].sum(axis=1)
+        total = bid + ask
+        return np.divide(bid - ask,total,out=np.zeros(count),where=total > 0)
@@ -0,0 +1,50 @@
+"""page/limit 로 나누어 조회하는 목록 API(lists_orders, withdraws, deposits)의 순회 도구"""
+from upbit_wrapper.candles import parse_time
+
+# 한 페이지에 요청할 최대 개수
+PAGE_LIMIT = 100
+
+def page_query(kwargs):
+    """키워드 인자를 (page 를 뺀 쿼리, 시작 page, limit) 로 나눔"""
+    query = dict(kwargs)
+    page = int(query.pop("page",1))
+    query.setdefault("limit",PAGE_LIMIT)
+    return query,page,int(query["limit"])
+
+class PageBounds:
+    """since/until/stop 조건으로 항목을 거르고 순회를 멈출 시점을 판단
+
+    목록은 created_at 기준 정렬(order_by, 기본 desc)되어 있으므로,
+    desc 는 since 보다 오래된 항목을, asc 는 until 보다 새로운 항목을 만나면 이후 항목도 범위 밖이므로 멈춤
+
+    Parameters
+    ----------
+    since : datetime or str or int
+        이 시각 이후(포함)에 생성된 항목만
+    until : datetime or str or int
+        이 시각 이전(포함)에 생성된 항목만
+    stop : callable
+        stop(item) 이 True 인 항목을 만나면 (그 항목을 포함하지 않고) 멈춤
+    order_by : str
+        'desc' 혹은 'asc'
+    """
+    __slots__ = ("since","until","stop","ascending")
+
+    def __init__(self,since=None,until=None,stop=None,order_by=None):
+        self.since = None if since is None else parse_time(since)
+        self.until = None if until is None else parse_time(until)
+        self.stop = stop
+        self.ascending = order_by == "asc"
+
+    def check(self,item):
+        """True: 반환, False: 건너뜀, None: 순회 종료"""
+        if self.stop is not None and self.stop(item):
+            return None
+        if self.since is None and self.until is None:
+            return True
+        created = parse_time(item["created_at"])
+        if self.since is not None and created < self.since:
+            return False if self.ascending else None
+        if self.until is not None and created > self.until:
+            return None if self.ascending else False
+        return True
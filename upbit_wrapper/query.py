@@ -0,0 +1,54 @@
+"""요청 파라미터를 쿼리 스트링(bytes)으로 인코딩
+
+JWT 의 query_hash 와 요청 params 에 같은 bytes 를 넘겨, 해시한 쿼리와 보낸 쿼리가 어긋나지 않도록 함.
+AsyncUpbit 은 이 bytes 를 그대로 보내며, Upbit(requests/urllib3)은 보낼 때 배열 키의 [] 를 %5B%5D 로 인코딩함.
+서버는 쿼리를 디코딩한 뒤 해시를 비교하므로 두 경우 모두 해시한 쿼리와 같음
+"""
+import re
+from urllib.parse import quote_plus
+
+# 인코딩이 필요 없는 문자열 (uuid, 마켓 코드, 숫자 등 대부분의 값)
+_safe = re.compile(r"[A-Za-z0-9_.~-]*").fullmatch
+
+def _text(value):
+    return value.decode() if isinstance(value,bytes) else str(value)
+
+def _quote(value):
+    if not isinstance(value,(str,bytes)):
+        value = str(value)
+    if isinstance(value,str) and _safe(value):
+        return value
+    return quote_plus(value)
+
+def build_query(params):
+    """파라미터를 한 번에 쿼리 스트링으로 인코딩
+
+    값은 urlencode 와 같이 인코딩하며, list/tuple 값은 배열 파라미터(key[]=value 반복)로 인코딩함
+
+    Parameters
+    ----------
+    params : dict
+        요청 파라미터
+
+    Returns
+    -------
+    bytes
+        쿼리 스트링. query_hash 와 요청 params 에 그대로 사용 (배열 키의 [] 는 인코딩하지 않은 형태)
+
+    Example
+    -------
+    build_query({'state': 'done','uuids': ['a','b']})  # b'state=done&uuids[]=a&uuids[]=b'
+    """
+    parts = []
+    for key,value in params.items():
+        key = _quote(key)
+        if isinstance(value,(list,tuple)):
+            if not value:
+                continue
+            items = [item if isinstance(item,str) else _text(item) for item in value]
+            if not _safe("".join(items)):
+                items = [_quote(item) for item in items]
+            parts.append(f"{key}[]=" + f"&{key}[]=".join(items))
+        else:
+            parts.append(f"{key}={_quote(value)}")
+    return "&".join(parts).encode()
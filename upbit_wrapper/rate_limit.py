@@ -0,0 +1,240 @@
+import asyncio
+import threading
+import time
+
+# 응답을 받기 전까지 사용하는 경로별 기본 그룹
+# https://docs.upbit.com/docs/user-request-guide
+DEFAULT_GROUPS = (
+    ("POST","/v1/orders","order"),
+    (None,"/v1/market","market"),
+    (None,"/v1/candles","candles"),
+    (None,"/v1/trades","crix-trades"),
+    (None,"/v1/ticker","ticker"),
+    (None,"/v1/orderbook","orderbook"),
+)
+
+def parse_remaining_req(value):
+    """Remaining-Req 헤더 파싱
+
+    Parameters
+    ----------
+    value : str
+        Remaining-Req 헤더 값
+
+    Returns
+    -------
+    tuple
+        (group, min, sec). min 이 없는 경우 None
+
+    Example
+    -------
+    parse_remaining_req('group=default; min=1799; sec=29')
+    """
+    fields = {}
+    for item in value.split(";"):
+        key,_,val = item.strip().partition("=")
+        fields[key] = val
+    group = fields.get("group","default")
+    remaining_min = int(fields["min"]) if fields.get("min") else None
+    remaining_sec = int(fields["sec"]) if fields.get("sec") else None
+    return group,remaining_min,remaining_sec
+
+class _Window:
+    """고정 길이 윈도우 하나의 남은 요청 수"""
+    __slots__ = ("length","capacity","remaining","reset_at")
+
+    def __init__(self,length):
+        self.length = length
+        self.capacity = None
+        self.remaining = None
+        self.reset_at = 0.0
+
+    def take(self,now):
+        """토큰 하나를 소비하고 0, 토큰이 없으면 기다려야 할 시간 반환"""
+        if now >= self.reset_at:
+            self.remaining = self.capacity
+            self.reset_at = now + self.length
+        if self.remaining is None:
+            return 0.0
+        if self.remaining > 0:
+            self.remaining -= 1
+            return 0.0
+        return self.reset_at - now
+
+    def update(self,now,remaining):
+        """서버가 알려준 남은 요청 수 반영"""
+        if remaining is None:
+            return
+        if self.capacity is None or remaining + 1 > self.capacity:
+            self.capacity = remaining + 1
+        if now >= self.reset_at or self.remaining is None:
+            self.remaining = remaining
+            self.reset_at = now + self.length
+        else:
+            self.remaining = min(self.remaining,remaining)
+
+    def exhaust(self,now):
+        self.remaining = 0
+        self.reset_at = max(self.reset_at,now + self.length)
+
+class _Bucket:
+    """그룹 하나의 초/분 단위 토큰 버킷 및 대기 통계"""
+    __slots__ = ("sec","min","throttled","throttled_seconds")
+
+    def __init__(self):
+        self.sec = _Window(1.0)
+        self.min = _Window(60.0)
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def take(self,now):
+        wait = self.min.take(now)
+        if wait > 0:
+            return wait
+        wait = self.sec.take(now)
+        if wait > 0:
+            # 초 단위 토큰이 없으면 분 단위 토큰도 돌려줌
+            if self.min.remaining is not None:
+                self.min.remaining += 1
+        return wait
+
+class RateLimiter:
+    """Remaining-Req 헤더 기반 요청 수 제한기
+
+    그룹(order, default, market, candles, crix-trades, ...) 별 토큰 버킷을 유지하고,
+    남은 요청 수가 없으면 요청을 보내기 전에 대기함. 스레드 안전하며 여러 Upbit 객체가 공유할 수 있음
+
+    Example
+    -------
+    limiter = RateLimiter.shared('access_key')
+    ub1 = Upbit('access_key','secret_key',rate_limiter=limiter)
+    ub2 = Upbit('access_key','secret_key',rate_limiter=limiter)
+    limiter.stats()
+    """
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.groups = {}
+
+    @classmethod
+    def shared(cls,key=None):
+        """key(access_key) 별로 공유되는 RateLimiter 반환
+
+        Parameters
+        ----------
+        key : str
+            API access key. 공개 API 만 사용하는 경우 None
+        """
+        with cls._registry_lock:
+            limiter = cls._registry.get(key)
+            if limiter is None:
+                limiter = cls._registry[key] = cls()
+            return limiter
+
+    def group_of(self,method,api_path):
+        """요청이 속한 그룹 반환. 응답으로 확인된 그룹이 없으면 경로로 추정"""
+        group = self.groups.get((method,api_path))
+        if group is not None:
+            return group
+        for group_method,prefix,group in DEFAULT_GROUPS:
+            if (group_method is None or group_method == method) and api_path.startswith(prefix):
+                return group
+        return "default"
+
+    def __bucket(self,group):
+        bucket = self.buckets.get(group)
+        if bucket is None:
+            bucket = self.buckets[group] = _Bucket()
+        return bucket
+
+    def __take(self,group):
+        with self.lock:
+            return self.__bucket(group).take(time.monotonic())
+
+    def __record(self,group,waited):
+        with self.lock:
+            bucket = self.__bucket(group)
+            bucket.throttled += 1
+            bucket.throttled_seconds += waited
+
+    def acquire(self,method,api_path):
+        """요청을 보낼 수 있을 때까지 대기
+
+        Returns
+        -------
+        float
+            대기한 시간(초)
+        """
+        group = self.group_of(method,api_path)
+        waited = 0.0
+        wait = self.__take(group)
+        while wait > 0:
+            time.sleep(wait)
+            waited += wait
+            wait = self.__take(group)
+        if waited:
+            self.__record(group,waited)
+        return waited
+
+    async def acquire_async(self,method,api_path):
+        """acquire 의 비동기 버전"""
+        group = self.group_of(method,api_path)
+        waited = 0.0
+        wait = self.__take(group)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            waited += wait
+            wait = self.__take(group)
+        if waited:
+            self.__record(group,waited)
+        return waited
+
+    def update(self,method,api_path,remaining_req,status=200):
+        """응답의 Remaining-Req 헤더 및 상태 코드 반영
+
+        Parameters
+        ----------
+        remaining_req : str
+            Remaining-Req 헤더 값 (없으면 None)
+        status : int
+            응답 상태 코드. 429 인 경우 해당 그룹의 초 단위 토큰을 소진 처리
+        """
+        now = time.monotonic()
+        if remaining_req:
+            group,remaining_min,remaining_sec = parse_remaining_req(remaining_req)
+            self.groups[(method,api_path)] = group
+        else:
+            group,remaining_min,remaining_sec = self.group_of(method,api_path),None,None
+        with self.lock:
+            bucket = self.__bucket(group)
+            bucket.min.update(now,remaining_min)
+            bucket.sec.update(now,remaining_sec)
+            if status == 429:
+                bucket.sec.exhaust(now)
+
+    def stats(self):
+        """그룹별 남은 요청 수 및 대기 통계
+
+        Returns
+        -------
+        dict
+            {"throttled": 대기 횟수, "throttled_seconds": 대기 시간, "groups": {group: {...}}}
+        """
+        with self.lock:
+            groups = {
+                group: {
+                    "remaining_sec": bucket.sec.remaining,
+                    "remaining_min": bucket.min.remaining,
+                    "throttled": bucket.throttled,
+                    "throttled_seconds": bucket.throttled_seconds,
+                }
+                for group,bucket in self.buckets.items()
+            }
+        return {
+            "throttled": sum(group["throttled"] for group in groups.values()),
+            "throttled_seconds": sum(group["throttled_seconds"] for group in groups.values()),
+            "groups": groups,
+        }
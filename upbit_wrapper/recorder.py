@@ -0,0 +1,295 @@
+"""웹소켓 프레임과 REST 응답의 기록/재생
+
+api.upbit.com 없이 벤치마크와 백테스트를 재현할 수 있도록, 받은 원본 프레임과 응답 본문을 시각과 함께
+추가 전용(append-only) 파일에 기록하고, 기록한 파일로 로컬 웹소켓/HTTP 서버를 띄워 그대로 재생함
+
+파일 형식은 MAGIC 이후 (kind, timestamp, key 길이, payload 길이) 헤더와 key, payload 가 반복됨.
+파일 이름이 .gz 로 끝나면 gzip, .zst 로 끝나면 zstd 로 압축함 (zstd 는 pip install zstandard 필요)
+"""
+import asyncio
+import gzip
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from collections import namedtuple
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+MAGIC = b"UPBREC1\n"
+FRAME,RESPONSE = 1,2
+# (kind, timestamp(epoch 초), key 길이, payload 길이)
+ENTRY = struct.Struct("<BdHI")
+COMPRESSIONS = (None,"gzip","zstd")
+
+CaptureEntry = namedtuple("CaptureEntry",("kind","timestamp","key","payload"))
+
+def _compression(path,compression):
+    if compression != "auto":
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"compression must be one of {COMPRESSIONS}")
+        return compression
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+def open_capture(path,mode="rb",compression="auto"):
+    """기록 파일을 압축 방식에 맞게 엶
+
+    Parameters
+    ----------
+    mode : str
+        'rb', 'wb', 'ab'
+    compression : str
+        'auto' (확장자로 판단), None, 'gzip', 'zstd'
+    """
+    compression = _compression(path,compression)
+    if compression is None:
+        return open(path,mode)
+    if compression == "gzip":
+        return gzip.open(path,mode)
+    if zstandard is None:
+        raise ImportError("zstd compression requires zstandard (pip install zstandard)")
+    raw = open(path,mode)
+    if "r" in mode:
+        return zstandard.ZstdDecompressor().stream_reader(raw,read_across_frames=True,closefd=True)
+    return zstandard.ZstdCompressor().stream_writer(raw,closefd=True)
+
+def rest_key(method,api_path,params=None):
+    """REST 요청을 구분하는 키. 파라미터 순서와 관계없이 같은 요청은 같은 키"""
+    if isinstance(params,dict):
+        query = sorted((key,str(value)) for key,value in params.items())
+    else:
+        if isinstance(params,bytes):
+            params = params.decode()
+        query = sorted(parse_qsl(params or "",keep_blank_values=True))
+    return f"{method} {api_path}?{urlencode(query)}".encode()
+
+def read_capture(path,compression="auto"):
+    """기록 파일의 항목을 순서대로 반환하는 generator
+
+    Returns
+    -------
+    generator
+        CaptureEntry(kind, timestamp, key, payload). kind 는 FRAME 혹은 RESPONSE
+    """
+    with open_capture(path,"rb",compression) as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a capture file")
+        while True:
+            header = f.read(ENTRY.size)
+            if len(header) < ENTRY.size:
+                return
+            kind,timestamp,key_length,length = ENTRY.unpack(header)
+            key = f.read(key_length)
+            payload = f.read(length)
+            if len(payload) < length:
+                # 기록 중 종료되어 잘린 마지막 항목
+                return
+            yield CaptureEntry(kind,timestamp,key,payload)
+
+class Recorder:
+    """웹소켓 프레임과 REST 응답 본문을 기록하는 객체
+
+    여러 스레드에서 함께 사용할 수 있으며, 이미 있는 파일에는 이어서 기록함
+
+    Parameters
+    ----------
+    path : str
+        기록 파일 경로
+    compression : str
+        'auto' (확장자로 판단), None, 'gzip', 'zstd'
+
+    Example
+    -------
+    with Recorder('capture.upbr.zst') as recorder:
+        ub = Upbit(recorder=recorder)
+        ws = UpbitWebSocket(request,recorder=recorder)
+    """
+    def __init__(self,path,compression="auto"):
+        self.path = path
+        self.lock = threading.Lock()
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open_capture(path,"ab",compression)
+        if new:
+            self.file.write(MAGIC)
+        self.counters = {"frames": 0,"responses": 0,"bytes": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+
+    def __write(self,kind,key,payload,timestamp,counter):
+        if isinstance(payload,str):
+            payload = payload.encode()
+        header = ENTRY.pack(kind,time.time() if timestamp is None else timestamp,len(key),len(payload))
+        with self.lock:
+            self.file.write(header + key + payload)
+            self.counters["bytes"] += len(header) + len(key) + len(payload)
+            self.counters[counter] += 1
+
+    def frame(self,data,timestamp=None):
+        """받은 웹소켓 프레임(디코딩 전 원본) 기록"""
+        self.__write(FRAME,b"",data,timestamp,"frames")
+
+    def response(self,method,api_path,params,content,timestamp=None):
+        """REST 응답 본문 기록"""
+        self.__write(RESPONSE,rest_key(method,api_path,params),content,timestamp,"responses")
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+    def stats(self):
+        """frames, responses, bytes (압축 전 기록 크기)"""
+        with self.lock:
+            return dict(self.counters)
+
+class Replayer:
+    """기록 파일을 로컬 웹소켓/HTTP 서버로 재생하는 객체
+
+    웹소켓 연결마다 기록된 프레임을 처음부터 보내고 끝나면 연결을 닫음 (재생 끝에서 멈추려면 reconnect=False).
+    REST 요청은 같은 요청(rest_key)의 응답을 기록된 순서대로 돌려주며, 다 쓰면 마지막 응답을 반복함.
+    기록되지 않은 요청은 404 를 반환함. aiohttp 가 필요함 (pip install upbit-wrapper[async])
+
+    Parameters
+    ----------
+    path : str
+        기록 파일 경로
+    speed : float
+        재생 속도. 1.0 은 기록된 시각 간격 그대로, 2.0 은 두 배 빠르게. None 인 경우 최대 속도
+    compression : str
+        'auto' (확장자로 판단), None, 'gzip', 'zstd'
+
+    Example
+    -------
+    with Replayer('capture.upbr.zst',speed=None) as replayer:
+        ub = Upbit(server_url=replayer.server_url)
+        ws = UpbitWebSocket(request,url=replayer.ws_url,reconnect=False)
+    """
+    def __init__(self,path,speed=None,compression="auto"):
+        self.speed = speed
+        self.frames = []
+        self.responses = defaultdict(list)
+        for entry in read_capture(path,compression):
+            if entry.kind == FRAME:
+                self.frames.append((entry.timestamp,entry.payload))
+            elif entry.kind == RESPONSE:
+                self.responses[entry.key].append(entry.payload)
+        self.served = defaultdict(int)
+        self.counters = {"connections": 0,"frames": 0,"responses": 0,"misses": 0}
+        self.loop = None
+        self.runner = None
+        self.port = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.stop()
+
+    def iter_frames(self):
+        """기록된 프레임을 speed 에 맞춰 반환하는 generator (서버 없이 콜백에 직접 넣을 때 사용)"""
+        if not self.frames:
+            return
+        first = self.frames[0][0]
+        start = time.monotonic()
+        for timestamp,payload in self.frames:
+            if self.speed:
+                delay = start + (timestamp - first) / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            yield payload
+
+    async def __websocket(self,request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.counters["connections"] += 1
+        # 구독 요청을 받은 후 재생 시작
+        await ws.receive()
+        first = self.frames[0][0] if self.frames else 0
+        start = time.monotonic()
+        for timestamp,payload in self.frames:
+            if ws.closed:
+                break
+            if self.speed:
+                delay = start + (timestamp - first) / self.speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await ws.send_bytes(payload)
+            self.counters["frames"] += 1
+        await ws.close()
+        return ws
+
+    async def __http(self,request):
+        key = rest_key(request.method,request.path,request.query_string)
+        responses = self.responses.get(key)
+        if not responses:
+            self.counters["misses"] += 1
+            return web.Response(status=404,body=b'{"error":{"name":"not_recorded","message":"not recorded"}}')
+        index = min(self.served[key],len(responses) - 1)
+        self.served[key] += 1
+        self.counters["responses"] += 1
+        return web.Response(body=responses[index],content_type="application/json")
+
+    async def __serve(self,host,port):
+        app = web.Application()
+        app.router.add_get("/websocket/v1",self.__websocket)
+        app.router.add_route("*","/{path:.*}",self.__http)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner,host,port)
+        await site.start()
+        return self.runner.addresses[0][1]
+
+    def start(self,host="127.0.0.1",port=0):
+        """백그라운드 스레드에서 재생 서버 시작. port 가 0 이면 빈 포트 사용"""
+        if web is None:
+            raise ImportError("Replayer requires aiohttp (pip install upbit-wrapper[async])")
+        self.host = host
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever,name="Replayer",daemon=True).start()
+        self.port = asyncio.run_coroutine_threadsafe(self.__serve(host,port),self.loop).result()
+
+    def stop(self):
+        """재생 서버 종료"""
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(),self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop = None
+
+    @property
+    def server_url(self):
+        """Upbit(server_url=...) 에 넣을 주소"""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self):
+        """UpbitWebSocket(url=...) 에 넣을 주소"""
+        return f"ws://{self.host}:{self.port}/websocket/v1"
+
+    def stats(self):
+        """connections, frames, responses (재생한 개수), misses (기록되지 않은 요청)"""
+        return dict(self.counters)
@@ -0,0 +1,212 @@
+"""시세(QUOTATION) API 응답 캐시"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from upbit_wrapper.errors import last_error
+from upbit_wrapper.errors import set_last_error
+
+# 메소드별 기본 TTL(초)
+DEFAULT_TTL = {
+    "market_all": 60.0,
+    "ticker": 0.5,
+    "orderbook": 0.2,
+    "trades_ticks": 0.5,
+}
+
+def request_key(method,api_path,params=None):
+    """요청을 구분하는 캐시 키 (헤더는 포함하지 않음)"""
+    if isinstance(params,dict):
+        params = urlencode(sorted(params.items()),doseq=True).encode()
+    return method,api_path,params
+
+def _exception_error(e):
+    return {"status": None,"name": type(e).__name__,"message": str(e)}
+
+def _shared(result,error):
+    """공유받은 결과 반환. 실패한 경우 원인을 현재 스레드/태스크의 last_error() 에도 저장"""
+    if result is False and error is not None:
+        set_last_error(**error)
+    return result
+
+class _Flight:
+    """진행 중인 요청. 같은 요청을 기다리는 스레드들이 결과와 실패 원인을 공유함"""
+    __slots__ = ("event","result","error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = False
+        self.error = None
+
+class ResponseCache:
+    """TTL 및 LRU 기반 응답 본문 캐시
+
+    같은 요청이 동시에 들어오면 하나의 HTTP 요청만 보내고 결과를 공유함(coalescing).
+    응답 본문(bytes)을 저장하므로 호출마다 새 객체로 디코딩됨
+
+    Parameters
+    ----------
+    ttl : dict
+        {메소드 이름: TTL(초)}. 비워서 요청시 DEFAULT_TTL
+    max_entries : int
+        최대 저장 개수
+    max_bytes : int
+        저장할 응답 본문의 최대 크기
+
+    Example
+    -------
+    ub = Upbit(response_cache=ResponseCache(ttl={'ticker': 1.0},max_entries=4096))
+    ub.response_cache.stats()
+    """
+    def __init__(self,ttl=None,max_entries=1024,max_bytes=None):
+        self.ttl = dict(DEFAULT_TTL if ttl is None else ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.flights = {}
+        self.async_flights = {}
+        self.counters = {"hits": 0,"misses": 0,"coalesced": 0,"evictions": 0}
+
+    def caches(self,name):
+        """name 메소드의 응답을 캐시하는지 여부"""
+        return self.ttl.get(name,0) > 0
+
+    def __get(self,key,now):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires,content = entry
+        if expires <= now:
+            del self.entries[key]
+            self.bytes -= len(content)
+            return None
+        self.entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return content
+
+    def __put(self,name,key,content):
+        if content is False:
+            return
+        old = self.entries.pop(key,None)
+        if old is not None:
+            self.bytes -= len(old[1])
+        self.entries[key] = (time.monotonic() + self.ttl[name],content)
+        self.bytes += len(content)
+        while self.entries and (len(self.entries) > self.max_entries or
+                                (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            _,(_,evicted) = self.entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.counters["evictions"] += 1
+
+    def fetch(self,name,key,load):
+        """캐시된 응답 본문을 반환하고, 없으면 load() 로 받아 저장
+
+        Parameters
+        ----------
+        name : str
+            메소드 이름 (TTL 선택에 사용)
+        key : hashable
+            요청을 구분하는 키
+        load : callable
+            응답 본문(bytes)을 반환하는 함수. 실패 시 False
+
+        Returns
+        -------
+        bytes
+            응답 본문. 실패 시 False
+        """
+        with self.lock:
+            content = self.__get(key,time.monotonic())
+            if content is not None:
+                return content
+            flight = self.flights.get(key)
+            if flight is None:
+                flight = self.flights[key] = _Flight()
+                leader = True
+                self.counters["misses"] += 1
+            else:
+                leader = False
+                self.counters["coalesced"] += 1
+
+        if not leader:
+            flight.event.wait()
+            return _shared(flight.result,flight.error)
+
+        try:
+            flight.result = load()
+            if flight.result is False:
+                flight.error = last_error()
+        except Exception as e:
+            flight.error = _exception_error(e)
+            raise
+        finally:
+            with self.lock:
+                self.__put(name,key,flight.result)
+                del self.flights[key]
+            flight.event.set()
+        return flight.result
+
+    async def fetch_async(self,name,key,load):
+        """fetch 의 비동기 버전. load 는 coroutine 함수
+
+        요청하던 태스크가 취소되면 기다리던 태스크 중 하나가 이어서 요청함
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop),key)
+        while True:
+            with self.lock:
+                content = self.__get(key,time.monotonic())
+                if content is not None:
+                    return content
+                future = self.async_flights.get(flight_key)
+                if future is None:
+                    future = self.async_flights[flight_key] = loop.create_future()
+                    leader = True
+                    self.counters["misses"] += 1
+                else:
+                    leader = False
+                    self.counters["coalesced"] += 1
+            if leader:
+                break
+            # None 은 요청하던 태스크가 취소된 경우
+            shared = await asyncio.shield(future)
+            if shared is not None:
+                return _shared(*shared)
+
+        shared = None
+        try:
+            result = await load()
+            shared = (result,last_error() if result is False else None)
+        except Exception as e:
+            shared = (False,_exception_error(e))
+            raise
+        finally:
+            with self.lock:
+                if shared is not None:
+                    self.__put(name,key,shared[0])
+                del self.async_flights[flight_key]
+            future.set_result(shared)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """캐시 사용 통계
+
+        Returns
+        -------
+        dict
+            hits, misses, coalesced (다른 요청의 결과를 공유한 횟수), evictions, entries, bytes
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self.entries)
+            stats["bytes"] = self.bytes
+        return stats
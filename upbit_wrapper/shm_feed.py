@@ -0,0 +1,342 @@
+"""별도 프로세스에서 웹소켓을 수신하여 공유 메모리 링 버퍼로 전달하는 피드
+
+웹소켓 수신과 json 디코딩을 다른 프로세스에서 처리하고,
+현재가/체결/최우선 호가를 고정 크기(64 바이트) 레코드로 multiprocessing.shared_memory 에 씀.
+소비자는 메시지를 pickle 하지 않고 공유 메모리에서 바로 읽으며, 여러 프로세스가 이름으로 붙어 동시에 읽을 수 있음
+
+레코드 필드의 의미는 kind 별로 다름
+
+========  ==============  ====================  ==================  =====================
+kind      price           size                  price2              size2
+========  ==============  ====================  ==================  =====================
+TICKER    trade_price     acc_trade_volume_24h  signed_change_rate  acc_trade_price_24h
+TRADE     trade_price     trade_volume          prev_closing_price  0
+TOP       최우선 매수 호가  최우선 매수 잔량         최우선 매도 호가        최우선 매도 잔량
+========  ==============  ====================  ==================  =====================
+
+side 는 TRADE 에서 ASK(1) / BID(2), sequential_id 는 TRADE 에서만 채워짐
+"""
+import json
+import multiprocessing
+import os
+import struct
+import threading
+from collections import namedtuple
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from upbit_wrapper.upbit_websocket import UpbitWebSocket
+
+TICKER,TRADE,TOP = 1,2,3
+ASK,BID = 1,2
+KINDS = {"ticker": TICKER,"trade": TRADE,"orderbook": TOP}
+
+# (write index, capacity, record size, market count, 만든 프로세스 pid)
+HEADER = struct.Struct("<QQIIQ")
+# (seq, kind, side, market, reserved, timestamp, price, size, price2, size2, sequential_id)
+RECORD = struct.Struct("<QBBHIqddddq")
+SEQ = struct.Struct("<Q")
+MARKET_SIZE = 16
+RECORDS_OFFSET = 4096
+
+Record = namedtuple("Record",("kind","market","side","timestamp","price","size","price2","size2","sequential_id"))
+
+def record_dtype():
+    """RECORD 와 같은 배치의 numpy structured dtype"""
+    if np is None:
+        raise ImportError("record_dtype requires numpy (pip install upbit-wrapper[columnar])")
+    return np.dtype([
+        ("seq","<u8"),("kind","u1"),("side","u1"),("market","<u2"),("reserved","<u4"),
+        ("timestamp","<i8"),("price","<f8"),("size","<f8"),("price2","<f8"),("size2","<f8"),
+        ("sequential_id","<i8"),
+    ])
+
+def buffer_size(capacity):
+    """capacity 개의 레코드를 담는 공유 메모리 크기(바이트)"""
+    return RECORDS_OFFSET + capacity * RECORD.size
+
+def _attach(name):
+    """다른 프로세스가 만든 공유 메모리에 붙음
+
+    해제(unlink)는 만든 쪽이 하므로 resource tracker 에서 뺌.
+    만든 프로세스의 자식은 resource tracker 를 공유하므로 그대로 둠
+    """
+    shm = shared_memory.SharedMemory(name)
+    owner = HEADER.unpack_from(shm.buf,0)[4]
+    parent = multiprocessing.parent_process()
+    if parent is None or parent.pid != owner:
+        try:
+            resource_tracker.unregister(shm._name,"shared_memory")
+        except Exception:
+            pass
+    return shm
+
+def _encode(msg,markets):
+    """웹소켓 메시지(DEFAULT/SIMPLE dict)를 레코드 값으로 변환. 대상이 아니면 None"""
+    if "ty" in msg:
+        kind = KINDS.get(msg["ty"])
+        market = markets.get(msg.get("cd"))
+        if kind is None or market is None:
+            return None
+        if kind == TICKER:
+            return (kind,0,market,msg["tms"],msg["tp"],msg["atv24h"],msg["scr"],msg["atp24h"],0)
+        if kind == TRADE:
+            side = ASK if msg["ab"] == "ASK" else BID
+            return (kind,side,market,msg["ttms"],msg["tp"],msg["tv"],msg.get("pcp") or 0.0,0.0,msg.get("sid") or 0)
+        unit = msg["obu"][0]
+        return (kind,0,market,msg["tms"],unit["bp"],unit["bs"],unit["ap"],unit["as"],0)
+    kind = KINDS.get(msg.get("type"))
+    market = markets.get(msg.get("code"))
+    if kind is None or market is None:
+        return None
+    if kind == TICKER:
+        return (kind,0,market,msg["timestamp"],msg["trade_price"],msg["acc_trade_volume_24h"],
+                msg["signed_change_rate"],msg["acc_trade_price_24h"],0)
+    if kind == TRADE:
+        side = ASK if msg["ask_bid"] == "ASK" else BID
+        return (kind,side,market,msg["trade_timestamp"],msg["trade_price"],msg["trade_volume"],
+                msg.get("prev_closing_price") or 0.0,0.0,msg.get("sequential_id") or 0)
+    unit = msg["orderbook_units"][0]
+    return (kind,0,market,msg["timestamp"],unit["bid_price"],unit["bid_size"],unit["ask_price"],unit["ask_size"],0)
+
+class RingWriter:
+    """링 버퍼에 레코드를 쓰는 객체 (프로세스 당 하나)
+
+    레코드를 쓴 뒤 seq 를 기록하고 마지막으로 write index 를 올리므로,
+    읽는 쪽은 seq 를 읽기 전/후로 비교하여 덮어쓰는 중인 레코드를 걸러냄
+    """
+    def __init__(self,buf):
+        self.buf = buf
+        self.index,self.capacity,_,_,_ = HEADER.unpack_from(buf,0)
+        self.skipped = 0
+
+    def write(self,kind,side,market,timestamp,price,size,price2,size2,sequential_id):
+        index = self.index
+        offset = RECORDS_OFFSET + (index % self.capacity) * RECORD.size
+        SEQ.pack_into(self.buf,offset,0)
+        RECORD.pack_into(self.buf,offset,0,kind,side,market,0,timestamp,price,size,price2,size2,sequential_id)
+        SEQ.pack_into(self.buf,offset,index + 1)
+        self.index = index + 1
+        SEQ.pack_into(self.buf,0,self.index)
+
+    def on_message(self,msg,markets):
+        if not isinstance(msg,dict):
+            return
+        values = _encode(msg,markets)
+        if values is None:
+            self.skipped += 1
+            return
+        self.write(*values)
+
+class RingReader:
+    """링 버퍼를 읽는 객체. 읽는 쪽마다 하나씩 만들며 각자 위치(cursor)를 가짐
+
+    쓰는 속도를 따라가지 못해 덮어쓰인 레코드는 건너뛰고 lost 로 셈
+
+    Parameters
+    ----------
+    buf : memoryview
+        공유 메모리 버퍼
+    from_start : bool
+        True 인 경우 버퍼에 남아있는 가장 오래된 레코드부터 읽음. False 인 경우 이후에 쓰인 레코드부터
+    """
+    def __init__(self,buf,from_start=False):
+        self.buf = buf
+        head,self.capacity,record_size,count,_ = HEADER.unpack_from(buf,0)
+        if record_size != RECORD.size:
+            raise ValueError(f"record size mismatch {record_size} != {RECORD.size}")
+        self.markets = [
+            bytes(buf[HEADER.size + i * MARKET_SIZE:HEADER.size + (i + 1) * MARKET_SIZE]).rstrip(b"\0").decode()
+            for i in range(count)
+        ]
+        self.cursor = max(0,head - self.capacity) if from_start else head
+        self.lost = 0
+
+    @property
+    def head(self):
+        """지금까지 쓰인 레코드 개수"""
+        return SEQ.unpack_from(self.buf,0)[0]
+
+    def __skip_overrun(self,head):
+        oldest = head - self.capacity
+        if self.cursor < oldest:
+            self.lost += oldest - self.cursor
+            self.cursor = oldest
+
+    def read(self,limit=1024):
+        """새 레코드를 읽음
+
+        Parameters
+        ----------
+        limit : int
+            한 번에 읽을 최대 레코드 개수
+
+        Returns
+        -------
+        list
+            Record 목록 (market 은 markets 의 번호)
+        """
+        head = self.head
+        self.__skip_overrun(head)
+        buf = self.buf
+        capacity = self.capacity
+        result = []
+        end = min(head,self.cursor + limit)
+        for index in range(self.cursor,end):
+            offset = RECORDS_OFFSET + (index % capacity) * RECORD.size
+            values = RECORD.unpack_from(buf,offset)
+            if values[0] != index + 1 or SEQ.unpack_from(buf,offset)[0] != index + 1:
+                # 읽는 동안 덮어쓰인 레코드
+                self.lost += 1
+                continue
+            result.append(Record(values[1],values[3],values[2],*values[5:]))
+        self.cursor = end
+        return result
+
+    def read_array(self,limit=65536):
+        """새 레코드를 복사 없이 numpy structured 배열(record_dtype)로 읽음 (numpy 필요)
+
+        버퍼 끝에서 끊기므로 한 번에 limit 보다 적게 반환될 수 있음.
+        반환된 배열은 공유 메모리를 그대로 가리키므로 쓰는 쪽이 한 바퀴 돌기 전에 사용하거나 복사해야 함.
+        seq 가 index + 1 이 아닌 레코드는 덮어쓰인 것임
+
+        Returns
+        -------
+        numpy.ndarray
+            레코드 배열
+        """
+        dtype = record_dtype()
+        head = self.head
+        self.__skip_overrun(head)
+        start = self.cursor % self.capacity
+        count = min(head - self.cursor,limit,self.capacity - start)
+        array = np.frombuffer(self.buf,dtype=dtype,count=count,offset=RECORDS_OFFSET + start * RECORD.size)
+        self.cursor += count
+        return array
+
+    def market(self,record):
+        """레코드의 마켓 코드"""
+        return self.markets[record.market]
+
+def attach(name,from_start=False):
+    """다른 프로세스에서 이름으로 피드에 붙어 RingReader 생성
+
+    Returns
+    -------
+    tuple
+        (RingReader, SharedMemory). 다 읽은 후 SharedMemory.close() 를 호출해야 함
+    """
+    shm = _attach(name)
+    return RingReader(shm.buf,from_start),shm
+
+def _run_feed(name,markets,request,stop,options):
+    """피드 프로세스. stop 이 설정될 때까지 웹소켓 메시지를 링 버퍼에 씀"""
+    shm = _attach(name)
+    writer = RingWriter(shm.buf)
+    index = {market: i for i,market in enumerate(markets)}
+    ws = UpbitWebSocket(request,callback=lambda msg: writer.on_message(msg,index),**options)
+    thread = threading.Thread(target=ws.start,daemon=True)
+    thread.start()
+    stop.wait()
+    ws.stop()
+    thread.join(5)
+    del writer
+    shm.close()
+
+class ShmFeed:
+    """웹소켓 수신/디코딩을 별도 프로세스에서 하고 공유 메모리 링 버퍼로 전달하는 피드
+
+    Parameters
+    ----------
+    markets : list
+        구독할 마켓 코드 (최대 65535 개, 코드 길이 16 바이트 이하)
+    types : tuple
+        구독할 타입 (ticker, trade, orderbook). orderbook 은 최우선 호가(TOP) 레코드가 됨
+    capacity : int
+        링 버퍼의 레코드 개수
+    simple : bool
+        True 인 경우 SIMPLE 형식으로 구독
+
+    그 외 키워드 인자(decoder, stale_timeout, backoff_base 등)는 UpbitWebSocket 에 전달됨
+
+    Example
+    -------
+    with ShmFeed(['KRW-BTC','KRW-ETH'],types=('trade','orderbook')) as feed:
+        reader = feed.reader()
+        while True:
+            for record in reader.read():
+                print(reader.market(record),record.price)
+
+    다른 프로세스에서는 attach(feed.name) 로 읽음
+    """
+    def __init__(self,markets,types=("ticker","trade","orderbook"),capacity=1 << 16,simple=False,
+                 ticket="upbit-wrapper",**options):
+        markets = list(markets)
+        if len(markets) > 0xFFFF or (HEADER.size + len(markets) * MARKET_SIZE) > RECORDS_OFFSET:
+            raise ValueError("too many markets")
+        if any(len(market.encode()) > MARKET_SIZE for market in markets):
+            raise ValueError(f"market code must be at most {MARKET_SIZE} bytes")
+        self.markets = markets
+        self.capacity = capacity
+        request = [{"ticket": ticket}]
+        request.extend({"type": kind,"codes": markets} for kind in types)
+        if simple:
+            request.append({"format": "SIMPLE"})
+        self.request = json.dumps(request)
+        self.options = options
+        self.shm = None
+        self.process = None
+        self.stop_event = multiprocessing.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.stop()
+
+    @property
+    def name(self):
+        """공유 메모리 이름 (attach 에 사용)"""
+        return self.shm.name if self.shm is not None else None
+
+    def start(self):
+        """공유 메모리를 만들고 피드 프로세스를 시작"""
+        self.shm = shared_memory.SharedMemory(create=True,size=buffer_size(self.capacity))
+        buf = self.shm.buf
+        HEADER.pack_into(buf,0,0,self.capacity,RECORD.size,len(self.markets),os.getpid())
+        for i,market in enumerate(self.markets):
+            code = market.encode()
+            offset = HEADER.size + i * MARKET_SIZE
+            buf[offset:offset + len(code)] = code
+        self.stop_event.clear()
+        self.process = multiprocessing.Process(
+            target=_run_feed,name="ShmFeed",daemon=True,
+            args=(self.shm.name,self.markets,self.request,self.stop_event,self.options))
+        self.process.start()
+
+    def reader(self,from_start=False):
+        """이 프로세스에서 사용할 RingReader"""
+        return RingReader(self.shm.buf,from_start)
+
+    def stop(self):
+        """피드 프로세스를 멈추고 공유 메모리를 해제. 이후 reader 는 사용할 수 없음"""
+        self.stop_event.set()
+        if self.process is not None:
+            self.process.join(5)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.shm is not None:
+            try:
+                self.shm.close()
+            except BufferError:
+                # read_array 로 받은 배열이 남아있으면 매핑은 프로세스 종료 시 해제됨
+                pass
+            self.shm.unlink()
+            self.shm = None
@@ -0,0 +1,341 @@
+"""최근 7일 체결(trades_ticks) 이력 수집기
+
+마켓별로 daysAgo 구간(최근 체결일, 1 ~ 7일 전)마다 sequential_id 커서를 따라 끝까지 요청하며,
+마켓과 구간을 커넥션 풀 크기만큼의 스레드에서 동시에 수집함 (요청 수 제한은 클라이언트의 RateLimiter 를 따름)
+
+체결은 마켓별 디렉터리에 컬럼별 파일(sequential_id, trade_timestamp, trade_price, trade_volume, ask_bid)로 추가하고,
+구간(trade_date_utc)별 마지막 커서를 state.json 에 함께 기록하여 중단된 수집을 이어서 진행함.
+파일 쓰기는 표준 라이브러리만 사용하며, 읽기(load)에는 numpy 가 필요함 (pip install upbit-wrapper[columnar])
+"""
+import json
+import logging
+import os
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from upbit_wrapper.columnar import Columns
+from upbit_wrapper.errors import last_error
+
+# (컬럼 이름, array typecode, numpy dtype)
+COLUMNS = (
+    ("sequential_id","q","int64"),
+    ("trade_timestamp","q","int64"),
+    ("trade_price","d","float64"),
+    ("trade_volume","d","float64"),
+    ("ask_bid","B","uint8"),
+)
+ASK,BID = 1,2
+SIDES = {"ASK": ASK,"BID": BID}
+# 한 번에 요청할 수 있는 최대 체결 개수
+MAX_TICKS = 500
+MAX_DAYS_AGO = 7
+STATE = "state.json"
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+class TickFile:
+    """마켓 하나의 컬럼 파일 묶음과 구간별 수집 상태
+
+    state.json 에 기록된 행 수보다 긴 컬럼 파일(기록 중 중단)은 열 때 잘라내므로,
+    컬럼 파일과 커서는 항상 같은 시점을 가리킴
+
+    Parameters
+    ----------
+    directory : str
+        마켓 디렉터리
+    """
+    def __init__(self,directory):
+        os.makedirs(directory,exist_ok=True)
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.state = {"rows": 0,"windows": {}}
+        path = os.path.join(directory,STATE)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+        self.files = {}
+        for name,typecode,_ in COLUMNS:
+            path = os.path.join(directory,name)
+            size = self.state["rows"] * array(typecode).itemsize
+            with open(path,"ab") as f:
+                if f.tell() > size:
+                    f.truncate(size)
+            self.files[name] = open(path,"ab")
+
+    def close(self):
+        with self.lock:
+            for f in self.files.values():
+                f.close()
+
+    @property
+    def rows(self):
+        return self.state["rows"]
+
+    def window(self,date):
+        """구간(trade_date_utc)의 수집 상태. {cursor, newest, done, closed} 혹은 None"""
+        with self.lock:
+            window = self.state["windows"].get(date)
+            return dict(window) if window is not None else None
+
+    def append(self,date,ticks,**window):
+        """체결을 컬럼 파일에 추가하고 구간 상태를 갱신
+
+        Parameters
+        ----------
+        date : str
+            구간 (trade_date_utc)
+        ticks : list
+            trades_ticks 응답
+        window : dict
+            갱신할 상태 (cursor, newest, done, closed)
+        """
+        columns = {name: array(typecode) for name,typecode,_ in COLUMNS}
+        for tick in ticks:
+            columns["sequential_id"].append(tick["sequential_id"])
+            columns["trade_timestamp"].append(tick["trade_timestamp"])
+            columns["trade_price"].append(tick["trade_price"])
+            columns["trade_volume"].append(tick["trade_volume"])
+            columns["ask_bid"].append(SIDES.get(tick["ask_bid"],0))
+        with self.lock:
+            for name,values in columns.items():
+                f = self.files[name]
+                values.tofile(f)
+                f.flush()
+            self.state["rows"] += len(ticks)
+            self.state["windows"].setdefault(date,{}).update(window)
+            self.__save()
+
+    def __save(self):
+        path = os.path.join(self.directory,STATE)
+        with open(path + ".tmp","w") as f:
+            json.dump(self.state,f)
+        os.replace(path + ".tmp",path)
+
+    def load(self):
+        """수집한 체결을 sequential_id 중복 없이 시각 순서로 반환
+
+        Returns
+        -------
+        Columns
+            sequential_id, trade_timestamp (epoch 밀리초), trade_price, trade_volume, ask_bid (ASK=1, BID=2)
+        """
+        if np is None:
+            raise ImportError("loading ticks requires numpy (pip install upbit-wrapper[columnar])")
+        with self.lock:
+            rows = self.state["rows"]
+            columns = {
+                name: np.fromfile(os.path.join(self.directory,name),dtype=dtype,count=rows)
+                for name,_,dtype in COLUMNS
+            }
+        # 중단 후 다시 받은 구간 경계의 체결은 중복될 수 있음
+        _,index = np.unique(columns["sequential_id"],return_index=True)
+        order = index[np.lexsort((columns["sequential_id"][index],columns["trade_timestamp"][index]))]
+        return Columns({name: values[order] for name,values in columns.items()})
+
+class TickCrawler:
+    """여러 마켓의 최근 7일 체결을 끝까지 받아 컬럼 파일로 저장하는 객체
+
+    같은 path 로 다시 실행하면 구간별 마지막 sequential_id 부터 이어서 받고,
+    이미 끝난 지난 날짜는 건너뛰며, 오늘 구간은 마지막 수집 이후의 체결만 추가로 받음
+
+    Parameters
+    ----------
+    ub : Upbit
+        요청에 사용할 클라이언트. 요청 속도는 ub 의 RateLimiter 를 따름
+    path : str
+        저장 디렉터리. 마켓별 하위 디렉터리에 컬럼 파일과 state.json 을 저장
+    days : int
+        최근 체결일 외에 수집할 이전 날짜 수 (0 ~ 7)
+    count : int
+        요청당 체결 개수 (최대 500)
+    workers : int
+        동시에 수집할 구간 수. 비워서 요청시 ub.pool_maxsize (커넥션 풀 크기)
+
+    Example
+    -------
+    crawler = TickCrawler(Upbit(),'ticks',days=7)
+    crawler.crawl(['KRW-BTC','KRW-ETH'])
+    ticks = crawler.load('KRW-BTC')
+    ticks['trade_price'], ticks['trade_volume']
+    """
+    def __init__(self,ub,path,days=MAX_DAYS_AGO,count=MAX_TICKS,workers=None):
+        if not 0 <= days <= MAX_DAYS_AGO:
+            raise ValueError(f"days must be between 0 and {MAX_DAYS_AGO}")
+        self.logger = logging.getLogger("TickCrawler")
+        self.ub = ub
+        self.path = path
+        self.days = days
+        self.count = min(int(count),MAX_TICKS)
+        self.workers = workers or ub.pool_maxsize
+        self.executor = None
+        self.lock = threading.Lock()
+        self.tick_files = {}
+        self.counter_lock = threading.Lock()
+        self.counters = {"requests": 0,"ticks": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            executor,self.executor = self.executor,None
+        if executor is not None:
+            # 진행 중인 구간이 file() 의 잠금을 사용하므로 잠금 밖에서 기다림
+            executor.shutdown(wait=True)
+        with self.lock:
+            for tick_file in self.tick_files.values():
+                tick_file.close()
+            self.tick_files = {}
+
+    def file(self,market):
+        """마켓의 TickFile"""
+        with self.lock:
+            tick_file = self.tick_files.get(market)
+            if tick_file is None:
+                tick_file = self.tick_files[market] = TickFile(os.path.join(self.path,market))
+            return tick_file
+
+    def load(self,market):
+        """수집한 체결을 Columns 로 반환 (TickFile.load)"""
+        return self.file(market).load()
+
+    def __count(self,requests,ticks):
+        with self.counter_lock:
+            self.counters["requests"] += requests
+            self.counters["ticks"] += ticks
+
+    def __page(self,market,days_ago,cursor=None):
+        params = {"market": market,"count": self.count,"format": "json"}
+        if days_ago:
+            params["daysAgo"] = days_ago
+        if cursor is not None:
+            params["cursor"] = cursor
+        ticks = self.ub.trades_ticks(**params)
+        if ticks is False:
+            raise RuntimeError(f"trades_ticks(market={market}, daysAgo={days_ago}, cursor={cursor}) failed : {last_error()}")
+        self.__count(1,0)
+        return ticks
+
+    def crawl_window(self,market,days_ago=0):
+        """마켓의 한 구간을 끝까지(혹은 이어서) 수집
+
+        Parameters
+        ----------
+        market : str
+            마켓 코드
+        days_ago : int
+            0 은 최근 체결일, 1 ~ 7 은 그 이전 날짜
+
+        Returns
+        -------
+        int
+            새로 저장한 체결 개수
+        """
+        tick_file = self.file(market)
+        page = self.__page(market,days_ago)
+        if not page:
+            return 0
+        date = page[0]["trade_date_utc"]
+        window = tick_file.window(date)
+        if window is None:
+            newest = max(tick["trade_timestamp"] for tick in page)
+            return self.__backfill(tick_file,market,days_ago,date,page,newest)
+        if not window["done"]:
+            # 이미 받은 첫 페이지에 커서 이후(더 이전)의 체결이 있으면 그대로 사용
+            rest = [tick for tick in page if tick["sequential_id"] < window["cursor"]]
+            if rest:
+                return self.__backfill(tick_file,market,days_ago,date,rest,size=len(page))
+            return self.__backfill(tick_file,market,days_ago,date,self.__page(market,days_ago,window["cursor"]))
+        if window["closed"]:
+            return 0
+        return self.__refresh(tick_file,market,days_ago,date,page,window["newest"])
+
+    def __backfill(self,tick_file,market,days_ago,date,page,newest=None,size=None):
+        """sequential_id 커서를 따라 구간의 끝까지 저장. size 는 page 를 거르기 전의 응답 개수"""
+        saved = 0
+        while True:
+            ticks = [tick for tick in page if tick["trade_date_utc"] == date]
+            done = (len(page) if size is None else size) < self.count or len(ticks) < len(page)
+            size = None
+            window = {"done": done,"closed": done and date < _today()}
+            if ticks:
+                window["cursor"] = ticks[-1]["sequential_id"]
+            if newest is not None:
+                window["newest"] = newest
+                newest = None
+            tick_file.append(date,ticks,**window)
+            saved += len(ticks)
+            self.__count(0,len(ticks))
+            if done:
+                return saved
+            page = self.__page(market,days_ago,window["cursor"])
+
+    def __refresh(self,tick_file,market,days_ago,date,page,newest):
+        """마지막 수집 이후(trade_timestamp >= newest)의 체결만 추가"""
+        saved = 0
+        latest = newest
+        while True:
+            ticks = [tick for tick in page if tick["trade_date_utc"] == date and tick["trade_timestamp"] >= newest]
+            if ticks:
+                latest = max(latest,max(tick["trade_timestamp"] for tick in ticks))
+            done = len(page) < self.count or len(ticks) < len(page)
+            # newest 는 끝까지 받은 후에 갱신 (중단되면 다음 실행에서 처음부터 다시 받음)
+            window = {"newest": latest,"closed": date < _today()} if done else {}
+            tick_file.append(date,ticks,**window)
+            saved += len(ticks)
+            self.__count(0,len(ticks))
+            if done:
+                return saved
+            page = self.__page(market,days_ago,page[-1]["sequential_id"])
+
+    def crawl(self,markets):
+        """마켓별로 최근 체결일과 이전 days 일의 체결을 동시에 수집
+
+        Parameters
+        ----------
+        markets : list
+            마켓 코드 목록
+
+        Returns
+        -------
+        dict
+            saved ({마켓 코드: 새로 저장한 체결 개수}), failed ([(마켓 코드, days_ago, 오류 메시지)]), requests, ticks (누적)
+        """
+        windows = [(market,days_ago) for market in markets for days_ago in range(self.days + 1)]
+
+        def run(window):
+            try:
+                return window,self.crawl_window(*window),None
+            except Exception as e:
+                return window,0,str(e)
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers,thread_name_prefix="TickCrawler")
+            executor = self.executor
+        saved = {market: 0 for market in markets}
+        failed = []
+        for (market,days_ago),count,error in executor.map(run,windows):
+            saved[market] += count
+            if error is not None:
+                failed.append((market,days_ago,error))
+        if failed:
+            self.logger.error(f"crawl() {len(failed)}/{len(windows)} windows failed")
+        return {"saved": saved,"failed": failed,**self.stats()}
+
+    def stats(self):
+        """requests (요청 수), ticks (저장한 체결 수)"""
+        with self.counter_lock:
+            return dict(self.counters)
@@ -3,24 +3,179 @@
 import os
 import sys
 import logging
-import jwt
-import uuid
-import hashlib
+import json
+import time
 import requests
-from urllib.parse import urlencode
+from datetime import datetime
+from datetime import timezone
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urljoin
 
 from requests.api import head
 
+from upbit_wrapper.rate_limit import RateLimiter
+from upbit_wrapper.bulk import batch_result
+from upbit_wrapper.bulk import chunk_markets
+from upbit_wrapper.bulk import merge_by_market
+from upbit_wrapper.candles import candle_endpoint
+from upbit_wrapper.candles import format_time
+from upbit_wrapper.candles import merge_candles
+from upbit_wrapper.candles import parse_time
+from upbit_wrapper.candles import plan_candle_windows
+from upbit_wrapper.columnar import Columns
+from upbit_wrapper.columnar import decode_columns
+from upbit_wrapper.errors import clear_last_error
+from upbit_wrapper.errors import last_error
+from upbit_wrapper.errors import set_last_error
+from upbit_wrapper.models import Candle
+from upbit_wrapper.models import ModelDecoder
+from upbit_wrapper.models import OrderbookSnapshot
+from upbit_wrapper.models import Ticker
+from upbit_wrapper.models import Trade
+from upbit_wrapper.pagination import PageBounds
+from upbit_wrapper.pagination import page_query
+from upbit_wrapper.query import build_query
+from upbit_wrapper.response_cache import request_key
+from upbit_wrapper.signer import Signer
+from upbit_wrapper.signer import query_hash
+
+# cancel_all 이 취소하는 주문 상태와 조회 페이지 크기
+OPEN_ORDER_STATES = ("wait","watch")
+ORDERS_PAGE_LIMIT = 100
+
+def open_orders_query(state,market=None,page=1):
+    """cancel_all 의 주문 조회 쿼리"""
+    query = {"state": state,"page": page,"limit": ORDERS_PAGE_LIMIT}
+    if market is not None:
+        query["market"] = market
+    return query
+
 class Upbit:
-    def __init__(self,access_key=None,secret_key=None):
+    def __init__(self,access_key=None,secret_key=None,server_url="https://api.upbit.com",
+                 pool_connections=10,pool_maxsize=10,max_retries=0,backoff_factor=0,
+                 keep_alive=True,timeout=None,rate_limiter=None,candle_store=None,
+                 response_cache=None,typed=False,recorder=None,instrumentation=None):
+        """Upbit 객체 생성
+
+        Parameters
+        ----------
+        access_key : str
+            API access key
+        secret_key : str
+            API secret key
+        server_url : str
+            API 서버 주소
+        pool_connections : int
+            커넥션 풀 개수 (호스트 단위)
+        pool_maxsize : int
+            풀 당 유지할 최대 커넥션 개수
+        max_retries : int or urllib3.util.retry.Retry
+            재시도 횟수 혹은 재시도 정책. 정수인 경우 GET 요청의 연결 실패 및 5xx 응답만 재시도
+        backoff_factor : float
+            재시도 간 지수 백오프 계수
+        keep_alive : bool
+            False 인 경우 매 요청마다 커넥션을 닫음
+        timeout : float or tuple
+            requests 타임아웃 (connect, read)
+        rate_limiter : RateLimiter
+            Remaining-Req 기반 요청 수 제한기. None 인 경우 access_key 별로 공유되는 제한기를 사용하며 False 인 경우 사용하지 않음
+        candle_store : CandleStore
+            마감된 캔들을 저장해 두는 저장소. 설정하면 candles_* 및 fetch_candles_range 가 저장된 캔들을 재사용
+        response_cache : ResponseCache
+            시세 API(market_all, ticker, orderbook, trades_ticks) 응답 캐시. 여러 Upbit 객체가 공유할 수 있음
+        typed : bool
+            True 인 경우 ticker, orderbook, trades_ticks, candles_* 가 dict 대신 __slots__ 객체
+            (Ticker, OrderbookSnapshot, Trade, Candle) 리스트를 반환. 메소드별로 format="typed" 혹은 format="json" 으로 지정 가능
+        recorder : Recorder
+            설정하면 서버에서 받은 응답 본문을 기록 (upbit_wrapper.recorder)
+        instrumentation : Instrumentation
+            설정하면 요청마다 단계별 소요 시간, 응답 크기, 상태 코드를 수집 (upbit_wrapper.instrumentation).
+            requests 는 연결 단계 시간을 알려주지 않으므로 dns, connect 는 측정하지 않고 새 연결 시간은 server 에 포함됨
+
+        Example
+        -------
+        with Upbit('access_key','secret_key',pool_maxsize=32) as ub:
+            ub.ticker(markets='KRW-BTC')
+        """
         self.logger = logging.getLogger("Upbit")
-        self.server_url = "https://api.upbit.com"
+        self.server_url = server_url
         self.access_key = access_key
         self.secret_key = secret_key
         self.auth_token = None
+        self.signer = Signer(access_key,secret_key)
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.keep_alive = keep_alive
+        if rate_limiter is None:
+            rate_limiter = RateLimiter.shared(access_key)
+        self.rate_limiter = rate_limiter
+        self.candle_store = candle_store
+        self.response_cache = response_cache
+        self.typed = typed
+        self.recorder = recorder
+        self.instrumentation = instrumentation
+        self.executor = None
+        self.session = self._make_session()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+
+    def close(self):
+        """커넥션 풀을 닫음
+
+        Example
+        -------
+        ub.close()
+        """
+        self.session.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
 
-    def __connect(self,method,api_path, **kwargs):
+    def _executor(self):
+        """동시 요청에 사용하는 스레드 풀. 커넥션 풀 크기만큼의 스레드를 사용"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.pool_maxsize,thread_name_prefix="Upbit")
+        return self.executor
+
+    def _make_session(self):
+        """keep-alive 커넥션 풀을 가진 requests.Session 생성
+
+        Returns
+        -------
+        requests.Session
+            HTTPAdapter 가 마운트된 세션
+        """
+        max_retries = self.max_retries
+        if not isinstance(max_retries,Retry):
+            max_retries = Retry(
+                total=max_retries,
+                backoff_factor=self.backoff_factor,
+                status_forcelist=(500,502,503,504),
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False,
+            )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=max_retries,
+        )
+        session = requests.Session()
+        session.mount("https://",adapter)
+        session.mount("http://",adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def __connect(self,method,api_path,event=None,**kwargs):
         """api_path로 요청하는 request의 response 반환
 
         Parameters
@@ -31,7 +186,9 @@ class Upbit:
         api_path : str
             API 경로
 
-        
+        event : RequestEvent
+            계측 값을 기록할 객체 (instrumentation 사용 시)
+
         Returns
         -------
         requests.models.Response
@@ -42,21 +199,162 @@ class Upbit:
         __connect('POST','/v1/accounts')
         """
         url = urljoin(self.server_url,api_path)
-        res = requests.request(method=method, url=url, **kwargs)
+        if event is not None:
+            event.cached = False
+            start = time.perf_counter()
+        if self.rate_limiter:
+            self.rate_limiter.acquire(method,api_path)
+        if event is not None:
+            sent = time.perf_counter()
+            event.wait = sent - start
+        res = self.session.request(method=method, url=url, timeout=self.timeout, **kwargs)
+        if event is not None:
+            event.server = res.elapsed.total_seconds()
+            event.transfer = max(time.perf_counter() - sent - event.server,0.0)
+            event.response(res.status_code,res.headers,len(res.content))
+        if self.rate_limiter:
+            self.rate_limiter.update(method,api_path,res.headers.get("Remaining-Req"),res.status_code)
         
         if(res.status_code >= 200 and res.status_code < 300):
             return res
         else:
             self.logger.error(f"connect failed reason : {res.content.decode()}")
+            set_last_error(res.status_code,res.content)
             return False
 
-    def __make_headers(self,payload):
+    def _request(self,name,method,api_path,decode=None,**kwargs):
+        """요청을 보내고 json 으로 디코딩된 응답 반환
+
+        모든 API 메소드가 거치는 전송 단계로, AsyncUpbit 은 이 메소드만 재정의하여
+        쿼리 생성 및 JWT 서명 로직을 그대로 사용함
+
+        Parameters
+        ----------
+        name : str
+            실패 시 로그에 남길 메소드 이름
+        method : str
+            HTTP 메소드
+        api_path : str
+            API 경로
+        decode : callable
+            응답 본문(bytes)을 변환할 함수. 비워서 요청시 json
+
+        Returns
+        -------
+        json
+            응답 결과. 실패 시 False
+
+        Example
+        -------
+        self._request("accounts","GET","/v1/accounts",headers=headers)
+        """
+        clear_last_error()
+        instrumentation = self.instrumentation
+        event = None if instrumentation is None else instrumentation.start(name,method,api_path)
+        try:
+            cache = self.response_cache
+            if cache is not None and cache.caches(name):
+                if event is not None:
+                    # 요청을 보내면 __connect 에서 False 로 바뀜
+                    event.cached = True
+                key = request_key(method,api_path,kwargs.get("params"))
+                content = cache.fetch(name,key,lambda: self.__content(method,api_path,event=event,**kwargs))
+            else:
+                content = self.__content(method,api_path,event=event,**kwargs)
+
+            if content is not False:
+                if event is None:
+                    return json.loads(content) if decode is None else decode(content)
+                start = time.perf_counter()
+                result = json.loads(content) if decode is None else decode(content)
+                event.decode = time.perf_counter() - start
+                return result
+            else:
+                self.logger.error(f"{name}() failed")
+                if event is not None:
+                    event.error = "failed"
+                return False
+        except Exception as e:
+            if event is not None:
+                event.error = type(e).__name__
+            raise
+        finally:
+            if event is not None:
+                instrumentation.finish(event)
+
+    def __content(self,method,api_path,**kwargs):
+        """api_path로 요청하여 응답 본문 반환. 실패 시 False"""
+        res = self.__connect(method,api_path,**kwargs)
+        if res and self.recorder is not None:
+            self.recorder.response(method,api_path,kwargs.get("params"),res.content)
+        return res.content if res else False
+
+    def _candles(self,name,api_path,unit,query,decode=None):
+        """캔들 요청. candle_store 가 있으면 저장된 마감 캔들을 사용하고 나머지만 API 로 요청
+
+        Parameters
+        ----------
+        name : str
+            실패 시 로그에 남길 메소드 이름
+        api_path : str
+            API 경로
+        unit : int or str
+            분 단위 혹은 'days', 'weeks', 'months'
+        query : dict
+            요청 파라미터
+        decode : callable
+            응답 본문(bytes)을 변환할 함수
+
+        Returns
+        -------
+        json
+            캔들 조회 결과. 실패 시 False
+        """
+        store = self.candle_store
+        if store is None or not store.accepts(query):
+            return self._request(name,"GET",api_path,params=build_query(query),decode=decode)
+
+        lookup = store.lookup(query["market"],unit,query.get("to"),query.get("count",1))
+        while lookup.request is not None:
+            rows = self._request(name,"GET",api_path,params=build_query(lookup.request))
+            if rows is False:
+                return False
+            store.resolve(lookup,rows)
+        return self._from_records(decode,lookup.result)
+
+    def _from_records(self,decode,records):
+        """json 으로 디코딩된 응답을 decode 가 만드는 형식으로 변환"""
+        if decode is None:
+            return records
+        if decode is decode_columns:
+            return Columns.from_records(records)
+        return decode.from_records(records)
+
+    def __pop_decoder(self,kwargs,model=None,columnar=True):
+        """kwargs 에서 결과 형식 옵션(as_array, format)을 꺼내 응답 변환 함수 반환
+
+        Parameters
+        ----------
+        model : type
+            typed 결과로 사용할 객체
+        columnar : bool
+            NumPy 컬럼 결과를 지원하는지 여부
+        """
+        as_array = kwargs.pop("as_array",False)
+        result_format = kwargs.pop("format",None)
+        if columnar and (as_array or result_format == "columnar"):
+            return decode_columns
+        if result_format == "typed" or (result_format is None and self.typed):
+            return ModelDecoder(model)
+        return None
+
+    def __make_headers(self,query_string=None):
         """authorize_token 및 headers 생성
         
         Parameters
         ---------- 
-        payload : str
-            access_key, query 등 추가된 페이로드
+        query_string : bytes
+            인코딩된 쿼리 스트링. 쿼리가 없는 요청은 None
         
         Returns
         -------
@@ -65,13 +363,12 @@ class Upbit:
 
         Example
         -------
-        __make_headers(payload = payload)
+        __make_headers(query_string)
 
         """
-        jwt_token = jwt.encode(payload, self.secret_key).decode('utf-8')
-        authorize_token = 'Bearer {}'.format(jwt_token)
-        headers = {"Authorization": authorize_token}
-        return headers
+        if query_string is None:
+            return self.signer.headers()
+        return self.signer.headers(self.__make_query_hash(query_string))
 
     def __make_query_hash(self,query_string):
         """query의 hash 생성
@@ -88,11 +385,9 @@ class Upbit:
         
         Example
         -------
-        __make_headers(payload = payload)
+        __make_query_hash(query_string)
         """
-        m = hashlib.sha512()
-        m.update(query_string)
-        return m.hexdigest()
+        return query_hash(query_string)
 
     '''
     EXCHANGE API
@@ -109,20 +404,9 @@ class Upbit:
         -------
         ub.accounts()
         """
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-        }
+        headers = self.__make_headers()
 
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("GET","/v1/accounts",headers=headers)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("accounts() failed")
-            return False
+        return self._request("accounts","GET","/v1/accounts",headers=headers)
 
     def order_chance(self,**kwargs):
         """마켓 별 주문 가능 정보를 확인
@@ -141,29 +425,10 @@ class Upbit:
         -------
         ub.order_chance(market="KRW-BTC")
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-            
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("GET","/v1/orders/chance",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("order_chance() failed")
-            return False
+        return self._request("order_chance","GET","/v1/orders/chance",headers=headers,params=query_string)
 
     
     def order(self,**kwargs):
@@ -189,29 +454,10 @@ class Upbit:
         -------
         uuid 혹은 identifier 둘 중 하나의 값이 반드시 포함되어야 함
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("GET","/v1/order",headers=headers,params=query)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        if res:
-            return res.json()
-        else:
-            self.logger.error("order() failed")
-            return False
+        return self._request("order","GET","/v1/order",headers=headers,params=query_string)
 
     def lists_orders(self,**kwargs):
         """주문 리스트를 조회
@@ -245,41 +491,10 @@ class Upbit:
         ub.lists_orders(state='done')
         """
 
-        query = {}
-        array_of_strings_lists = []
-        for item in kwargs.items():
-            if type(item[1]) == list:
-                array_of_strings_lists.append(item)
-            else:
-                query[item[0]] = item[1]
-        
-        query_string = urlencode(query)
-        
-        for array_of_string in array_of_strings_lists:
-            query[f"{array_of_string[0]}[]"]=array_of_string[1]
-            
-            query_string = "{}&{}".format(query_string,'&'.join([f"{array_of_string[0]}[]={x}" for x in array_of_string[1]])) 
-
-        query_string = query_string.encode()
-
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        res = self.__connect("GET","/v1/orders",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("list_orders() failed")
-            return False
+        return self._request("lists_orders","GET","/v1/orders",headers=headers,params=query_string)
 
     def cancel_order(self, **kwargs):
         """주문 UUID를 통해 해당 주문에 대한 취소 접수
@@ -304,29 +519,10 @@ class Upbit:
         -------
         uuid 혹은 identifier 둘 중 하나의 값이 반드시 포함되어야 함
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        res = self.__connect("DELETE","/v1/orders",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("cancel_order() failed")
-            return False
+        return self._request("cancel_order","DELETE","/v1/orders",headers=headers,params=query_string)
 
     def orders(self,**kwargs):
         """주문 요청
@@ -370,29 +566,200 @@ class Upbit:
         매수 주문의 경우 ord_type을 price로 설정하고 volume을 null 혹은 제외해야됩니다.
         매도 주문의 경우 ord_type을 market로 설정하고 price을 null 혹은 제외해야됩니다.
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
+
+        return self._request("orders","POST","/v1/orders",headers=headers,params=query_string)
+
+    def orders_batch(self,orders):
+        """여러 주문을 동시에 요청
+
+        order 요청 수 제한 안에서 동시에 보내며, 실패한 주문이 있어도 나머지 주문을 계속 요청함
+
+        Parameters
+        ----------
+        orders : list
+            orders() 의 키워드 인자 dict 목록
+
+        Returns
+        -------
+        list
+            요청 순서대로 {request, result, error}. 실패한 경우 error 는 {status, name, message}
+
+        Example
+        -------
+        results = ub.orders_batch([
+            {'market': 'KRW-BTC','side': 'bid','volume': '0.01','price': '100.0','ord_type': 'limit'},
+            {'market': 'KRW-ETH','side': 'ask','volume': '0.1','price': '5000000.0','ord_type': 'limit'},
+        ])
+        failed = [item for item in results if item['error']]
+        """
+        return self._batch("orders_batch",self.orders,list(orders))
+
+    def cancel_orders_batch(self,uuids=None,identifiers=None):
+        """여러 주문을 동시에 취소
+
+        Parameters
+        ----------
+        uuids : list
+            취소할 주문 UUID 목록
+        identifiers : list
+            취소할 주문 identifier 목록
+
+        Returns
+        -------
+        list
+            요청 순서대로 {request, result, error} (uuids 다음 identifiers 순)
 
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
+        Example
+        -------
+        ub.cancel_orders_batch(uuids=['uuid1','uuid2'])
+        """
+        items = [{"uuid": uuid} for uuid in uuids or ()]
+        items.extend({"identifier": identifier} for identifier in identifiers or ())
+        return self._batch("cancel_orders_batch",self.cancel_order,items)
 
-        headers = self.__make_headers(payload = payload)
+    def cancel_all(self,market=None,side=None):
+        """대기(wait) 및 예약(watch) 주문을 모두 조회하여 동시에 취소
 
-        res = self.__connect("POST","/v1/orders",headers=headers,params=query)
+        Parameters
+        ----------
+        market : str
+            Market ID. 비워서 요청시 전체 마켓
+        side : str
+            'bid' 혹은 'ask'. 비워서 요청시 모두
 
-        if res:
-            return res.json()
+        Returns
+        -------
+        list
+            취소 요청별 {request, result, error}. 주문 조회에 실패하면 False
+
+        Example
+        -------
+        ub.cancel_all(market='KRW-BTC',side='bid')
+        """
+        uuids = []
+        for state in OPEN_ORDER_STATES:
+            page = 1
+            while True:
+                orders = self.lists_orders(**open_orders_query(state,market,page))
+                if orders is False:
+                    self.logger.error("cancel_all() failed")
+                    return False
+                uuids.extend(order["uuid"] for order in orders if side is None or order["side"] == side)
+                if len(orders) < ORDERS_PAGE_LIMIT:
+                    break
+                page += 1
+        return self.cancel_orders_batch(uuids=uuids)
+
+    def _batch(self,name,method,items):
+        """items(키워드 인자 dict 목록)를 스레드 풀에서 동시에 요청하고 요청 순서대로 결과 반환"""
+        def call(kwargs):
+            try:
+                result = method(**kwargs)
+            except Exception as e:
+                return batch_result(kwargs,False,{"status": None,"name": type(e).__name__,"message": str(e)})
+            return batch_result(kwargs,result,last_error())
+
+        if len(items) <= 1:
+            results = [call(kwargs) for kwargs in items]
         else:
-            self.logger.error("orders() failed")
-            return False
+            results = list(self._executor().map(call,items))
+        failed = sum(1 for item in results if item["error"] is not None)
+        if failed:
+            self.logger.error(f"{name}() {failed}/{len(results)} failed")
+        return results
+
+    @staticmethod
+    def last_error():
+        """현재 스레드(AsyncUpbit 은 태스크)에서 마지막으로 실패한 요청의 원인
+
+        Returns
+        -------
+        dict
+            {status, name, message}. 직전 요청이 성공했으면 None
+
+        Example
+        -------
+        if ub.orders(**order) is False:
+            ub.last_error()
+        """
+        return last_error()
+
+    def iter_orders(self,since=None,until=None,stop=None,**kwargs):
+        """주문 리스트를 페이지 단위로 조회하며 주문을 하나씩 반환하는 generator
+
+        현재 페이지를 처리하는 동안 다음 페이지를 미리 요청하며, 한 번에 두 페이지만 메모리에 가짐
+
+        Parameters
+        ----------
+        since : datetime or str or int
+            이 시각 이후(포함)에 생성된 주문만. 기본 정렬(desc)에서는 더 오래된 주문을 만나면 멈춤
+        until : datetime or str or int
+            이 시각 이전(포함)에 생성된 주문만. order_by='asc' 에서는 더 새로운 주문을 만나면 멈춤
+        stop : callable
+            stop(order) 가 True 인 주문을 만나면 멈춤
+
+        그 외 파라미터는 lists_orders 와 동일 (page 는 시작 페이지, limit 기본값 100)
+
+        Returns
+        -------
+        generator
+            주문. 조회에 실패하면 RuntimeError
+
+        Example
+        -------
+        for order in ub.iter_orders(state='done',market='KRW-BTC',since='2021-01-01T00:00:00+09:00'):
+            print(order['uuid'])
+        """
+        return self._paginate("lists_orders",self.lists_orders,kwargs,PageBounds(since,until,stop,kwargs.get("order_by")))
+
+    def iter_withdraws(self,since=None,until=None,stop=None,**kwargs):
+        """출금 리스트를 하나씩 반환하는 generator (iter_orders 와 동일하며 그 외 파라미터는 withdraws 와 동일)
+
+        Example
+        -------
+        for withdraw in ub.iter_withdraws(currency='XRP',state='done'):
+            print(withdraw['uuid'])
+        """
+        return self._paginate("withdraws",self.withdraws,kwargs,PageBounds(since,until,stop,kwargs.get("order_by")))
+
+    def iter_deposits(self,since=None,until=None,stop=None,**kwargs):
+        """입금 리스트를 하나씩 반환하는 generator (iter_orders 와 동일하며 그 외 파라미터는 deposits 와 동일)
+
+        Example
+        -------
+        for deposit in ub.iter_deposits(currency='KRW',stop=lambda deposit: deposit['uuid'] == last_seen):
+            print(deposit['uuid'])
+        """
+        return self._paginate("deposits",self.deposits,kwargs,PageBounds(since,until,stop,kwargs.get("order_by")))
+
+    def _paginate(self,name,method,kwargs,bounds):
+        """다음 페이지를 스레드 풀에서 미리 요청하며 항목을 하나씩 반환"""
+        query,page,limit = page_query(kwargs)
+
+        def fetch(page):
+            # 실패 원인은 요청한 스레드에만 남으므로 함께 반환
+            return method(page=page,**query),last_error()
+
+        executor = self._executor()
+        future = executor.submit(fetch,page)
+        try:
+            while future is not None:
+                items,error = future.result()
+                if items is False:
+                    raise RuntimeError(f"{name}() failed at page {page} : {error}")
+                future = executor.submit(fetch,page + 1) if len(items) >= limit else None
+                page += 1
+                for item in items:
+                    verdict = bounds.check(item)
+                    if verdict is None:
+                        return
+                    if verdict:
+                        yield item
+        finally:
+            if future is not None:
+                future.cancel()
 
     def withdraws(self,**kwargs):
         """출금 리스트를 조회
@@ -424,41 +791,10 @@ class Upbit:
         ub.withdraws(currency= 'XRP',state='done')
         """
 
-        query = {}
-        array_of_strings_lists = []
-        for item in kwargs.items():
-            if type(item[1]) == list:
-                array_of_strings_lists.append(item)
-            else:
-                query[item[0]] = item[1]
-        
-        query_string = urlencode(query)
-        
-        for array_of_string in array_of_strings_lists:
-            query[f"{array_of_string[0]}[]"]=array_of_string[1]
-            
-            query_string = "{}&{}".format(query_string,'&'.join([f"{array_of_string[0]}[]={x}" for x in array_of_string[1]])) 
-
-        query_string = query_string.encode()
-
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("GET","/v1/withdraws",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("withdraws() failed")
-            return False
+        return self._request("withdraws","GET","/v1/withdraws",headers=headers,params=query_string)
 
     def withdraw(self,**kwargs):
         """출금 UUID를 통해 개별 출금 정보를 조회
@@ -481,29 +817,10 @@ class Upbit:
         -------
         ub.withdraw(uuid='d17fb771-ebba-4947-8428-ad5fd0b4caf5')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("GET","/v1/withdraw",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("withdraw() failed")
-            return False
+        return self._request("withdraw","GET","/v1/withdraw",headers=headers,params=query_string)
 
     def withdraws_chance(self,**kwargs):
         """해당 통화의 가능한 출금 정보를 확인
@@ -522,29 +839,10 @@ class Upbit:
         -------
         ub.withdraws_chance(currency='BTC')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        res = self.__connect("GET","/v1/withdraws/chance",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("withdraws_chance() failed")
-            return False
+        return self._request("withdraws_chance","GET","/v1/withdraws/chance",headers=headers,params=query_string)
 
     def withdraws_coin(self,**kwargs):
         """코인 출금을 요청한다.
@@ -571,29 +869,10 @@ class Upbit:
         -------
         ub.withdraws_coin(currency='BTC',amount= '0.01',address='3EusRwybuZUhVDeHL7gh3HSLmbhLcy7NqD')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("POST","/v1/withdraws/coin",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("withdraws_coin() failed")
-            return False
+        return self._request("withdraws_coin","POST","/v1/withdraws/coin",headers=headers,params=query_string)
 
     def withdraws_krw(self,**kwargs):
         """원화 출금을 요청하여 등록된 출금 계좌로 출금
@@ -612,29 +891,10 @@ class Upbit:
         -------
         ub.withdraws_krw(amount='10000')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("POST","/v1/withdraws/krw",headers=headers,params=query)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        if res:
-            return res.json()
-        else:
-            self.logger.error("withdraws_krw() failed")
-            return False
+        return self._request("withdraws_krw","POST","/v1/withdraws/krw",headers=headers,params=query_string)
 
     def deposits(self,**kwargs):
         """입금 리스트를 요청
@@ -665,41 +925,10 @@ class Upbit:
         -------
         ub.deposits(currency='KRW')
         """
-        query = {}
-        array_of_strings_lists = []
-        for item in kwargs.items():
-            if type(item[1]) == list:
-                array_of_strings_lists.append(item)
-            else:
-                query[item[0]] = item[1]
-        
-        query_string = urlencode(query)
-        
-        for array_of_string in array_of_strings_lists:
-            query[f"{array_of_string[0]}[]"]=array_of_string[1]
-            
-            query_string = "{}&{}".format(query_string,'&'.join([f"{array_of_string[0]}[]={x}" for x in array_of_string[1]])) 
-
-        query_string = query_string.encode()
-
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        res = self.__connect("GET","/v1/deposits",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("deposits() failed")
-            return False
+        return self._request("deposits","GET","/v1/deposits",headers=headers,params=query_string)
 
 
     def deposit(self,**kwargs):
@@ -723,29 +952,10 @@ class Upbit:
         -------
         ub.deposit(uuid='94332e99-3a87-4a35-ad98-28b0c969f830')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        res = self.__connect("GET","/v1/deposit",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("deposit() failed")
-            return False
+        return self._request("deposit","GET","/v1/deposit",headers=headers,params=query_string)
 
     def deposits_generate_coin_address(self,**kwargs):
         """입금 주소 생성을 요청
@@ -773,29 +983,10 @@ class Upbit:
         주소가 발급된 이후부터는 새로운 주소가 발급되는 것이 아닌 이전에 발급된 주소가 Response2 형태로 반환됩니다.
         정상적으로 주소가 생성되지 않는다면 일정 시간 이후 해당 API를 다시 호출해주시길 부탁드립니다.
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("POST","/v1/deposits/generate_coin_address",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("deposits_generate_coin_address() failed")
-            return False
+        return self._request("deposits_generate_coin_address","POST","/v1/deposits/generate_coin_address",headers=headers,params=query_string)
 
     def deposits_coin_addresses(self):
         """전체 입금 주소를 조회
@@ -810,20 +1001,9 @@ class Upbit:
         ub.deposits_coin_addresses()
         """
 
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4())
-        }
-
-        headers = self.__make_headers(payload = payload)
+        headers = self.__make_headers()
 
-        res = self.__connect("GET","/v1/deposits/coin_addresses",headers=headers)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("deposits_generate_coin_address() failed")
-            return False
+        return self._request("deposits_coin_addresses","GET","/v1/deposits/coin_addresses",headers=headers)
 
     def deposits_coin_address(self,**kwargs):
         """개별 입금 주소를 조회
@@ -842,29 +1022,10 @@ class Upbit:
         -------
         ub.deposits_coin_address(currency='BTC')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        res = self.__connect("GET","/v1/deposits/coin_address",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("deposits_coin_address() failed")
-            return False
+        return self._request("deposits_coin_address","GET","/v1/deposits/coin_address",headers=headers,params=query_string)
 
     def deposits_krw(self,**kwargs):
         """원화를 입금
@@ -883,29 +1044,10 @@ class Upbit:
         -------
         ub.deposits_krw(amount='5000')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
-
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
+        query_string = build_query(kwargs)
+        headers = self.__make_headers(query_string)
 
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("POST","/v1/deposits/krw",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("deposits_krw() failed")
-            return False
+        return self._request("deposits_krw","POST","/v1/deposits/krw",headers=headers,params=query_string)
 
     def status_wallet(self):
         """입출금 현황 및 블록 상태를 조회
@@ -920,20 +1062,9 @@ class Upbit:
         ub.status_wallet()
         """
 
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4())
-        }
-
-        headers = self.__make_headers(payload = payload)
+        headers = self.__make_headers()
 
-        res = self.__connect("GET","/v1/status/wallet",headers=headers)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("status_wallet() failed")
-            return False
+        return self._request("status_wallet","GET","/v1/status/wallet",headers=headers)
 
     def api_keys(self):
         """API 키 목록 및 만료 일자를 조회
@@ -948,20 +1079,9 @@ class Upbit:
         ub.api_keys()
         """
 
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4())
-        }
+        headers = self.__make_headers()
 
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("GET","/v1/api_keys",headers=headers)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("api_keys() failed")
-            return False
+        return self._request("api_keys","GET","/v1/api_keys",headers=headers)
 
     '''
     QUOTATION API
@@ -983,29 +1103,9 @@ class Upbit:
         -------
         ub.market_all(istDetails='false')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-        query_hash = self.__make_query_hash(query_string)
+        query_string = build_query(kwargs)
 
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-            'query_hash': query_hash,
-            'query_hash_alg': 'SHA512',
-        }
-
-        headers = self.__make_headers(payload = payload)
-
-        res = self.__connect("GET","/v1/market/all",headers=headers,params=query)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("market_all() failed")
-            return False
+        return self._request("market_all","GET","/v1/market/all",params=query_string)
 
     def candles_minutes(self,**kwargs):
         """분(Minute) 캔들
@@ -1020,6 +1120,10 @@ class Upbit:
             마지막 캔들 시각 (exclusive). 포맷 : yyyy-MM-dd'T'HH:mm:ssXXX or yyyy-MM-dd HH:mm:ss. 비워서 요청시 가장 최근 캔들
         count : int32
             캔들 개수(최대 200개까지 요청 가능)
+        as_array : bool
+            True 인 경우 NumPy 컬럼(Columns)으로 반환. format="columnar" 와 동일
+        format : string
+            'columnar', 'typed' (Candle/Trade 객체) 혹은 'json'. 비워서 요청시 typed 설정을 따름
 
         Returns
         -------
@@ -1030,6 +1134,7 @@ class Upbit:
         -------
         ub.candles_minutes(unit='1',market='KRW-BTC',count='1')
         """
+        decode = self.__pop_decoder(kwargs,Candle)
         query = {}
         unit = 1
         for item in kwargs.items():
@@ -1038,15 +1143,7 @@ class Upbit:
                 continue
             query[item[0]] = item[1]
         
-        query_string = urlencode(query).encode()
-
-        res = self.__connect("GET",f"/v1/candles/minutes/{unit}",params=query_string)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("candles_minutes() failed")
-            return False
+        return self._candles("candles_minutes",f"/v1/candles/minutes/{unit}",unit,query,decode)
 
     def candles_days(self,**kwargs):
         """일(day) 캔들
@@ -1061,6 +1158,10 @@ class Upbit:
             캔들 개수
         convertingPriceUnit : string
             종가 환산 화폐 단위 (생략 가능, KRW로 명시할 시 원화 환산 가격을 반환.)
+        as_array : bool
+            True 인 경우 NumPy 컬럼(Columns)으로 반환. format="columnar" 와 동일
+        format : string
+            'columnar', 'typed' (Candle/Trade 객체) 혹은 'json'. 비워서 요청시 typed 설정을 따름
 
         Returns
         -------
@@ -1071,19 +1172,12 @@ class Upbit:
         -------
         ub.candles_days(market='KRW-BTC',count='1')
         """
+        decode = self.__pop_decoder(kwargs,Candle)
         query = {}
         for item in kwargs.items():
             query[item[0]] = item[1]
         
-        query_string = urlencode(query).encode()
-
-        res = self.__connect("GET","/v1/candles/days",params=query_string)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("candles_days() failed")
-            return False
+        return self._candles("candles_days","/v1/candles/days","days",query,decode)
 
     def candles_weeks(self,**kwargs):
         """주(week) 캔들
@@ -1096,6 +1190,10 @@ class Upbit:
             마지막 캔들 시각 (exclusive). 포맷 : yyyy-MM-dd'T'HH:mm:ssXXX or yyyy-MM-dd HH:mm:ss. 비워서 요청시 가장 최근 캔들
         count : int32
             캔들 개수
+        as_array : bool
+            True 인 경우 NumPy 컬럼(Columns)으로 반환. format="columnar" 와 동일
+        format : string
+            'columnar', 'typed' (Candle/Trade 객체) 혹은 'json'. 비워서 요청시 typed 설정을 따름
 
         Returns
         -------
@@ -1106,19 +1204,12 @@ class Upbit:
         -------
         ub.candles_weeks(market='KRW-BTC',count='1')
         """
+        decode = self.__pop_decoder(kwargs,Candle)
         query = {}
         for item in kwargs.items():
             query[item[0]] = item[1]
         
-        query_string = urlencode(query).encode()
-
-        res = self.__connect("GET","/v1/candles/weeks",params=query_string)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("candles_weeks() failed")
-            return False
+        return self._candles("candles_weeks","/v1/candles/weeks","weeks",query,decode)
 
 
     def candles_months(self,**kwargs):
@@ -1132,6 +1223,10 @@ class Upbit:
             마지막 캔들 시각 (exclusive). 포맷 : yyyy-MM-dd'T'HH:mm:ssXXX or yyyy-MM-dd HH:mm:ss. 비워서 요청시 가장 최근 캔들
         count : int32
             캔들 개수
+        as_array : bool
+            True 인 경우 NumPy 컬럼(Columns)으로 반환. format="columnar" 와 동일
+        format : string
+            'columnar', 'typed' (Candle/Trade 객체) 혹은 'json'. 비워서 요청시 typed 설정을 따름
 
         Returns
         -------
@@ -1142,19 +1237,12 @@ class Upbit:
         -------
         ub.candles_months(market='KRW-BTC',count='1')
         """
+        decode = self.__pop_decoder(kwargs,Candle)
         query = {}
         for item in kwargs.items():
             query[item[0]] = item[1]
         
-        query_string = urlencode(query).encode()
-
-        res = self.__connect("GET","/v1/candles/months",params=query_string)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("candles_months() failed")
-            return False
+        return self._candles("candles_months","/v1/candles/months","months",query,decode)
 
     def trades_ticks(self,**kwargs):
         """최근 체결 내역
@@ -1171,6 +1259,10 @@ class Upbit:
             페이지네이션 커서 (sequentialId)
         daysAgo : int32
             최근 체결 날짜 기준 7일 이내의 이전 데이터 조회 가능. 비워서 요청 시 가장 최근 체결 날짜 반환. (범위: 1 ~ 7))
+        as_array : bool
+            True 인 경우 NumPy 컬럼(Columns)으로 반환. format="columnar" 와 동일
+        format : string
+            'columnar', 'typed' (Candle/Trade 객체) 혹은 'json'. 비워서 요청시 typed 설정을 따름
 
         Returns
         -------
@@ -1181,19 +1273,10 @@ class Upbit:
         -------
         ub.trades_ticks(market='KRW-BTC',count='1')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
+        decode = self.__pop_decoder(kwargs,Trade)
+        query_string = build_query(kwargs)
 
-        res = self.__connect("GET","/v1/trades/ticks",params=query_string)
-
-        if res:
-            return res.json()
-        else:
-            self.logger.error("trades_ticks() failed")
-            return False
+        return self._request("trades_ticks","GET","/v1/trades/ticks",params=query_string,decode=decode)
 
 
     def ticker(self,**kwargs):
@@ -1203,6 +1286,8 @@ class Upbit:
         ---------- 
         markets : string
             반점으로 구분되는 마켓 코드 (ex. KRW-BTC, BTC-BCC)
+        format : string
+            'typed' (Ticker 객체) 혹은 'json'. 비워서 요청시 typed 설정을 따름
 
         Returns
         -------
@@ -1213,19 +1298,10 @@ class Upbit:
         -------
         ub.ticker(markets='KRW-BTC')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
-        
-        query_string = urlencode(query).encode()
-
-        res = self.__connect("GET","/v1/ticker",params=query_string)
+        decode = self.__pop_decoder(kwargs,Ticker,columnar=False)
+        query_string = build_query(kwargs)
 
-        if res:
-            return res.json()
-        else:
-            self.logger.error("ticker() failed")
-            return False
+        return self._request("ticker","GET","/v1/ticker",params=query_string,decode=decode)
 
     def orderbook(self,**kwargs):
         """호가 정보를 조회
@@ -1234,6 +1310,8 @@ class Upbit:
         ---------- 
         markets : string
             반점으로 구분되는 마켓 코드 (ex. KRW-BTC, BTC-BCC)
+        format : string
+            'typed' (OrderbookSnapshot 객체) 혹은 'json'. 비워서 요청시 typed 설정을 따름
 
         Returns
         -------
@@ -1244,16 +1322,149 @@ class Upbit:
         -------
         ub.orderbook(markets='KRW-BTC')
         """
-        query = {}
-        for item in kwargs.items():
-            query[item[0]] = item[1]
+        decode = self.__pop_decoder(kwargs,OrderbookSnapshot,columnar=False)
+        query_string = build_query(kwargs)
+
+        return self._request("orderbook","GET","/v1/orderbook",params=query_string,decode=decode)
+
+    def ticker_bulk(self,markets,chunk_size=100):
+        """여러 마켓의 현재가 정보를 나누어 동시에 요청한 뒤 합쳐서 반환
+
+        Parameters
+        ---------- 
+        markets : list or string
+            마켓 코드 목록 혹은 반점으로 구분되는 마켓 코드
+        chunk_size : int
+            한 요청에 포함할 최대 마켓 개수
+
+        Returns
+        -------
+        dict
+            마켓 코드를 키로 하는 현재가 정보
         
-        query_string = urlencode(query).encode()
+        Example
+        -------
+        ub.ticker_bulk(['KRW-BTC','KRW-ETH','BTC-XRP'])
+        """
+        return self._bulk("ticker_bulk",self.ticker,markets,chunk_size)
+
+    def orderbook_bulk(self,markets,chunk_size=100):
+        """여러 마켓의 호가 정보를 나누어 동시에 요청한 뒤 합쳐서 반환
 
-        res = self.__connect("GET","/v1/orderbook",params=query_string)
+        Parameters
+        ---------- 
+        markets : list or string
+            마켓 코드 목록 혹은 반점으로 구분되는 마켓 코드
+        chunk_size : int
+            한 요청에 포함할 최대 마켓 개수
+
+        Returns
+        -------
+        dict
+            마켓 코드를 키로 하는 호가 정보
+        
+        Example
+        -------
+        ub.orderbook_bulk(['KRW-BTC','KRW-ETH','BTC-XRP'])
+        """
+        return self._bulk("orderbook_bulk",self.orderbook,markets,chunk_size)
 
-        if res:
-            return res.json()
+    def _bulk(self,name,method,markets,chunk_size):
+        chunks = chunk_markets(markets,chunk_size)
+        if len(chunks) == 1:
+            results = [method(markets=chunks[0])]
         else:
-            self.logger.error("orderbook() failed")
-            return False
+            results = list(self._executor().map(lambda chunk: method(markets=chunk),chunks))
+
+        merged = merge_by_market(results)
+        if merged is False:
+            self.logger.error(f"{name}() failed")
+        return merged
+
+    def fetch_candles_range(self,market,unit,start,end=None,as_array=False):
+        """기간 내의 캔들을 200개 단위 요청으로 나누어 동시에 받아 오름차순으로 반환
+
+        Parameters
+        ---------- 
+        market : string
+            마켓 코드 (ex. KRW-BTC)
+        unit : int or string
+            분 단위(1, 3, 5, 10, 15, 30, 60, 240) 혹은 'days', 'weeks', 'months'
+        start : datetime or string
+            시작 시각 (inclusive). timezone 이 없으면 UTC
+        end : datetime or string
+            끝 시각 (exclusive). 비워서 요청시 현재 시각
+        as_array : bool
+            True 인 경우 NumPy 컬럼(Columns)으로 반환
+
+        Returns
+        -------
+        list
+            시각 오름차순으로 정렬된 캔들
+        
+        Example
+        -------
+        ub.fetch_candles_range('KRW-BTC',1,'2021-01-01','2021-02-01')
+        """
+        return self.fetch_candles_ranges([market],unit,start,end,as_array)[market]
+
+    def fetch_candles_ranges(self,markets,unit,start,end=None,as_array=False):
+        """여러 마켓의 기간 내 캔들을 동시에 받아 마켓별로 반환
+
+        모든 마켓의 요청을 번갈아 배치하여 마켓들이 고르게 진행되도록 함
+
+        Parameters
+        ---------- 
+        markets : list
+            마켓 코드 목록
+        unit : int or string
+            분 단위(1, 3, 5, 10, 15, 30, 60, 240) 혹은 'days', 'weeks', 'months'
+        start : datetime or string
+            시작 시각 (inclusive). timezone 이 없으면 UTC
+        end : datetime or string
+            끝 시각 (exclusive). 비워서 요청시 현재 시각
+        as_array : bool
+            True 인 경우 마켓별 캔들을 NumPy 컬럼(Columns)으로 반환
+
+        Returns
+        -------
+        dict
+            {마켓 코드: 시각 오름차순으로 정렬된 캔들}. 실패한 마켓은 False
+        
+        Example
+        -------
+        ub.fetch_candles_ranges(['KRW-BTC','KRW-ETH'],'days','2020-01-01')
+        """
+        jobs,start,end = self._plan_candles_ranges(markets,unit,start,end)
+        pages = list(self._executor().map(lambda job: job[1](**job[2]),jobs))
+        return self._merge_candles_ranges(markets,jobs,pages,start,end,as_array)
+
+    def _plan_candles_ranges(self,markets,unit,start,end):
+        start = parse_time(start)
+        end = parse_time(end) if end is not None else parse_time(datetime.now(timezone.utc))
+        name,extra = candle_endpoint(unit)
+        method = getattr(self,name)
+        windows = plan_candle_windows(unit,start,end)
+        jobs = [
+            (market,method,dict(extra,market=market,to=format_time(to),count=count,format="json"))
+            for to,count in windows for market in markets
+        ]
+        return jobs,start,end
+
+    def _merge_candles_ranges(self,markets,jobs,pages,start,end,as_array=False):
+        results = {market: [] for market in markets}
+        for (market,_,_),page in zip(jobs,pages):
+            if page is False or results[market] is False:
+                results[market] = False
+            else:
+                results[market].append(page)
+        for market,market_pages in results.items():
+            if market_pages is False:
+                self.logger.error(f"fetch_candles_range({market}) failed")
+            else:
+                results[market] = merge_candles(market_pages,start,end)
+                if as_array:
+                    results[market] = Columns.from_records(results[market])
+                elif self.typed:
+                    results[market] = Candle.from_records(results[market])
+        return results
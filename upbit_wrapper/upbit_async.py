@@ -0,0 +1,313 @@
+import asyncio
+import functools
+import json
+import logging
+import time
+from urllib.parse import urljoin
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+from upbit_wrapper.upbit import ORDERS_PAGE_LIMIT
+from upbit_wrapper.upbit import OPEN_ORDER_STATES
+from upbit_wrapper.upbit import Upbit
+from upbit_wrapper.upbit import open_orders_query
+from upbit_wrapper.bulk import chunk_markets
+from upbit_wrapper.bulk import batch_result
+from upbit_wrapper.bulk import merge_by_market
+from upbit_wrapper.errors import clear_last_error
+from upbit_wrapper.errors import last_error
+from upbit_wrapper.errors import set_last_error
+from upbit_wrapper.pagination import page_query
+from upbit_wrapper.query import build_query
+from upbit_wrapper.response_cache import request_key
+
+RETRY_STATUS = (500,502,503,504)
+
+class AsyncUpbit(Upbit):
+    """asyncio 기반 Upbit 클라이언트
+
+    Upbit 의 모든 메소드를 그대로 제공하며, 각 메소드는 coroutine 을 반환함.
+    쿼리 생성과 JWT 서명은 Upbit 의 로직을 그대로 사용하고 전송 단계(_request)만 aiohttp 로 대체
+
+    Example
+    -------
+    async with AsyncUpbit('access_key','secret_key',concurrency=200) as ub:
+        results = await asyncio.gather(*[ub.candles_minutes(unit=1,market=m,count=200) for m in markets])
+    """
+    def __init__(self,access_key=None,secret_key=None,server_url="https://api.upbit.com",
+                 pool_maxsize=100,concurrency=100,max_retries=0,backoff_factor=0,
+                 keep_alive=True,timeout=None,rate_limiter=None,candle_store=None,
+                 response_cache=None,typed=False,recorder=None,instrumentation=None):
+        """AsyncUpbit 객체 생성
+
+        Parameters
+        ----------
+        pool_maxsize : int
+            커넥션 풀의 최대 커넥션 개수 (0 인 경우 무제한)
+        concurrency : int
+            동시에 진행 중인 요청의 최대 개수 (None 인 경우 무제한)
+        max_retries : int
+            GET 요청의 연결 실패 및 5xx 응답 재시도 횟수
+        backoff_factor : float
+            재시도 간 지수 백오프 계수
+        keep_alive : bool
+            False 인 경우 매 요청마다 커넥션을 닫음
+        timeout : float or tuple
+            전체 타임아웃 혹은 (connect, read) 타임아웃
+
+        그 외 파라미터는 Upbit 과 동일
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncUpbit requires aiohttp (pip install upbit-wrapper[async])")
+        self.concurrency = concurrency
+        self.semaphore = None
+        super().__init__(access_key,secret_key,server_url=server_url,
+                         pool_connections=1,pool_maxsize=pool_maxsize,max_retries=max_retries,
+                         backoff_factor=backoff_factor,keep_alive=keep_alive,timeout=timeout,
+                         rate_limiter=rate_limiter,candle_store=candle_store,
+                         response_cache=response_cache,typed=typed,recorder=recorder,
+                         instrumentation=instrumentation)
+        self.logger = logging.getLogger("AsyncUpbit")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self,exc_type,exc_value,traceback):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("AsyncUpbit must be used with 'async with'")
+
+    async def close(self):
+        """커넥션 풀을 닫음
+
+        Example
+        -------
+        await ub.close()
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _make_session(self):
+        # aiohttp.ClientSession 은 이벤트 루프 안에서 생성해야 하므로 첫 요청 시 생성
+        return None
+
+    def __get_session(self):
+        if self.session is None:
+            if isinstance(self.timeout,tuple):
+                timeout = aiohttp.ClientTimeout(sock_connect=self.timeout[0],sock_read=self.timeout[1])
+            else:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize,force_close=not self.keep_alive)
+            trace_configs = None if self.instrumentation is None else [self.instrumentation.trace_config()]
+            self.session = aiohttp.ClientSession(connector=connector,timeout=timeout,trace_configs=trace_configs)
+            if self.concurrency:
+                self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self.session
+
+    def __make_url(self,api_path,params):
+        url = urljoin(self.server_url,api_path)
+        if params:
+            if isinstance(params,bytes):
+                query_string = params.decode()
+            else:
+                query_string = build_query(params).decode()
+            url = f"{url}?{query_string}"
+        return URL(url,encoded=True)
+
+    async def __connect(self,method,api_path,headers=None,params=None,event=None):
+        """api_path로 요청하고 (status, headers, body) 반환
+
+        Returns
+        -------
+        tuple
+            (status, headers, body). 실패 시 False
+        """
+        session = self.__get_session()
+        url = self.__make_url(api_path,params)
+        retries = self.max_retries if method == "GET" else 0
+        attempt = 0
+        if event is not None:
+            event.cached = False
+        while True:
+            if event is not None:
+                start = time.perf_counter()
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async(method,api_path)
+            try:
+                if event is None:
+                    async with session.request(method,url,headers=headers) as res:
+                        body = await res.read()
+                        status = res.status
+                        res_headers = res.headers
+                else:
+                    sent = time.perf_counter()
+                    event.wait = sent - start
+                    async with session.request(method,url,headers=headers,trace_request_ctx=event) as res:
+                        received = time.perf_counter()
+                        body = await res.read()
+                        status = res.status
+                        res_headers = res.headers
+                    event.server = received - sent - (event.dns or 0.0) - (event.connect or 0.0)
+                    event.transfer = time.perf_counter() - received
+                    event.response(status,res_headers,len(body))
+                if self.rate_limiter:
+                    self.rate_limiter.update(method,api_path,res_headers.get("Remaining-Req"),status)
+            except (aiohttp.ClientError,asyncio.TimeoutError) as e:
+                if attempt >= retries:
+                    self.logger.error(f"connect failed reason : {e}")
+                    set_last_error(None,name=type(e).__name__,message=str(e))
+                    return False
+            else:
+                if status >= 200 and status < 300:
+                    return status,res_headers,body
+                if status not in RETRY_STATUS or attempt >= retries:
+                    self.logger.error(f"connect failed reason : {body.decode()}")
+                    set_last_error(status,body)
+                    return False
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+
+    async def _request(self,name,method,api_path,decode=None,**kwargs):
+        """요청을 보내고 json 으로 디코딩된 응답 반환 (Upbit._request 의 비동기 버전)"""
+        clear_last_error()
+        instrumentation = self.instrumentation
+        event = None if instrumentation is None else instrumentation.start(name,method,api_path)
+        try:
+            cache = self.response_cache
+            if cache is not None and cache.caches(name):
+                if event is not None:
+                    event.cached = True
+                key = request_key(method,api_path,kwargs.get("params"))
+                content = await cache.fetch_async(name,key,lambda: self.__content(method,api_path,event=event,**kwargs))
+            else:
+                content = await self.__content(method,api_path,event=event,**kwargs)
+
+            if content is not False:
+                if event is None:
+                    return json.loads(content) if decode is None else decode(content)
+                start = time.perf_counter()
+                result = json.loads(content) if decode is None else decode(content)
+                event.decode = time.perf_counter() - start
+                return result
+            else:
+                self.logger.error(f"{name}() failed")
+                if event is not None:
+                    event.error = "failed"
+                return False
+        except Exception as e:
+            if event is not None:
+                event.error = type(e).__name__
+            raise
+        finally:
+            if event is not None:
+                instrumentation.finish(event)
+
+    async def __content(self,method,api_path,**kwargs):
+        """api_path로 요청하여 응답 본문 반환. 실패 시 False"""
+        self.__get_session()
+        if self.semaphore is None:
+            res = await self.__connect(method,api_path,**kwargs)
+        else:
+            async with self.semaphore:
+                res = await self.__connect(method,api_path,**kwargs)
+        if res and self.recorder is not None:
+            self.recorder.response(method,api_path,kwargs.get("params"),res[2])
+        return res[2] if res else False
+
+    async def _candles(self,name,api_path,unit,query,decode=None):
+        """Upbit._candles 의 비동기 버전"""
+        store = self.candle_store
+        if store is None or not store.accepts(query):
+            return await self._request(name,"GET",api_path,params=build_query(query),decode=decode)
+
+        # CandleStore 는 SQLite 를 동기로 읽고 쓰므로 이벤트 루프를 막지 않도록 기본 스레드 풀에서 실행
+        loop = asyncio.get_running_loop()
+        lookup = await loop.run_in_executor(
+            None,functools.partial(store.lookup,query["market"],unit,query.get("to"),query.get("count",1)))
+        while lookup.request is not None:
+            rows = await self._request(name,"GET",api_path,params=build_query(lookup.request))
+            if rows is False:
+                return False
+            await loop.run_in_executor(None,store.resolve,lookup,rows)
+        return self._from_records(decode,lookup.result)
+
+    async def _bulk(self,name,method,markets,chunk_size):
+        chunks = chunk_markets(markets,chunk_size)
+        results = await asyncio.gather(*[method(markets=chunk) for chunk in chunks])
+
+        merged = merge_by_market(results)
+        if merged is False:
+            self.logger.error(f"{name}() failed")
+        return merged
+
+    async def cancel_all(self,market=None,side=None):
+        """Upbit.cancel_all 의 비동기 버전"""
+        uuids = []
+        for state in OPEN_ORDER_STATES:
+            page = 1
+            while True:
+                orders = await self.lists_orders(**open_orders_query(state,market,page))
+                if orders is False:
+                    self.logger.error("cancel_all() failed")
+                    return False
+                uuids.extend(order["uuid"] for order in orders if side is None or order["side"] == side)
+                if len(orders) < ORDERS_PAGE_LIMIT:
+                    break
+                page += 1
+        return await self.cancel_orders_batch(uuids=uuids)
+
+    async def _batch(self,name,method,items):
+        """items 를 동시에 요청하고 요청 순서대로 결과 반환 (Upbit._batch 의 비동기 버전)"""
+        async def call(kwargs):
+            try:
+                result = await method(**kwargs)
+            except Exception as e:
+                return batch_result(kwargs,False,{"status": None,"name": type(e).__name__,"message": str(e)})
+            return batch_result(kwargs,result,last_error())
+
+        results = await asyncio.gather(*[call(kwargs) for kwargs in items])
+        failed = sum(1 for item in results if item["error"] is not None)
+        if failed:
+            self.logger.error(f"{name}() {failed}/{len(results)} failed")
+        return list(results)
+
+    async def _paginate(self,name,method,kwargs,bounds):
+        """Upbit._paginate 의 비동기 버전. iter_orders, iter_withdraws, iter_deposits 가 async generator 가 됨"""
+        query,page,limit = page_query(kwargs)
+
+        async def fetch(page):
+            return await method(page=page,**query),last_error()
+
+        task = asyncio.ensure_future(fetch(page))
+        try:
+            while task is not None:
+                items,error = await task
+                if items is False:
+                    raise RuntimeError(f"{name}() failed at page {page} : {error}")
+                task = asyncio.ensure_future(fetch(page + 1)) if len(items) >= limit else None
+                page += 1
+                for item in items:
+                    verdict = bounds.check(item)
+                    if verdict is None:
+                        return
+                    if verdict:
+                        yield item
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def fetch_candles_range(self,market,unit,start,end=None,as_array=False):
+        """Upbit.fetch_candles_range 의 비동기 버전"""
+        return (await self.fetch_candles_ranges([market],unit,start,end,as_array))[market]
+
+    async def fetch_candles_ranges(self,markets,unit,start,end=None,as_array=False):
+        """Upbit.fetch_candles_ranges 의 비동기 버전"""
+        jobs,start,end = self._plan_candles_ranges(markets,unit,start,end)
+        pages = await asyncio.gather(*[method(**kwargs) for _,method,kwargs in jobs])
+        return self._merge_candles_ranges(markets,jobs,pages,start,end,as_array)
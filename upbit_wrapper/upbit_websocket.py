@@ -1,43 +1,299 @@
 from websocket import WebSocketApp
 from threading import Thread
-import json
+from threading import Event
+from threading import Lock
+from collections import deque
+import logging
+import random
 import time
+
+from upbit_wrapper.decoder import get_decoder
+from upbit_wrapper.models import from_message
+
+class Backoff:
+    """지수 백오프 + full jitter 재연결 대기 시간
+
+    Parameters
+    ----------
+    base : float
+        첫 재연결 대기 시간의 상한(초)
+    maximum : float
+        재연결 대기 시간의 최대 상한(초)
+    """
+    def __init__(self, base=0.5, maximum=30.0):
+        self.base = base
+        self.maximum = maximum
+        self.attempt = 0
+
+    def next(self):
+        delay = random.uniform(0, min(self.maximum, self.base * (2 ** self.attempt)))
+        self.attempt += 1
+        return delay
+
+    def reset(self):
+        self.attempt = 0
+
+class FeedMonitor:
+    """연결 끊김 구간(gap)과 체결 순서 이상을 기록
+
+    sync/async 웹소켓이 함께 사용함
+    """
+    def __init__(self, on_gap=None, max_gaps=100):
+        self.on_gap = on_gap
+        self.lock = Lock()
+        self.gaps = deque(maxlen=max_gaps)
+        self.sequences = {}
+        self.down_since = None
+        self.counters = {
+            "connects": 0,
+            "reconnects": 0,
+            "messages": 0,
+            "stale_timeouts": 0,
+            "gaps": 0,
+            "out_of_order": 0,
+            "duplicates": 0,
+        }
+        self.downtime_seconds = 0.0
+        self.reconnect_latencies = deque(maxlen=max_gaps)
+
+    def connected(self):
+        with self.lock:
+            if self.counters["connects"]:
+                self.counters["reconnects"] += 1
+                if self.down_since is not None:
+                    self.reconnect_latencies.append(time.time() - self.down_since)
+            self.counters["connects"] += 1
+
+    def disconnected(self):
+        with self.lock:
+            if self.down_since is None:
+                self.down_since = time.time()
+
+    def stale(self):
+        with self.lock:
+            self.counters["stale_timeouts"] += 1
+
+    def message(self, msg):
+        """메시지 수신 기록. 끊겼던 구간이 있으면 gap 으로 기록하고 on_gap(start, end) 호출 (epoch 초)"""
+        gap = None
+        with self.lock:
+            self.counters["messages"] += 1
+            if self.down_since is not None:
+                gap = (self.down_since, time.time())
+                self.down_since = None
+                self.gaps.append(gap)
+                self.counters["gaps"] += 1
+                self.downtime_seconds += gap[1] - gap[0]
+            if isinstance(msg, dict):
+                self.__check_sequence(msg)
+        if gap is not None and self.on_gap is not None:
+            self.on_gap(*gap)
+
+    def __check_sequence(self, msg):
+        if msg.get("type", msg.get("ty")) != "trade":
+            return
+        sequential_id = msg.get("sequential_id", msg.get("sid"))
+        if sequential_id is None:
+            return
+        code = msg.get("code", msg.get("cd"))
+        last = self.sequences.get(code)
+        if last is not None:
+            if sequential_id == last:
+                self.counters["duplicates"] += 1
+                return
+            if sequential_id < last:
+                self.counters["out_of_order"] += 1
+                return
+        self.sequences[code] = sequential_id
+
+    def metrics(self):
+        with self.lock:
+            metrics = dict(self.counters)
+            latencies = list(self.reconnect_latencies)
+            metrics["downtime_seconds"] = self.downtime_seconds
+            metrics["last_reconnect_latency"] = latencies[-1] if latencies else None
+            metrics["mean_reconnect_latency"] = sum(latencies) / len(latencies) if latencies else None
+            metrics["recent_gaps"] = list(self.gaps)
+        return metrics
+
 class UpbitWebSocket:
-    def __init__(self, request, callback=print):
+    def __init__(self, request, callback=print, reconnect=True, backoff_base=0.5, backoff_max=30.0,
+                 ping_interval=30, ping_timeout=10, stale_timeout=None, on_gap=None, decoder="auto",
+                 typed=False, recorder=None, instrumentation=None, url="wss://api.upbit.com/websocket/v1"):
+        """Upbit 웹소켓 객체 생성
+
+        연결이 끊기면 지수 백오프(jitter 포함) 후 다시 연결하고 request 를 다시 보냄
+
+        Parameters
+        ----------
+        request : str
+            구독 요청 json 문자열
+        callback : callable
+            메시지를 받을 함수
+        reconnect : bool
+            False 인 경우 연결이 끊기면 종료
+        backoff_base : float
+            첫 재연결 대기 시간의 상한(초)
+        backoff_max : float
+            재연결 대기 시간의 최대 상한(초)
+        ping_interval : float
+            ping 전송 간격(초). 0 인 경우 보내지 않음
+        ping_timeout : float
+            pong 대기 시간(초). 넘으면 연결을 끊고 다시 연결
+        stale_timeout : float
+            이 시간(초) 동안 메시지가 없으면 연결을 끊고 다시 연결. None 인 경우 확인하지 않음
+        on_gap : callable
+            끊겼다 다시 메시지를 받으면 on_gap(start, end) 로 끊긴 구간(epoch 초)을 알려줌
+        decoder : str or callable
+            메시지 디코더. 'auto', 'orjson', 'ujson', 'json', 'raw' (bytes 그대로 전달) 혹은 bytes 를 받는 함수
+        typed : bool
+            True 인 경우 ticker, trade, orderbook 메시지를 Ticker, Trade, OrderbookSnapshot 객체로 변환
+        recorder : Recorder
+            설정하면 받은 프레임을 디코딩 전 원본 그대로 기록 (upbit_wrapper.recorder)
+        instrumentation : Instrumentation
+            설정하면 메시지마다 디코딩/콜백 시간과 초당 메시지 수를 수집 (upbit_wrapper.instrumentation)
+        url : str
+            웹소켓 서버 주소
+
+        Example
+        -------
+        ws = UpbitWebSocket(request, callback=print, stale_timeout=10)
+        ws.start()
+        """
+        self.logger = logging.getLogger("UpbitWebSocket")
+        self.url = url
         self.request = request
         self.callback = callback
-        self.ws = WebSocketApp(
-            url="wss://api.upbit.com/websocket/v1",
+        self.decode = get_decoder(decoder)
+        self.typed = typed
+        self.recorder = recorder
+        self.instrumentation = instrumentation
+        self.reconnect = reconnect
+        self.backoff = Backoff(backoff_base, backoff_max)
+        self.healthy = False
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.stale_timeout = stale_timeout
+        self.monitor = FeedMonitor(on_gap)
+        self.stop_event = Event()
+        self.last_message = time.monotonic()
+        self.ws = self.__make_app()
+        self.running = False
+
+    def __make_app(self):
+        return WebSocketApp(
+            url=self.url,
             on_message=lambda ws, msg: self.on_message(ws, msg),
             on_error=lambda ws, msg: self.on_error(ws, msg),
-            on_close=lambda ws:     self.on_close(ws),
+            on_close=lambda ws, *args: self.on_close(ws),
             on_open=lambda ws:     self.on_open(ws))
-        self.running = False
-    
+
     def on_message(self, ws, msg):
-        msg = json.loads(msg.decode('utf-8'))
+        self.last_message = time.monotonic()
+        if not self.healthy:
+            # 연결 직후 끊는 서버에 빠르게 재연결하지 않도록 메시지를 받은 후에 백오프를 초기화
+            self.healthy = True
+            self.backoff.reset()
+        if self.recorder is not None:
+            self.recorder.frame(msg)
+        if self.instrumentation is not None:
+            self.__instrumented(msg)
+            return
+        msg = self.decode(msg)
+        self.monitor.message(msg)
+        if self.typed:
+            msg = from_message(msg)
+        self.callback(msg)
+
+    def __instrumented(self, msg):
+        start = time.perf_counter()
+        msg = self.decode(msg)
+        self.monitor.message(msg)
+        if self.typed:
+            msg = from_message(msg)
+        decoded = time.perf_counter()
         self.callback(msg)
-    
+        self.instrumentation.message("UpbitWebSocket", decoded - start, time.perf_counter() - decoded)
+
     def on_error(self, ws, msg):
         self.callback(msg)
-    
+
     def on_close(self, ws):
+        self.monitor.disconnected()
         self.callback("closed")
-        self.running = False
 
     def on_open(self, ws):
-        th = Thread(target=self.activate, daemon=True)
-        th.start()
-    
+        self.last_message = time.monotonic()
+        self.monitor.connected()
+        self.healthy = False
+        self.activate()
+
     def activate(self):
+        """구독 요청 전송. 다시 연결될 때마다 호출됨"""
         self.ws.send(self.request)
-        while self.running:
-            time.sleep(1)
-        self.ws.close()
-    
+
+    def resubscribe(self, request):
+        """구독 요청을 바꿈. 현재 연결을 끊고 다시 연결하면서 새 request 를 보냄"""
+        self.request = request
+        if self.running:
+            self.__drop()
+
+    def watch(self):
+        """stale_timeout 동안 메시지가 없으면 연결을 끊어 다시 연결하게 함"""
+        interval = min(1.0, self.stale_timeout / 4)
+        while not self.stop_event.wait(interval):
+            if time.monotonic() - self.last_message > self.stale_timeout:
+                self.logger.warning("no message for %.1fs, reconnecting", self.stale_timeout)
+                self.monitor.stale()
+                self.last_message = time.monotonic()
+                self.__drop()
+
+    def __drop(self):
+        """연결을 끊어 run_forever 를 종료시킴
+
+        WebSocketApp.close 는 소켓을 바로 닫아 select 중인 run_forever 를 깨우지 못하므로
+        shutdown 만 하고 정리는 run_forever 에 맡김
+        """
+        sock = self.ws.sock
+        if sock is not None:
+            sock.abort()
+        else:
+            self.ws.close(timeout=0)
+
     def start(self):
         self.running = True
-        self.ws.run_forever()
+        self.stop_event.clear()
+        if self.stale_timeout:
+            Thread(target=self.watch, daemon=True).start()
+        while self.running:
+            self.ws.run_forever(ping_interval=self.ping_interval, ping_timeout=self.ping_timeout)
+            self.monitor.disconnected()
+            if not self.running or not self.reconnect:
+                break
+            delay = self.backoff.next()
+            self.logger.warning("connection lost, reconnecting in %.2fs", delay)
+            if self.stop_event.wait(delay):
+                break
+            self.ws = self.__make_app()
+        self.running = False
+        self.stop_event.set()
+
+    def stop(self):
+        """연결을 닫고 start() 를 종료"""
+        self.running = False
+        self.stop_event.set()
+        self.__drop()
+
+    def metrics(self):
+        """재연결 및 메시지 통계
+
+        Returns
+        -------
+        dict
+            connects, reconnects, messages, stale_timeouts, gaps, out_of_order, duplicates,
+            downtime_seconds, last_reconnect_latency, mean_reconnect_latency, recent_gaps
+        """
+        return self.monitor.metrics()
 
 def aa(bb):
     print(bb)
@@ -45,4 +301,4 @@ def aa(bb):
 if __name__ == "__main__":
     request='[{"ticket":"KRT-BTC"},{"type":"ticker","codes":["KRW-BTC"]}]'
     real = UpbitWebSocket(request=request,callback=aa)
-    real.start()
\ No newline at end of file
+    real.start()
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from upbit_wrapper.upbit_websocket import Backoff
+from upbit_wrapper.upbit_websocket import FeedMonitor
+from upbit_wrapper.decoder import get_decoder
+from upbit_wrapper.models import from_message
+
+# 큐가 가득 찬 경우의 처리 방법
+OVERFLOW = ("block","drop_oldest")
+
+_CLOSED = object()
+
+class AsyncUpbitWebSocket:
+    """asyncio 기반 Upbit 웹소켓 클라이언트
+
+    메시지는 `async for` 로 받으며, 소비가 늦어 큐가 가득 차면 수신을 멈춤(backpressure).
+    연결이 끊기면 UpbitWebSocket 과 같은 방식으로 다시 연결하고 request 를 다시 보냄
+
+    Example
+    -------
+    async with AsyncUpbitWebSocket(request,queue_size=4096) as ws:
+        async for msg in ws:
+            print(msg)
+    """
+    def __init__(self, request, queue_size=1024, overflow="block", reconnect=True, backoff_base=0.5,
+                 backoff_max=30.0, heartbeat=30, stale_timeout=None, on_gap=None, decoder="auto",
+                 typed=False, session=None, recorder=None, instrumentation=None,
+                 url="wss://api.upbit.com/websocket/v1"):
+        """AsyncUpbitWebSocket 객체 생성
+
+        Parameters
+        ----------
+        request : str
+            구독 요청 json 문자열
+        queue_size : int
+            받은 메시지를 담아 둘 큐의 크기
+        overflow : str
+            큐가 가득 찬 경우 'block' 은 수신을 멈추고, 'drop_oldest' 는 가장 오래된 메시지를 버림
+        reconnect : bool
+            False 인 경우 연결이 끊기면 종료
+        backoff_base : float
+            첫 재연결 대기 시간의 상한(초)
+        backoff_max : float
+            재연결 대기 시간의 최대 상한(초)
+        heartbeat : float
+            ping 전송 간격(초). None 인 경우 보내지 않음
+        stale_timeout : float
+            이 시간(초) 동안 메시지가 없으면 연결을 끊고 다시 연결. None 인 경우 확인하지 않음
+        on_gap : callable
+            끊겼다 다시 메시지를 받으면 on_gap(start, end) 로 끊긴 구간(epoch 초)을 알려줌
+        decoder : str or callable
+            메시지 디코더. 'auto', 'orjson', 'ujson', 'json', 'raw' (bytes 그대로 전달) 혹은 bytes 를 받는 함수
+        typed : bool
+            True 인 경우 ticker, trade, orderbook 메시지를 Ticker, Trade, OrderbookSnapshot 객체로 변환
+        session : aiohttp.ClientSession
+            사용할 세션. 비워서 요청시 새로 생성하고 close() 에서 닫음
+        recorder : Recorder
+            설정하면 받은 프레임을 디코딩 전 원본 그대로 기록 (upbit_wrapper.recorder)
+        instrumentation : Instrumentation
+            설정하면 메시지마다 디코딩 시간, 큐 대기 시간(callback 항목)과 초당 메시지 수를 수집 (upbit_wrapper.instrumentation)
+        url : str
+            웹소켓 서버 주소
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncUpbitWebSocket requires aiohttp (pip install upbit-wrapper[async])")
+        if overflow not in OVERFLOW:
+            raise ValueError(f"overflow must be one of {OVERFLOW}")
+        self.logger = logging.getLogger("AsyncUpbitWebSocket")
+        self.url = url
+        self.request = request
+        self.decode = get_decoder(decoder)
+        self.typed = typed
+        self.recorder = recorder
+        self.instrumentation = instrumentation
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.reconnect = reconnect
+        self.backoff = Backoff(backoff_base, backoff_max)
+        self.heartbeat = heartbeat
+        self.stale_timeout = stale_timeout
+        self.monitor = FeedMonitor(on_gap)
+        self.session = session
+        self.own_session = session is None
+        self.queue = None
+        self.task = None
+        self.ws = None
+        self.dropped = 0
+        self.last_message = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.queue is None:
+            await self.start()
+        msg = await self.queue.get()
+        if msg is _CLOSED:
+            # 다른 소비자도 종료되도록 다시 넣어 둠
+            self.queue.put_nowait(_CLOSED)
+            raise StopAsyncIteration
+        return msg
+
+    async def start(self):
+        """현재 이벤트 루프에서 수신을 시작"""
+        if self.task is not None:
+            return
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        self.queue = asyncio.Queue(self.queue_size)
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def close(self):
+        """연결을 닫고 수신을 종료
+
+        Example
+        -------
+        await ws.close()
+        """
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                self.logger.error(f"receive task failed reason : {e}")
+            self.task = None
+        if self.own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def run(self):
+        """연결이 끊기면 백오프 후 다시 연결하는 수신 루프"""
+        closed = False
+        try:
+            while True:
+                try:
+                    await self.__receive()
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    self.logger.warning(f"connection failed reason : {e}")
+                self.monitor.disconnected()
+                if not self.reconnect:
+                    break
+                delay = self.backoff.next()
+                self.logger.warning("connection lost, reconnecting in %.2fs", delay)
+                await asyncio.sleep(delay)
+            await self.queue.put(_CLOSED)
+            closed = True
+        except Exception as e:
+            self.logger.error(f"receive loop failed reason : {e}")
+        finally:
+            self.ws = None
+            if not closed:
+                # close() 혹은 오류로 종료된 경우 소비자를 깨우기 위해 자리가 없으면 가장 오래된 메시지를 버림
+                if self.queue.full():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(_CLOSED)
+
+    async def __receive(self):
+        async with self.session.ws_connect(self.url, heartbeat=self.heartbeat) as ws:
+            self.ws = ws
+            self.last_message = time.monotonic()
+            self.monitor.connected()
+            healthy = False
+            await ws.send_str(self.request)
+            while True:
+                try:
+                    msg = await ws.receive(timeout=self.stale_timeout)
+                except asyncio.TimeoutError:
+                    self.logger.warning("no message for %.1fs, reconnecting", self.stale_timeout)
+                    self.monitor.stale()
+                    return
+                if msg.type == aiohttp.WSMsgType.BINARY or msg.type == aiohttp.WSMsgType.TEXT:
+                    self.last_message = time.monotonic()
+                    if not healthy:
+                        # 연결 직후 끊는 서버에 빠르게 재연결하지 않도록 메시지를 받은 후에 백오프를 초기화
+                        healthy = True
+                        self.backoff.reset()
+                    start = time.perf_counter()
+                    try:
+                        if self.recorder is not None:
+                            self.recorder.frame(msg.data)
+                        data = self.decode(msg.data)
+                        self.monitor.message(data)
+                        if self.typed:
+                            data = from_message(data)
+                    except Exception as e:
+                        # 잘못된 프레임 하나로 수신이 멈추지 않도록 버리고 계속 받음
+                        self.logger.error(f"message handling failed reason : {e}")
+                        continue
+                    decoded = time.perf_counter()
+                    await self.__put(data)
+                    if self.instrumentation is not None:
+                        self.instrumentation.message("AsyncUpbitWebSocket", decoded - start, time.perf_counter() - decoded)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    self.logger.warning(f"websocket error : {ws.exception()}")
+                    return
+                else:
+                    return
+
+    async def __put(self, msg):
+        if self.overflow == "block":
+            await self.queue.put(msg)
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(msg)
+
+    def metrics(self):
+        """재연결 및 메시지 통계
+
+        Returns
+        -------
+        dict
+            UpbitWebSocket.metrics() 의 항목과 dropped (버린 메시지 개수), queued (큐에 쌓인 메시지 개수)
+        """
+        metrics = self.monitor.metrics()
+        metrics["dropped"] = self.dropped
+        metrics["queued"] = self.queue.qsize() if self.queue is not None else 0
+        return metrics
@@ -0,0 +1,383 @@
+"""여러 웹소켓 연결로 마켓을 나누어 구독하는 풀
+
+마켓 코드를 N 개의 연결(shard)에 나누고, 각 연결은 스레드 혹은 프로세스에서 동작함.
+모든 메시지는 하나의 큐로 모이며, 한 마켓은 항상 한 연결에서만 받으므로 마켓별 순서가 유지됨
+"""
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+
+from upbit_wrapper.upbit_websocket import UpbitWebSocket
+
+# 마켓 목록 갱신 시 사용하는 요청 주기(초)
+DEFAULT_REBALANCE_INTERVAL = 60.0
+
+def make_request(ticket,types,codes,simple=False):
+    """구독 요청 json 문자열 생성
+
+    Parameters
+    ----------
+    ticket : str
+        요청 식별자
+    types : tuple
+        구독할 타입 (ticker, trade, orderbook)
+    codes : list
+        마켓 코드 목록
+    simple : bool
+        True 인 경우 SIMPLE 형식으로 요청
+    """
+    request = [{"ticket": ticket}]
+    request.extend({"type": kind,"codes": list(codes)} for kind in types)
+    if simple:
+        request.append({"format": "SIMPLE"})
+    return json.dumps(request)
+
+def assign_markets(markets,assignment,shards):
+    """마켓을 shard 에 배정
+
+    이미 배정된 마켓은 그대로 두고(마켓별 순서 유지), 상장 폐지된 마켓은 빼며,
+    새 마켓은 가장 적게 배정된 shard 에 배정함
+
+    Parameters
+    ----------
+    markets : iterable
+        구독할 마켓 코드
+    assignment : dict
+        {마켓 코드: shard 번호} 현재 배정
+    shards : int
+        shard 개수
+
+    Returns
+    -------
+    dict
+        {마켓 코드: shard 번호} 새 배정
+    """
+    markets = set(markets)
+    result = {market: shard for market,shard in assignment.items() if market in markets and shard < shards}
+    loads = [0] * shards
+    for shard in result.values():
+        loads[shard] += 1
+    for market in sorted(markets - set(result)):
+        shard = loads.index(min(loads))
+        result[market] = shard
+        loads[shard] += 1
+    return result
+
+def _timestamp(msg):
+    if isinstance(msg,dict):
+        return msg.get("timestamp",msg.get("tms"))
+    return getattr(msg,"timestamp",None)
+
+class _Shard:
+    """웹소켓 연결 하나와 수신 지연(lag) 통계"""
+    def __init__(self,index,request,put,options):
+        self.index = index
+        self.put = put
+        self.lags = deque(maxlen=1000)
+        self.max_lag = 0.0
+        self.ws = UpbitWebSocket(request,callback=self.on_message,**options)
+        self.thread = threading.Thread(target=self.ws.start,name=f"WebSocketPool-{index}",daemon=True)
+
+    def on_message(self,msg):
+        if isinstance(msg,(str,Exception)):
+            # 연결 종료 및 오류 알림
+            return
+        timestamp = _timestamp(msg)
+        if timestamp is not None:
+            lag = time.time() * 1000 - timestamp
+            self.lags.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+        self.put(msg)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.ws.stop()
+        self.thread.join(5)
+
+    def metrics(self):
+        metrics = self.ws.metrics()
+        lags = list(self.lags)
+        metrics["lag_ms"] = lags[-1] if lags else None
+        metrics["mean_lag_ms"] = sum(lags) / len(lags) if lags else None
+        metrics["max_lag_ms"] = self.max_lag
+        return metrics
+
+def _run_process(index,request,messages,control,status,options,report_interval):
+    """프로세스 모드의 shard. control 로 구독 변경/종료를 받고 status 로 통계를 보냄"""
+    shard = _Shard(index,request,messages.put,options)
+    shard.start()
+    while True:
+        try:
+            command = control.get(timeout=report_interval)
+        except queue.Empty:
+            command = None
+        if command is None:
+            status.put((index,shard.metrics()))
+            continue
+        if command[0] == "subscribe":
+            shard.ws.resubscribe(command[1])
+        elif command[0] == "stop":
+            # 소비자가 더 이상 읽지 않아도 종료되도록 큐 flush 를 기다리지 않음
+            messages.cancel_join_thread()
+            shard.stop()
+            status.put((index,shard.metrics()))
+            return
+
+class WebSocketPool:
+    """마켓을 여러 웹소켓 연결로 나누어 구독하고 메시지를 하나의 큐로 모으는 객체
+
+    Parameters
+    ----------
+    markets : list
+        구독할 마켓 코드. 비워서 요청시 ub.market_all() 로 조회
+    types : tuple
+        구독할 타입 (ticker, trade, orderbook)
+    shards : int
+        최대 연결 개수. 배정된 마켓이 없는 shard 는 연결하지 않음
+    mode : str
+        'thread' 혹은 'process'. process 인 경우 shard 마다 프로세스에서 수신/디코딩 (메시지는 pickle 되어 전달됨)
+    ub : Upbit
+        마켓 목록을 조회할 Upbit 객체. 있으면 rebalance_interval 마다 상장/폐지된 마켓을 반영
+    quote : str
+        마켓 목록 조회 시 사용할 기준 화폐 (ex. 'KRW'). 비워서 요청시 전체
+    rebalance_interval : float
+        마켓 목록 조회 주기(초). None 인 경우 조회하지 않음
+    queue_size : int
+        메시지 큐의 크기. 가득 차면 shard 의 수신이 멈춤. 0 인 경우 무제한
+    simple : bool
+        True 인 경우 SIMPLE 형식으로 구독
+    report_interval : float
+        process 모드에서 shard 통계를 받는 주기(초)
+
+    그 외 키워드 인자(decoder, typed, stale_timeout, backoff_base 등)는 UpbitWebSocket 에 전달됨
+
+    Example
+    -------
+    with WebSocketPool(types=('trade','orderbook'),shards=4,ub=Upbit(),quote='KRW') as pool:
+        for msg in pool:
+            print(msg)
+    """
+    def __init__(self,markets=None,types=("trade",),shards=4,mode="thread",ub=None,quote=None,
+                 rebalance_interval=DEFAULT_REBALANCE_INTERVAL,queue_size=100000,simple=False,
+                 report_interval=1.0,ticket="upbit-wrapper",**options):
+        if mode not in ("thread","process"):
+            raise ValueError("mode must be 'thread' or 'process'")
+        if markets is None and ub is None:
+            raise ValueError("markets or ub is required")
+        self.logger = logging.getLogger("WebSocketPool")
+        self.markets = markets
+        self.types = tuple(types)
+        self.shards = shards
+        self.mode = mode
+        self.ub = ub
+        self.quote = quote
+        self.rebalance_interval = rebalance_interval if ub is not None else None
+        self.simple = simple
+        self.report_interval = report_interval
+        self.ticket = ticket
+        self.options = options
+        self.assignment = {}
+        # {shard 번호: 연결}. 배정된 마켓이 없는 shard 는 연결하지 않음
+        self.workers = {}
+        # workers 는 rebalance 스레드에서 바뀌므로 변경과 순회는 잠금 안에서 함
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.status = {}
+        self.rebalances = 0
+        if mode == "process":
+            self.queue = multiprocessing.Queue(queue_size)
+            self.status_queue = multiprocessing.Queue()
+        else:
+            self.queue = queue.Queue(queue_size)
+            self.status_queue = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.stop()
+
+    def __iter__(self):
+        while not self.stop_event.is_set():
+            try:
+                yield self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def get(self,timeout=None):
+        """메시지 하나를 꺼냄. timeout 동안 없으면 queue.Empty"""
+        return self.queue.get(timeout=timeout)
+
+    def discover(self):
+        """구독할 마켓 목록. markets 가 없으면 ub.market_all() 로 조회하고 실패 시 None"""
+        if self.ub is None:
+            return list(self.markets)
+        result = self.ub.market_all()
+        if result is False:
+            return None
+        markets = [item["market"] for item in result]
+        if self.quote is not None:
+            markets = [market for market in markets if market.startswith(self.quote + "-")]
+        if self.markets is not None:
+            wanted = set(self.markets)
+            markets = [market for market in markets if market in wanted]
+        return markets
+
+    def shard_markets(self,assignment=None):
+        """shard 별 마켓 목록"""
+        assignment = self.assignment if assignment is None else assignment
+        shards = [[] for _ in range(self.shards)]
+        for market,shard in sorted(assignment.items()):
+            shards[shard].append(market)
+        return shards
+
+    def __request(self,index,codes):
+        return make_request(f"{self.ticket}-{index}",self.types,codes,self.simple)
+
+    def start(self):
+        """모든 shard 연결을 시작"""
+        markets = self.discover()
+        if markets is None:
+            raise RuntimeError("failed to fetch markets")
+        self.stop_event.clear()
+        with self.lock:
+            self.assignment = assign_markets(markets,{},self.shards)
+            for index,codes in enumerate(self.shard_markets()):
+                if codes:
+                    self.__start_shard(index,codes)
+        if self.rebalance_interval:
+            threading.Thread(target=self.__watch_markets,name="WebSocketPool-rebalance",daemon=True).start()
+
+    def __start_shard(self,index,codes):
+        request = self.__request(index,codes)
+        if self.mode == "thread":
+            worker = _Shard(index,request,self.queue.put,self.options)
+            worker.start()
+        else:
+            control = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_run_process,name=f"WebSocketPool-{index}",daemon=True,
+                args=(index,request,self.queue,control,self.status_queue,self.options,self.report_interval))
+            process.start()
+            worker = (process,control)
+        self.workers[index] = worker
+
+    def __stop_shard(self,index):
+        """마켓이 없어진 shard 의 연결을 닫음"""
+        worker = self.workers.pop(index)
+        self.status.pop(index,None)
+        if self.mode == "thread":
+            worker.stop()
+            return
+        process,control = worker
+        control.put(("stop",))
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+
+    def __watch_markets(self):
+        while not self.stop_event.wait(self.rebalance_interval):
+            try:
+                self.rebalance()
+            except Exception as e:
+                self.logger.error(f"rebalance failed reason : {e}")
+
+    def rebalance(self,markets=None):
+        """마켓 목록을 다시 조회하여 바뀐 shard 만 구독을 변경
+
+        Parameters
+        ----------
+        markets : list
+            새 마켓 목록. 비워서 요청시 discover() 로 조회
+
+        Returns
+        -------
+        list
+            구독을 변경한 shard 번호
+        """
+        markets = self.discover() if markets is None else markets
+        if markets is None:
+            return []
+        with self.lock:
+            # stop() 이후에 끝난 조회로 연결을 다시 열지 않음
+            if self.stop_event.is_set():
+                return []
+            assignment = assign_markets(markets,self.assignment,self.shards)
+            before = self.shard_markets()
+            after = self.shard_markets(assignment)
+            self.assignment = assignment
+            changed = [index for index in range(self.shards) if before[index] != after[index]]
+            for index in changed:
+                if not after[index]:
+                    self.__stop_shard(index)
+                    continue
+                if index not in self.workers:
+                    self.__start_shard(index,after[index])
+                    continue
+                request = self.__request(index,after[index])
+                if self.mode == "thread":
+                    self.workers[index].ws.resubscribe(request)
+                else:
+                    self.workers[index][1].put(("subscribe",request))
+        if changed:
+            self.rebalances += 1
+            self.logger.info("rebalanced shards %s",changed)
+        return changed
+
+    def stop(self):
+        """모든 shard 연결을 닫음"""
+        self.stop_event.set()
+        with self.lock:
+            workers = list(self.workers.values())
+            self.workers = {}
+        for worker in workers:
+            if self.mode == "thread":
+                worker.stop()
+            else:
+                worker[1].put(("stop",))
+        if self.mode == "process":
+            for process,_ in workers:
+                process.join(5)
+                if process.is_alive():
+                    process.terminate()
+
+    def metrics(self):
+        """shard 별 통계
+
+        Returns
+        -------
+        dict
+            shards ({shard 번호: UpbitWebSocket.metrics() 항목과 markets, lag_ms (최근 메시지의 거래소 시각 대비 지연),
+            mean_lag_ms, max_lag_ms}), queued (큐에 쌓인 메시지 개수), rebalances.
+            process 모드는 report_interval 마다 받은 값
+        """
+        with self.lock:
+            workers = dict(self.workers)
+            shard_markets = self.shard_markets()
+        if self.mode == "thread":
+            for worker in workers.values():
+                self.status[worker.index] = worker.metrics()
+        else:
+            while True:
+                try:
+                    index,metrics = self.status_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if index in workers:
+                    self.status[index] = metrics
+        shards = {}
+        for index,codes in enumerate(shard_markets):
+            shards[index] = dict(self.status.get(index,{}),markets=len(codes))
+        try:
+            queued = self.queue.qsize()
+        except NotImplementedError:
+            queued = None
+        return {"shards": shards,"queued": queued,"rebalances": self.rebalances}